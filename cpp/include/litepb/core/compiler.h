@@ -0,0 +1,47 @@
+/**
+ * @file compiler.h
+ * @brief Compiler-specific helpers for LitePB
+ *
+ * This header provides portable wrappers around compiler extensions used by
+ * the runtime and by generated code. On compilers without the extension the
+ * macros expand to the plain expression, so behavior is unchanged.
+ *
+ * @copyright Copyright (c) 2025 JetHome LLC
+ * @license MIT License
+ */
+
+#pragma once
+
+/**
+ * @brief Branch prediction hints
+ *
+ * LITEPB_LIKELY marks a condition that is almost always true, LITEPB_UNLIKELY
+ * one that is almost always false (e.g. a truncated stream while parsing).
+ * The compiler lays out the cold branch away from the hot path.
+ *
+ * @code{.cpp}
+ * if (LITEPB_UNLIKELY(!reader.read_varint(value))) return false;
+ * @endcode
+ */
+#if defined(__GNUC__) || defined(__clang__)
+#define LITEPB_LIKELY(x) __builtin_expect(!!(x), 1)
+#define LITEPB_UNLIKELY(x) __builtin_expect(!!(x), 0)
+#else
+#define LITEPB_LIKELY(x) (x)
+#define LITEPB_UNLIKELY(x) (x)
+#endif
+
+/**
+ * @brief Whether the target stores integers little-endian, like the wire format
+ *
+ * When set, fixed-width values can be copied between the wire and memory
+ * as-is. Targets that cannot be identified at compile time get the portable
+ * byte-by-byte path.
+ */
+#if defined(__BYTE_ORDER__) && __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__
+#define LITEPB_LITTLE_ENDIAN 1
+#elif defined(_MSC_VER)
+#define LITEPB_LITTLE_ENDIAN 1
+#else
+#define LITEPB_LITTLE_ENDIAN 0
+#endif
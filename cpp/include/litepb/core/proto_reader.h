@@ -18,7 +18,10 @@
 #include "litepb/core/proto_writer.h"
 #include "litepb/core/streams.h"
 #include <cstdint>
+#include <cstring>
 #include <string>
+#include <string_view>
+#include <type_traits>
 #include <vector>
 
 namespace litepb {
@@ -74,11 +77,13 @@ public:
      *
      * Reads a base-128 encoded variable-length integer from the stream.
      * Used for int32, int64, uint32, uint64, bool, and enum types.
+     * Defined inline so generated parsers reach InputStream::read_varint()
+     * without an extra out-of-line call.
      *
      * @param value Output parameter for the read value
      * @return true if read succeeded, false on error or EOF
      */
-    bool read_varint(uint64_t & value);
+    bool read_varint(uint64_t & value) { return stream_.read_varint(value); }
 
     /**
      * @brief Read a 32-bit fixed-width value
@@ -96,17 +101,39 @@ public:
 
     /**
      * @brief Read a signed 32-bit fixed-width value
+     *
+     * Defined inline so generated code reads straight into the signed field
+     * instead of going through an unsigned temporary.
+     *
      * @param value Output parameter for the read value
      * @return true if read succeeded, false on error
      */
-    bool read_sfixed32(int32_t & value);
+    bool read_sfixed32(int32_t & value)
+    {
+        uint32_t bits;
+        if (LITEPB_UNLIKELY(!read_fixed32(bits)))
+            return false;
+        std::memcpy(&value, &bits, sizeof(value));
+        return true;
+    }
 
     /**
      * @brief Read a signed 64-bit fixed-width value
+     *
+     * Defined inline so generated code reads straight into the signed field
+     * instead of going through an unsigned temporary.
+     *
      * @param value Output parameter for the read value
      * @return true if read succeeded, false on error
      */
-    bool read_sfixed64(int64_t & value);
+    bool read_sfixed64(int64_t & value)
+    {
+        uint64_t bits;
+        if (LITEPB_UNLIKELY(!read_fixed64(bits)))
+            return false;
+        std::memcpy(&value, &bits, sizeof(value));
+        return true;
+    }
 
     /**
      * @brief Read a 32-bit floating point value
@@ -142,6 +169,18 @@ public:
      */
     bool read_string(std::string & str);
 
+    /**
+     * @brief Read a length-delimited string without copying it
+     *
+     * Reads a varint length prefix and points @p str at the string data inside
+     * the input buffer. Requires a stream that supports InputStream::borrow()
+     * unless the string is empty; the view is only valid while that buffer is.
+     *
+     * @param str Output view of the string data
+     * @return true if read succeeded, false on error or if the stream cannot lend its data
+     */
+    bool read_string_view(std::string_view & str);
+
     /**
      * @brief Read a field tag (field number and wire type)
      *
@@ -152,7 +191,17 @@ public:
      * @param type Output parameter for the wire type
      * @return true if a tag was read, false on EOF
      */
-    bool read_tag(uint32_t & field_number, WireType & type);
+    bool read_tag(uint32_t & field_number, WireType & type)
+    {
+        // Tags of fields 1-15 are a single byte, decoded by the stream's own fast path
+        uint64_t tag;
+        if (LITEPB_UNLIKELY(!stream_.read_varint(tag)))
+            return false;
+
+        field_number = static_cast<uint32_t>(tag >> 3);
+        type         = static_cast<WireType>(tag & 7);
+        return true;
+    }
 
     /**
      * @brief Skip a field with the given wire type
@@ -195,23 +244,39 @@ public:
      * @brief Read a zigzag-encoded signed 32-bit integer
      *
      * Reads a varint and decodes it using zigzag decoding for efficient
-     * representation of negative numbers.
+     * representation of negative numbers. Defined inline so the zigzag
+     * step folds into the stream's varint decode.
      *
      * @param value Output parameter for the decoded value
      * @return true if read succeeded, false on error
      */
-    bool read_sint32(int32_t & value);
+    bool read_sint32(int32_t & value)
+    {
+        uint64_t encoded;
+        if (LITEPB_UNLIKELY(!stream_.read_varint(encoded)))
+            return false;
+        value = zigzag_decode32(static_cast<uint32_t>(encoded));
+        return true;
+    }
 
     /**
      * @brief Read a zigzag-encoded signed 64-bit integer
      *
      * Reads a varint and decodes it using zigzag decoding for efficient
-     * representation of negative numbers.
+     * representation of negative numbers. Defined inline so the zigzag
+     * step folds into the stream's varint decode.
      *
      * @param value Output parameter for the decoded value
      * @return true if read succeeded, false on error
      */
-    bool read_sint64(int64_t & value);
+    bool read_sint64(int64_t & value)
+    {
+        uint64_t encoded;
+        if (LITEPB_UNLIKELY(!stream_.read_varint(encoded)))
+            return false;
+        value = zigzag_decode64(encoded);
+        return true;
+    }
 
     /**
      * @brief Get the current read position in the stream
@@ -219,7 +284,170 @@ public:
      */
     size_t position() const { return stream_.position(); }
 
+    /**
+     * @brief Count the varints in a run of packed varint data
+     *
+     * Every varint ends in exactly one byte with bit 7 clear, so the count is
+     * the number of such bytes. On GCC/Clang eight bytes are counted at a
+     * time with a popcount. Lets generated code reserve a repeated field
+     * before reading a packed run into it.
+     *
+     * @param data Pointer to the packed data
+     * @param size Length of the packed data in bytes
+     * @return Number of varints that end within @p size bytes
+     */
+    static size_t count_varints(const uint8_t * data, size_t size)
+    {
+        size_t count = 0;
+        size_t i = 0;
+#if defined(__GNUC__) || defined(__clang__)
+        for (; i + 8 <= size; i += 8) {
+            uint64_t word;
+            std::memcpy(&word, data + i, sizeof(word));
+            count += static_cast<size_t>(__builtin_popcountll(~word & 0x8080808080808080ULL));
+        }
+#endif
+        for (; i < size; i++) {
+            count += (data[i] & 0x80) == 0;
+        }
+        return count;
+    }
+
+    /**
+     * @brief Read a packed run of varints, appending each value to a vector
+     *
+     * Values are converted with static_cast<T>, which covers int32, int64,
+     * uint32, uint64, bool and enum fields. When the stream can show the whole
+     * run (InputStream::peek()) it is reserved for once and decoded in place,
+     * then skipped in one call; otherwise values are read one at a time.
+     *
+     * @param values Vector the decoded values are appended to
+     * @param length Length of the packed run in bytes
+     * @return true if the whole run was read, false on a truncated or malformed varint
+     */
+    template <typename T>
+    bool read_packed_varints(std::vector<T> & values, size_t length)
+    {
+        return read_packed_run(values, length, [](uint64_t raw) { return static_cast<T>(raw); });
+    }
+
+    /**
+     * @brief Read a packed run of zigzag-encoded sint32 values
+     * @param values Vector the decoded values are appended to
+     * @param length Length of the packed run in bytes
+     * @return true if the whole run was read, false on error
+     */
+    bool read_packed_sint32(std::vector<int32_t> & values, size_t length)
+    {
+        return read_packed_run(values, length, [](uint64_t raw) { return zigzag_decode32(static_cast<uint32_t>(raw)); });
+    }
+
+    /**
+     * @brief Read a packed run of zigzag-encoded sint64 values
+     * @param values Vector the decoded values are appended to
+     * @param length Length of the packed run in bytes
+     * @return true if the whole run was read, false on error
+     */
+    bool read_packed_sint64(std::vector<int64_t> & values, size_t length)
+    {
+        return read_packed_run(values, length, [](uint64_t raw) { return zigzag_decode64(raw); });
+    }
+
+    /**
+     * @brief Read a packed run of fixed-width values, appending them to a vector
+     *
+     * Covers fixed32, sfixed32, float, fixed64, sfixed64 and double fields. The
+     * run is sized once. On little-endian targets the wire bytes already are
+     * the in-memory values, so the whole run is copied into the vector in one
+     * go; elsewhere each value is decoded, straight from the stream's buffer
+     * when the stream can show it.
+     *
+     * @param values Vector the decoded values are appended to
+     * @param length Length of the packed run in bytes
+     * @return true if the whole run was read, false on error or if length is not a multiple of sizeof(T)
+     */
+    template <typename T>
+    bool read_packed_fixed(std::vector<T> & values, size_t length)
+    {
+        static_assert(sizeof(T) == 4 || sizeof(T) == 8, "fixed-width values are 4 or 8 bytes");
+        if (LITEPB_UNLIKELY(length % sizeof(T) != 0))
+            return false;
+
+        const size_t first = values.size();
+        const size_t count = length / sizeof(T);
+#if LITEPB_LITTLE_ENDIAN
+        if (LITEPB_LIKELY(length <= stream_.available())) {
+            values.resize(first + count);
+            return stream_.read(reinterpret_cast<uint8_t *>(values.data() + first), length);
+        }
+#else
+        if (const uint8_t * data = stream_.peek(length)) {
+            values.resize(first + count);
+            for (size_t i = 0; i < count; i++) {
+                values[first + i] = decode_fixed<T>(data + i * sizeof(T));
+            }
+            return stream_.skip(length);
+        }
+
+        if (LITEPB_LIKELY(length <= stream_.available()))
+            values.reserve(first + count);
+#endif
+        for (size_t i = 0; i < count; i++) {
+            uint8_t buffer[sizeof(T)];
+            if (LITEPB_UNLIKELY(!stream_.read(buffer, sizeof(buffer))))
+                return false;
+            values.push_back(decode_fixed<T>(buffer));
+        }
+        return true;
+    }
+
 private:
+    /**
+     * @brief Read a packed run of varints, converting each raw value with decode
+     */
+    template <typename T, typename Decode>
+    bool read_packed_run(std::vector<T> & values, size_t length, Decode decode)
+    {
+        if (const uint8_t * data = stream_.peek(length)) {
+            values.reserve(values.size() + count_varints(data, length));
+            size_t pos = 0;
+            while (pos < length) {
+                uint64_t raw;
+                size_t consumed = InputStream::decode_varint(data + pos, length - pos, raw);
+                if (LITEPB_UNLIKELY(consumed == 0))
+                    return false;
+                values.push_back(decode(raw));
+                pos += consumed;
+            }
+            return stream_.skip(length);
+        }
+
+        const size_t end_pos = stream_.position() + length;
+        while (stream_.position() < end_pos) {
+            uint64_t raw;
+            if (LITEPB_UNLIKELY(!stream_.read_varint(raw)))
+                return false;
+            values.push_back(decode(raw));
+        }
+        return true;
+    }
+
+    /**
+     * @brief Decode a little-endian 4- or 8-byte value of type T from memory
+     */
+    template <typename T>
+    static T decode_fixed(const uint8_t * data)
+    {
+        using Bits = std::conditional_t<sizeof(T) == 4, uint32_t, uint64_t>;
+        Bits bits = 0;
+        for (size_t i = 0; i < sizeof(Bits); i++) {
+            bits |= static_cast<Bits>(data[i]) << (i * 8);
+        }
+        T value;
+        std::memcpy(&value, &bits, sizeof(value));
+        return value;
+    }
+
     /**
      * @brief Decode a 32-bit zigzag-encoded value
      * @param value The encoded value
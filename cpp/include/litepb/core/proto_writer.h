@@ -17,7 +17,9 @@
 
 #include "litepb/core/streams.h"
 #include <cstdint>
+#include <cstring>
 #include <string>
+#include <string_view>
 
 namespace litepb {
 
@@ -89,6 +91,20 @@ public:
      */
     bool write_varint(uint64_t value);
 
+    /**
+     * @brief Write a varint known to fit in 32 bits
+     *
+     * Produces the same bytes as write_varint() but picks the encoded length
+     * up front, so the encoding loop has a fixed trip count the compiler can
+     * unroll. Used for uint32, bool and zigzag-encoded sint32 values. Negative
+     * int32 and enum values are sign-extended to 10 bytes and must go through
+     * write_varint() instead.
+     *
+     * @param value The value to write
+     * @return true if write succeeded, false on error
+     */
+    bool write_varint32(uint32_t value);
+
     /**
      * @brief Write a 32-bit fixed-width value
      * @param value The value to write
@@ -150,7 +166,7 @@ public:
      * @param str The string to write
      * @return true if write succeeded, false on error
      */
-    bool write_string(const std::string & str);
+    bool write_string(std::string_view str);
 
     /**
      * @brief Write a field tag (field number and wire type)
@@ -164,6 +180,78 @@ public:
      */
     bool write_tag(uint32_t field_number, WireType type);
 
+    /**
+     * @brief Write bytes that are known at compile time
+     *
+     * Used by generated code for field tags: the tag bytes are encoded by the
+     * generator, so writing one costs a single stream write with no varint
+     * encoding at runtime.
+     *
+     * @tparam Bytes The bytes to write, in order, without a length prefix
+     * @return true if write succeeded, false on error
+     */
+    template <uint8_t... Bytes>
+    bool write_raw()
+    {
+        static constexpr uint8_t data[] = { Bytes... };
+        return stream_.write(data, sizeof(data));
+    }
+
+    /**
+     * @brief Write a pre-encoded tag and a 4-byte fixed-width value in one stream write
+     *
+     * Used by generated code for fixed32, sfixed32 and float fields; the value's
+     * bits are written little-endian right after the tag.
+     *
+     * @tparam Tag The encoded field tag bytes, as for write_raw()
+     * @param value The value to write, any 4-byte trivially copyable type
+     * @return true if write succeeded, false on error
+     */
+    template <uint8_t... Tag, typename T>
+    bool write_fixed32_field(T value)
+    {
+        static_assert(sizeof(T) == 4, "fixed32 field value must be 4 bytes");
+        uint32_t bits;
+        std::memcpy(&bits, &value, sizeof(bits));
+        uint8_t buffer[sizeof...(Tag) + 4] = { Tag... };
+        encode_fixed32(bits, buffer + sizeof...(Tag));
+        return stream_.write(buffer, sizeof(buffer));
+    }
+
+    /**
+     * @brief Write a pre-encoded tag and an 8-byte fixed-width value in one stream write
+     *
+     * Used by generated code for fixed64, sfixed64 and double fields.
+     *
+     * @tparam Tag The encoded field tag bytes, as for write_raw()
+     * @param value The value to write, any 8-byte trivially copyable type
+     * @return true if write succeeded, false on error
+     */
+    template <uint8_t... Tag, typename T>
+    bool write_fixed64_field(T value)
+    {
+        static_assert(sizeof(T) == 8, "fixed64 field value must be 8 bytes");
+        uint64_t bits;
+        std::memcpy(&bits, &value, sizeof(bits));
+        uint8_t buffer[sizeof...(Tag) + 8] = { Tag... };
+        encode_fixed64(bits, buffer + sizeof...(Tag));
+        return stream_.write(buffer, sizeof(buffer));
+    }
+
+    /**
+     * @brief Write a pre-encoded tag and a bool value in one stream write
+     *
+     * @tparam Tag The encoded field tag bytes, as for write_raw()
+     * @param value The value to write, encoded as a one-byte varint
+     * @return true if write succeeded, false on error
+     */
+    template <uint8_t... Tag>
+    bool write_bool_field(bool value)
+    {
+        const uint8_t buffer[] = { Tag..., static_cast<uint8_t>(value ? 1 : 0) };
+        return stream_.write(buffer, sizeof(buffer));
+    }
+
     /**
      * @brief Write a zigzag-encoded signed 32-bit integer
      *
@@ -188,10 +276,28 @@ public:
 
     /**
      * @brief Calculate the serialized size of a varint
+     *
+     * Each varint byte carries 7 payload bits, so the size is the number of
+     * significant bits rounded up to a multiple of 7. On GCC/Clang this is
+     * computed with a single count-leading-zeros instead of a shift loop.
+     *
      * @param value The value to calculate size for
      * @return Number of bytes required to encode the varint
      */
-    static size_t varint_size(uint64_t value);
+    static constexpr size_t varint_size(uint64_t value)
+    {
+#if defined(__GNUC__) || defined(__clang__)
+        // value | 1 keeps clz defined for zero, which still encodes as one byte
+        return static_cast<size_t>((64 - __builtin_clzll(value | 1) + 6) / 7);
+#else
+        size_t size = 1;
+        while (value >= 128) {
+            value >>= 7;
+            size++;
+        }
+        return size;
+#endif
+    }
 
     /**
      * @brief Get the serialized size of a fixed32 value
@@ -242,7 +348,6 @@ public:
      */
     static size_t unknown_fields_size(const class UnknownFieldSet& unknown_fields);
 
-private:
     /**
      * @brief Encode a 32-bit signed value using zigzag encoding
      * @param value The value to encode
@@ -256,6 +361,97 @@ private:
      * @return The zigzag-encoded value
      */
     static uint64_t zigzag_encode64(int64_t value) { return (static_cast<uint64_t>(value) << 1) ^ (value >> 63); }
+
+    /**
+     * @brief Encode a varint into a caller-provided buffer
+     *
+     * Lets generated code assemble several small values in a stack buffer
+     * and hand them to the stream with a single write() call.
+     *
+     * @param value The value to encode
+     * @param out Destination with room for at least varint_size(value) bytes
+     * @return Number of bytes written to out
+     */
+    static size_t encode_varint(uint64_t value, uint8_t * out)
+    {
+        size_t size = 0;
+        while (value >= 0x80) {
+            out[size++] = static_cast<uint8_t>(value | 0x80);
+            value >>= 7;
+        }
+        out[size++] = static_cast<uint8_t>(value);
+        return size;
+    }
+
+    /**
+     * @brief Encode a 32-bit varint into a caller-provided buffer
+     *
+     * Same output as encode_varint(), with the length chosen by a comparison
+     * ladder and each length encoded by its own unrolled loop.
+     *
+     * @param value The value to encode
+     * @param out Destination with room for at least varint_size(value) bytes (5 at most)
+     * @return Number of bytes written to out
+     */
+    static size_t encode_varint32(uint32_t value, uint8_t * out)
+    {
+        if (value < (1U << 7)) {
+            out[0] = static_cast<uint8_t>(value);
+            return 1;
+        }
+        if (value < (1U << 14))
+            return encode_varint_bytes<2>(value, out);
+        if (value < (1U << 21))
+            return encode_varint_bytes<3>(value, out);
+        if (value < (1U << 28))
+            return encode_varint_bytes<4>(value, out);
+        return encode_varint_bytes<5>(value, out);
+    }
+
+    /**
+     * @brief Encode a little-endian fixed32 value into a caller-provided buffer
+     * @param value The value to encode
+     * @param out Destination with room for at least 4 bytes
+     * @return Number of bytes written to out (always 4)
+     */
+    static size_t encode_fixed32(uint32_t value, uint8_t * out)
+    {
+        out[0] = static_cast<uint8_t>(value);
+        out[1] = static_cast<uint8_t>(value >> 8);
+        out[2] = static_cast<uint8_t>(value >> 16);
+        out[3] = static_cast<uint8_t>(value >> 24);
+        return 4;
+    }
+
+    /**
+     * @brief Encode a little-endian fixed64 value into a caller-provided buffer
+     * @param value The value to encode
+     * @param out Destination with room for at least 8 bytes
+     * @return Number of bytes written to out (always 8)
+     */
+    static size_t encode_fixed64(uint64_t value, uint8_t * out)
+    {
+        for (int i = 0; i < 8; i++) {
+            out[i] = static_cast<uint8_t>(value >> (i * 8));
+        }
+        return 8;
+    }
+
+private:
+    /**
+     * @brief Encode a varint of exactly N bytes
+     * @tparam N Encoded length, the caller guarantees varint_size(value) == N
+     */
+    template <size_t N>
+    static size_t encode_varint_bytes(uint32_t value, uint8_t * out)
+    {
+        for (size_t i = 0; i < N - 1; ++i) {
+            out[i] = static_cast<uint8_t>(value | 0x80);
+            value >>= 7;
+        }
+        out[N - 1] = static_cast<uint8_t>(value);
+        return N;
+    }
 };
 
 } // namespace litepb
@@ -20,6 +20,13 @@
 #include <cstring>
 #include <vector>
 
+#include "litepb/core/compiler.h"
+
+#if defined(__BMI2__) && defined(__BYTE_ORDER__) && __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__
+#include <immintrin.h>
+#define LITEPB_VARINT_PEXT 1
+#endif
+
 namespace litepb {
 
 /**
@@ -95,6 +102,120 @@ public:
      * @return Number of bytes that can be read without blocking
      */
     virtual size_t available() const = 0;
+
+    /**
+     * @brief Consume bytes without copying them out of the stream
+     *
+     * Streams backed by contiguous memory return a pointer to the next @p size
+     * bytes and advance past them. The pointer stays valid for as long as that
+     * memory does. Other streams return nullptr and leave the position unchanged.
+     *
+     * @param size Number of bytes to consume
+     * @return Pointer to the consumed bytes, or nullptr if not supported or insufficient data
+     */
+    virtual const uint8_t * borrow(size_t size)
+    {
+        (void) size;
+        return nullptr;
+    }
+
+    /**
+     * @brief Look at upcoming bytes without consuming them
+     *
+     * Like borrow(), but the position is left unchanged. ProtoReader uses it to
+     * size and decode a packed field in place before skipping over it.
+     *
+     * @param size Number of bytes to look at
+     * @return Pointer to the next @p size bytes, or nullptr if not supported or insufficient data
+     */
+    virtual const uint8_t * peek(size_t size) const
+    {
+        (void) size;
+        return nullptr;
+    }
+
+    /**
+     * @brief Read a base-128 varint
+     *
+     * The default pulls one byte at a time through read(). Streams backed by
+     * contiguous memory override it to decode the whole varint in place with
+     * decode_varint(), so a multi-byte value costs one virtual call.
+     *
+     * @param value Output parameter for the decoded value
+     * @return true if a valid varint was read, false on EOF or a malformed varint
+     */
+    virtual bool read_varint(uint64_t & value)
+    {
+        value = 0;
+        uint8_t byte;
+        int shift = 0;
+
+        for (int i = 0; i < 10; i++) {
+            if (!read(&byte, 1))
+                return false;
+
+            if (i == 9 && byte > 1)
+                return false;
+
+            value |= static_cast<uint64_t>(byte & 0x7F) << shift;
+
+            if ((byte & 0x80) == 0) {
+                return true;
+            }
+            shift += 7;
+        }
+
+        return false;
+    }
+
+    /**
+     * @brief Decode a varint from contiguous memory
+     *
+     * On x86-64 builds with BMI2 enabled, varints of up to 8 bytes are decoded
+     * with a single 8-byte load and PEXT when at least 8 bytes are readable.
+     * Everything else goes through the portable byte loop.
+     *
+     * @param data Pointer to the first byte of the varint
+     * @param size Number of readable bytes at @p data
+     * @param value Output parameter for the decoded value
+     * @return Number of bytes consumed, or 0 if truncated or malformed
+     */
+    static size_t decode_varint(const uint8_t * data, size_t size, uint64_t & value)
+    {
+        if (LITEPB_LIKELY(size > 0 && data[0] < 0x80)) {
+            value = data[0];
+            return 1;
+        }
+#ifdef LITEPB_VARINT_PEXT
+        if (size >= 8) {
+            uint64_t word;
+            std::memcpy(&word, data, sizeof(word));
+            // The first byte with a clear continuation bit ends the varint
+            uint64_t stops = ~word & 0x8080808080808080ULL;
+            if (stops != 0) {
+                size_t length = static_cast<size_t>(__builtin_ctzll(stops)) / 8 + 1;
+                uint64_t mask = 0x7F7F7F7F7F7F7F7FULL;
+                if (length < 8)
+                    mask &= (1ULL << (length * 8)) - 1;
+                value = _pext_u64(word, mask);
+                return length;
+            }
+        }
+#endif
+        uint64_t result = 0;
+        size_t limit = size < 10 ? size : 10;
+        for (size_t i = 0; i < limit; i++) {
+            uint8_t byte = data[i];
+            if (i == 9 && byte > 1)
+                return 0;
+            result |= static_cast<uint64_t>(byte & 0x7F) << (7 * i);
+            if ((byte & 0x80) == 0) {
+                value = result;
+                return i + 1;
+            }
+        }
+        return 0;
+    }
 };
 
 /**
@@ -253,6 +374,51 @@ public:
      * @return Number of unread bytes remaining
      */
     size_t available() const override { return size_ > pos_ ? size_ - pos_ : 0; }
+
+    /**
+     * @brief Consume bytes in place
+     *
+     * @param size Number of bytes to consume
+     * @return Pointer into the caller's buffer, or nullptr if insufficient data
+     */
+    const uint8_t * borrow(size_t size) override
+    {
+        if (!data_ || size > available())
+            return nullptr;
+        const uint8_t * result = data_ + pos_;
+        pos_ += size;
+        return result;
+    }
+
+    /**
+     * @brief Look at upcoming bytes in place
+     *
+     * @param size Number of bytes to look at
+     * @return Pointer into the caller's buffer, or nullptr if insufficient data
+     */
+    const uint8_t * peek(size_t size) const override
+    {
+        if (!data_ || size > available())
+            return nullptr;
+        return data_ + pos_;
+    }
+
+    /**
+     * @brief Decode a varint directly from the buffer
+     *
+     * @param value Output parameter for the decoded value
+     * @return true if a valid varint was read, false if truncated or malformed
+     */
+    bool read_varint(uint64_t & value) override
+    {
+        if (!data_ || pos_ >= size_)
+            return false;
+        size_t length = decode_varint(data_ + pos_, size_ - pos_, value);
+        if (LITEPB_UNLIKELY(length == 0))
+            return false;
+        pos_ += length;
+        return true;
+    }
 };
 
 /**
@@ -423,6 +589,51 @@ public:
      * @return Number of unread bytes remaining
      */
     size_t available() const override { return size_ > pos_ ? size_ - pos_ : 0; }
+
+    /**
+     * @brief Consume bytes in place
+     *
+     * @param size Number of bytes to consume
+     * @return Pointer into the internal buffer (valid while the stream lives), or nullptr if insufficient data
+     */
+    const uint8_t * borrow(size_t size) override
+    {
+        if (size > available())
+            return nullptr;
+        const uint8_t * result = buffer_ + pos_;
+        pos_ += size;
+        return result;
+    }
+
+    /**
+     * @brief Look at upcoming bytes in place
+     *
+     * @param size Number of bytes to look at
+     * @return Pointer into the internal buffer, or nullptr if insufficient data
+     */
+    const uint8_t * peek(size_t size) const override
+    {
+        if (size > available())
+            return nullptr;
+        return buffer_ + pos_;
+    }
+
+    /**
+     * @brief Decode a varint directly from the buffer
+     *
+     * @param value Output parameter for the decoded value
+     * @return true if a valid varint was read, false if truncated or malformed
+     */
+    bool read_varint(uint64_t & value) override
+    {
+        if (pos_ >= size_)
+            return false;
+        size_t length = decode_varint(buffer_ + pos_, size_ - pos_, value);
+        if (LITEPB_UNLIKELY(length == 0))
+            return false;
+        pos_ += length;
+        return true;
+    }
 };
 
 } // namespace litepb
@@ -32,6 +32,7 @@
 
 #pragma once
 
+#include "litepb/core/compiler.h"
 #include "litepb/core/proto_reader.h"
 #include "litepb/core/proto_writer.h"
 #include "litepb/core/streams.h"
@@ -148,6 +149,65 @@ inline bool parse(T & msg, InputStream & stream)
     return Serializer<T>::parse(msg, stream);
 }
 
+/**
+ * @brief Parse a length-delimited submessage from a stream
+ *
+ * Reads the varint length prefix, then parses exactly that many bytes into
+ * msg. Used by generated code for nested message fields. The bytes are parsed
+ * in place when the stream can lend them (see InputStream::borrow()), and
+ * copied into a temporary buffer otherwise.
+ *
+ * @tparam T The message type (automatically deduced)
+ * @param msg The message to parse into
+ * @param stream The input stream positioned at the length prefix
+ * @return true if parsing succeeded, false on error
+ */
+template <typename T>
+inline bool parse_length_prefixed(T & msg, InputStream & stream)
+{
+    uint64_t length;
+    if (LITEPB_UNLIKELY(!stream.read_varint(length)))
+        return false;
+    const size_t size    = static_cast<size_t>(length);
+    const uint8_t * data = stream.borrow(size);
+    std::vector<uint8_t> buffer;
+    if (data == nullptr) {
+        buffer.resize(size);
+        if (LITEPB_UNLIKELY(!stream.read(buffer.data(), size)))
+            return false;
+        data = buffer.data();
+    }
+    BufferInputStream msg_stream(data, size);
+    return Serializer<T>::parse(msg, msg_stream);
+}
+
+/**
+ * @brief Parse a length-delimited submessage that must stay in the input buffer
+ *
+ * Like parse_length_prefixed(), but fails when the stream cannot lend the
+ * bytes. Used by code generated with --zero-copy-strings, where string views
+ * in the submessage have to point into the caller's buffer.
+ *
+ * @tparam T The message type (automatically deduced)
+ * @param msg The message to parse into
+ * @param stream The input stream positioned at the length prefix
+ * @return true if parsing succeeded, false on error or if non-empty bytes cannot be borrowed
+ */
+template <typename T>
+inline bool parse_length_prefixed_borrowed(T & msg, InputStream & stream)
+{
+    uint64_t length;
+    if (LITEPB_UNLIKELY(!stream.read_varint(length)))
+        return false;
+    const size_t size    = static_cast<size_t>(length);
+    const uint8_t * data = stream.borrow(size);
+    // An empty submessage has no views to keep alive, so it does not need borrowing
+    if (LITEPB_UNLIKELY(data == nullptr && size != 0))
+        return false;
+    BufferInputStream msg_stream(data, size);
+    return Serializer<T>::parse(msg, msg_stream);
+}
+
 /**
  * @brief Calculate the serialized size of a message in bytes
  *
@@ -4,30 +4,6 @@
 
 namespace litepb {
 
-bool ProtoReader::read_varint(uint64_t& value)
-{
-    value = 0;
-    uint8_t byte;
-    int shift = 0;
-
-    for (int i = 0; i < 10; i++) {
-        if (!stream_.read(&byte, 1))
-            return false;
-
-        if (i == 9 && byte > 1)
-            return false;
-
-        value |= static_cast<uint64_t>(byte & 0x7F) << shift;
-
-        if ((byte & 0x80) == 0) {
-            return true;
-        }
-        shift += 7;
-    }
-
-    return false;
-}
-
 bool ProtoReader::read_fixed32(uint32_t& value)
 {
     uint8_t buffer[4];
@@ -52,24 +28,6 @@ bool ProtoReader::read_fixed64(uint64_t& value)
     return true;
 }
 
-bool ProtoReader::read_sfixed32(int32_t& value)
-{
-    uint32_t bits;
-    if (!read_fixed32(bits))
-        return false;
-    std::memcpy(&value, &bits, sizeof(int32_t));
-    return true;
-}
-
-bool ProtoReader::read_sfixed64(int64_t& value)
-{
-    uint64_t bits;
-    if (!read_fixed64(bits))
-        return false;
-    std::memcpy(&value, &bits, sizeof(int64_t));
-    return true;
-}
-
 bool ProtoReader::read_float(float& value)
 {
     uint32_t bits;
@@ -116,14 +74,26 @@ bool ProtoReader::read_string(std::string& str)
     return true;
 }
 
-bool ProtoReader::read_tag(uint32_t& field_number, WireType& type)
+bool ProtoReader::read_string_view(std::string_view& str)
 {
-    uint64_t tag;
-    if (!read_varint(tag))
+    uint64_t size;
+    if (!read_varint(size))
         return false;
 
-    field_number = static_cast<uint32_t>(tag >> 3);
-    type         = static_cast<WireType>(tag & 7);
+    // Reject lengths that do not fit size_t on 32-bit targets
+    if (static_cast<size_t>(size) != size)
+        return false;
+
+    // An empty string has nothing to point into, so any stream can provide it
+    if (size == 0) {
+        str = std::string_view();
+        return true;
+    }
+
+    const uint8_t* data = stream_.borrow(static_cast<size_t>(size));
+    if (!data)
+        return false;
+    str = std::string_view(reinterpret_cast<const char*>(data), size);
     return true;
 }
 
@@ -154,24 +124,6 @@ bool ProtoReader::skip_field(WireType type)
     }
 }
 
-bool ProtoReader::read_sint32(int32_t& value)
-{
-    uint64_t encoded;
-    if (!read_varint(encoded))
-        return false;
-    value = zigzag_decode32(static_cast<uint32_t>(encoded));
-    return true;
-}
-
-bool ProtoReader::read_sint64(int64_t& value)
-{
-    uint64_t encoded;
-    if (!read_varint(encoded))
-        return false;
-    value = zigzag_decode64(encoded);
-    return true;
-}
-
 bool ProtoReader::capture_unknown_field(WireType type, std::vector<uint8_t>& data)
 {
     data.clear();
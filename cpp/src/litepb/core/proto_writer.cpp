@@ -7,35 +7,25 @@ namespace litepb {
 bool ProtoWriter::write_varint(uint64_t value)
 {
     uint8_t buffer[10];
-    size_t size = 0;
-
-    while (value >= 0x80) {
-        buffer[size++] = static_cast<uint8_t>(value | 0x80);
-        value >>= 7;
-    }
-    buffer[size++] = static_cast<uint8_t>(value);
+    return stream_.write(buffer, encode_varint(value, buffer));
+}
 
-    return stream_.write(buffer, size);
+bool ProtoWriter::write_varint32(uint32_t value)
+{
+    uint8_t buffer[5];
+    return stream_.write(buffer, encode_varint32(value, buffer));
 }
 
 bool ProtoWriter::write_fixed32(uint32_t value)
 {
     uint8_t buffer[4];
-    buffer[0] = static_cast<uint8_t>(value);
-    buffer[1] = static_cast<uint8_t>(value >> 8);
-    buffer[2] = static_cast<uint8_t>(value >> 16);
-    buffer[3] = static_cast<uint8_t>(value >> 24);
-    return stream_.write(buffer, 4);
+    return stream_.write(buffer, encode_fixed32(value, buffer));
 }
 
 bool ProtoWriter::write_fixed64(uint64_t value)
 {
     uint8_t bytes[8];
-    for (int i = 0; i < 8; i++) {
-        bytes[i] = static_cast<uint8_t>(value & 0xFF);
-        value >>= 8;
-    }
-    return stream_.write(bytes, 8);
+    return stream_.write(bytes, encode_fixed64(value, bytes));
 }
 
 bool ProtoWriter::write_float(float value)
@@ -62,7 +52,7 @@ bool ProtoWriter::write_bytes(const uint8_t* data, size_t size)
     return true;
 }
 
-bool ProtoWriter::write_string(const std::string& str)
+bool ProtoWriter::write_string(std::string_view str)
 {
     return write_bytes(reinterpret_cast<const uint8_t*>(str.data()), str.size());
 }
@@ -74,7 +64,7 @@ bool ProtoWriter::write_tag(uint32_t field_number, WireType type)
 
 bool ProtoWriter::write_sint32(int32_t value)
 {
-    return write_varint(zigzag_encode32(value));
+    return write_varint32(static_cast<uint32_t>(zigzag_encode32(value)));
 }
 
 bool ProtoWriter::write_sint64(int64_t value)
@@ -96,16 +86,6 @@ bool ProtoWriter::write_sfixed64(int64_t value)
     return write_fixed64(bits);
 }
 
-size_t ProtoWriter::varint_size(uint64_t value)
-{
-    size_t size = 1;
-    while (value >= 128) {
-        value >>= 7;
-        size++;
-    }
-    return size;
-}
-
 size_t ProtoWriter::string_size(uint32_t field_number, const std::string& value)
 {
     size_t size = varint_size((field_number << 3) | WIRE_TYPE_LENGTH_DELIMITED); // tag
@@ -24,6 +24,7 @@ Example:
 """
 
 from abc import ABC, abstractmethod
+from typing import TextIO
 from google.protobuf import descriptor_pb2 as pb2
 
 
@@ -78,3 +79,31 @@ class LanguageGenerator(ABC):
             NotImplementedError: Must be implemented by subclasses
         """
         pass
+    
+    def write_header(self, file_proto: pb2.FileDescriptorProto, filename: str, out: TextIO) -> None:
+        """
+        Write header/interface file content for the given proto file to out.
+        
+        The default writes the result of generate_header(). Backends that can
+        produce their output incrementally may override this to avoid holding
+        the whole file in memory.
+        
+        Args:
+            file_proto: The protobuf file descriptor containing messages and enums
+            filename: The name of the proto file being processed (e.g., "person.proto")
+            out: Text stream the content is written to
+        """
+        out.write(self.generate_header(file_proto, filename))
+    
+    def write_implementation(self, file_proto: pb2.FileDescriptorProto, filename: str, out: TextIO) -> None:
+        """
+        Write implementation file content for the given proto file to out.
+        
+        The default writes the result of generate_implementation(); see write_header().
+        
+        Args:
+            file_proto: The protobuf file descriptor containing messages and enums
+            filename: The name of the proto file being processed (e.g., "person.proto")
+            out: Text stream the content is written to
+        """
+        out.write(self.generate_implementation(file_proto, filename))
@@ -3,9 +3,13 @@
 C++ specific utilities for code generation.
 """
 
+import functools
 import os
-from typing import List
+from collections import deque
+from typing import Container, List
 from google.protobuf import descriptor_pb2 as pb2
+from .field_utils import FieldUtils
+from .descriptor_consts import TYPE_MESSAGE, TYPE_ENUM
 
 
 class CppUtils:
@@ -83,6 +87,7 @@ class CppUtils:
         return cpp_name
     
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def simplify_type_in_context(full_type: str, current_ns: str = '', current_msg: str = '') -> str:
         """Simplify a fully qualified type based on current context."""
         # Check if we're in a nested message and the type is a sibling
@@ -116,33 +121,34 @@ class CppUtils:
         msg_map = {msg.name: msg for msg in messages}
 
         # Build dependency graph
-        dependencies = {}
-        for msg in messages:
-            dependencies[msg.name] = CppUtils._get_message_dependencies(msg, messages)
+        dependencies = {msg.name: CppUtils._get_message_dependencies(msg, msg_map) for msg in messages}
 
-        # Perform topological sort using Kahn's algorithm
-        sorted_names = []
-        in_degree = {name: 0 for name in msg_map.keys()}
+        # Messages that reference no other message of the file keep their declaration order
+        if not any(dependencies.values()):
+            return list(messages)
 
-        # Calculate in-degrees
+        # Reverse edges, so each message's dependents are found without rescanning the whole graph
+        dependents = {name: [] for name in msg_map}
         for name, deps in dependencies.items():
             for dep in deps:
-                if dep in in_degree:
-                    in_degree[name] += 1
+                dependents[dep].append(name)
+
+        # Perform topological sort using Kahn's algorithm
+        sorted_names = []
+        in_degree = {name: len(deps) for name, deps in dependencies.items()}
 
         # Start with nodes having no dependencies
-        queue = [name for name, degree in in_degree.items() if degree == 0]
+        queue = deque(name for name, degree in in_degree.items() if degree == 0)
 
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             sorted_names.append(current)
 
             # Reduce in-degree for dependent nodes
-            for name, deps in dependencies.items():
-                if current in deps:
-                    in_degree[name] -= 1
-                    if in_degree[name] == 0:
-                        queue.append(name)
+            for name in dependents[current]:
+                in_degree[name] -= 1
+                if in_degree[name] == 0:
+                    queue.append(name)
 
         # Check for cycles
         if len(sorted_names) != len(messages):
@@ -154,23 +160,18 @@ class CppUtils:
         return [msg_map[name] for name in sorted_names]
 
     @staticmethod
-    def _get_message_dependencies(message: pb2.DescriptorProto, all_messages: List[pb2.DescriptorProto]) -> List[str]:
-        """Get list of message names that this message depends on."""
+    def _get_message_dependencies(message: pb2.DescriptorProto, message_names: Container[str]) -> List[str]:
+        """Get list of message names in message_names that this message depends on."""
         dependencies = set()
 
         # Check all fields
         for field in message.field:
-            if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
-                type_name = field.type_name
-                # Extract the simple message name from the full type name
-                if type_name.startswith('.'):
-                    type_name = type_name[1:]
-                # Convert from proto format (package.MessageName) to just MessageName
-                simple_name = type_name.split('.')[-1]
+            if field.type in (TYPE_MESSAGE, TYPE_ENUM):
+                # Convert from proto format (.package.MessageName) to just MessageName
+                simple_name = FieldUtils.get_short_type_name(field.type_name)
 
                 # Only add dependency if it's another message in this file
-                for msg in all_messages:
-                    if msg.name == simple_name and msg.name != message.name:
-                        dependencies.add(simple_name)
+                if simple_name != message.name and simple_name in message_names:
+                    dependencies.add(simple_name)
 
         return list(dependencies)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+FieldDescriptorProto type and label values shared by the C++ backend.
+Bound once at module level so per-field checks are plain global loads.
+"""
+
+from google.protobuf import descriptor_pb2 as pb2
+
+
+TYPE_DOUBLE = pb2.FieldDescriptorProto.TYPE_DOUBLE
+TYPE_FLOAT = pb2.FieldDescriptorProto.TYPE_FLOAT
+TYPE_INT64 = pb2.FieldDescriptorProto.TYPE_INT64
+TYPE_UINT64 = pb2.FieldDescriptorProto.TYPE_UINT64
+TYPE_INT32 = pb2.FieldDescriptorProto.TYPE_INT32
+TYPE_FIXED64 = pb2.FieldDescriptorProto.TYPE_FIXED64
+TYPE_FIXED32 = pb2.FieldDescriptorProto.TYPE_FIXED32
+TYPE_BOOL = pb2.FieldDescriptorProto.TYPE_BOOL
+TYPE_STRING = pb2.FieldDescriptorProto.TYPE_STRING
+TYPE_GROUP = pb2.FieldDescriptorProto.TYPE_GROUP
+TYPE_MESSAGE = pb2.FieldDescriptorProto.TYPE_MESSAGE
+TYPE_BYTES = pb2.FieldDescriptorProto.TYPE_BYTES
+TYPE_UINT32 = pb2.FieldDescriptorProto.TYPE_UINT32
+TYPE_ENUM = pb2.FieldDescriptorProto.TYPE_ENUM
+TYPE_SFIXED32 = pb2.FieldDescriptorProto.TYPE_SFIXED32
+TYPE_SFIXED64 = pb2.FieldDescriptorProto.TYPE_SFIXED64
+TYPE_SINT32 = pb2.FieldDescriptorProto.TYPE_SINT32
+TYPE_SINT64 = pb2.FieldDescriptorProto.TYPE_SINT64
+
+LABEL_OPTIONAL = pb2.FieldDescriptorProto.LABEL_OPTIONAL
+LABEL_REQUIRED = pb2.FieldDescriptorProto.LABEL_REQUIRED
+LABEL_REPEATED = pb2.FieldDescriptorProto.LABEL_REPEATED
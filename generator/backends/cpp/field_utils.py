@@ -3,9 +3,29 @@
 Field inspection utilities for protobuf descriptors.
 """
 
-from typing import List
+import functools
+from typing import FrozenSet, List
 from google.protobuf import descriptor_pb2 as pb2
-from .models import MapFieldInfo, OneofInfo
+from .models import MapFieldInfo, MessageLayout, OneofInfo
+from .descriptor_consts import (
+    TYPE_DOUBLE, TYPE_FLOAT, TYPE_INT64, TYPE_UINT64, TYPE_INT32, TYPE_FIXED64, TYPE_FIXED32,
+    TYPE_BOOL, TYPE_STRING, TYPE_GROUP, TYPE_MESSAGE, TYPE_BYTES, TYPE_UINT32, TYPE_ENUM,
+    TYPE_SFIXED32, TYPE_SFIXED64, TYPE_SINT32, TYPE_SINT64, LABEL_OPTIONAL, LABEL_REQUIRED,
+    LABEL_REPEATED
+)
+
+
+# Wire-format groupings for packing, built once instead of per call
+_UNPACKABLE_TYPES: FrozenSet[int] = frozenset({TYPE_STRING, TYPE_BYTES, TYPE_MESSAGE, TYPE_GROUP})
+_PACKED_NUMERIC_TYPES: FrozenSet[int] = frozenset({
+    TYPE_INT32, TYPE_INT64,
+    TYPE_UINT32, TYPE_UINT64,
+    TYPE_SINT32, TYPE_SINT64,
+    TYPE_BOOL, TYPE_ENUM,
+    TYPE_FIXED32, TYPE_SFIXED32,
+    TYPE_FIXED64, TYPE_SFIXED64,
+    TYPE_FLOAT, TYPE_DOUBLE,
+})
 
 
 class FieldUtils:
@@ -14,30 +34,30 @@ class FieldUtils:
     @staticmethod
     def is_message_type(field: pb2.FieldDescriptorProto) -> bool:
         """Check if field is a message type."""
-        return field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE
+        return field.type == TYPE_MESSAGE
     
     @staticmethod
     def is_enum_type(field: pb2.FieldDescriptorProto) -> bool:
         """Check if field is an enum type."""
-        return field.type == pb2.FieldDescriptorProto.TYPE_ENUM
+        return field.type == TYPE_ENUM
     
     @staticmethod
     def is_repeated(field: pb2.FieldDescriptorProto) -> bool:
         """Check if field is repeated."""
-        return field.label == pb2.FieldDescriptorProto.LABEL_REPEATED
+        return field.label == LABEL_REPEATED
     
     @staticmethod
     def is_map_field(message_proto: pb2.DescriptorProto, 
                      field_proto: pb2.FieldDescriptorProto) -> bool:
         """Check if field is a map field (TYPE_MESSAGE with map_entry option)."""
-        if field_proto.type != pb2.FieldDescriptorProto.TYPE_MESSAGE:
+        if field_proto.type != TYPE_MESSAGE:
             return False
         
         # Find the nested type for this field
-        type_name = field_proto.type_name.split('.')[-1]
+        type_name = FieldUtils.get_short_type_name(field_proto.type_name)
         for nested_type in message_proto.nested_type:
             if nested_type.name == type_name:
-                return nested_type.options.map_entry if nested_type.HasField('options') else False
+                return nested_type.options.map_entry
         return False
     
     @staticmethod
@@ -45,8 +65,8 @@ class FieldUtils:
         """Determine if a field should use std::optional."""
         if syntax == 'proto2':
             # Proto2: REQUIRED and OPTIONAL fields use std::optional
-            return field.label in (pb2.FieldDescriptorProto.LABEL_REQUIRED,
-                                   pb2.FieldDescriptorProto.LABEL_OPTIONAL)
+            return field.label in (LABEL_REQUIRED,
+                                   LABEL_OPTIONAL)
         else:  # proto3
             # Proto3: Only explicitly optional fields use std::optional
             return field.proto3_optional if hasattr(field, 'proto3_optional') else False
@@ -54,20 +74,47 @@ class FieldUtils:
     @staticmethod
     def extract_maps_from_message(message: pb2.DescriptorProto) -> List[MapFieldInfo]:
         """Extract map field information from a message descriptor."""
-        maps = []
+        return FieldUtils.get_message_layout(message).maps
+    
+    @staticmethod
+    def extract_oneofs_from_message(message: pb2.DescriptorProto) -> List[OneofInfo]:
+        """Extract oneof information from a message descriptor."""
+        return FieldUtils.get_message_layout(message).oneofs
+    
+    @staticmethod
+    def get_non_oneof_fields(message: pb2.DescriptorProto) -> List[pb2.FieldDescriptorProto]:
+        """Get all fields that are not part of a oneof or map entry."""
+        return FieldUtils.get_message_layout(message).regular_fields
+    
+    @staticmethod
+    def get_message_layout(message: pb2.DescriptorProto) -> MessageLayout:
+        """
+        Get the regular, map and oneof fields of a message.
         
-        # Find map entry nested types
+        All three groups come from a single pass over the descriptor, so
+        callers should read the layout once per message and keep it.
+        """
+        # Map fields refer to nested map entry types
         map_entries = {}
         for nested_type in message.nested_type:
-            if nested_type.HasField('options') and nested_type.options.map_entry:
+            if nested_type.options.map_entry:
                 map_entries[nested_type.name] = nested_type
         
-        # Find fields that use these map entries
+        regular_fields = []
+        maps = []
+        oneof_fields_map = {}
         for field in message.field:
-            if field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
-                type_name = field.type_name.split('.')[-1]
-                if type_name in map_entries:
-                    map_entry = map_entries[type_name]
+            if field.HasField('oneof_index'):
+                # Proto3 optional fields have proto3_optional=True and use synthetic oneofs internally
+                # They are regular optional fields, not oneof members
+                is_proto3_optional = field.proto3_optional if hasattr(field, 'proto3_optional') else False
+                if not is_proto3_optional:
+                    oneof_fields_map.setdefault(field.oneof_index, []).append(field)
+                    continue
+            
+            if field.type == TYPE_MESSAGE:
+                map_entry = map_entries.get(FieldUtils.get_short_type_name(field.type_name))
+                if map_entry is not None:
                     # Map entries have exactly 2 fields: key (number 1) and value (number 2)
                     key_field = None
                     value_field = None
@@ -84,30 +131,12 @@ class FieldUtils:
                             key_field=key_field,
                             value_field=value_field
                         ))
+                    continue
+            
+            regular_fields.append(field)
         
-        return maps
-    
-    @staticmethod
-    def extract_oneofs_from_message(message: pb2.DescriptorProto) -> List[OneofInfo]:
-        """Extract oneof information from a message descriptor."""
+        # Oneofs in declaration order
         oneofs = []
-        
-        # Build a map of oneof index to fields
-        oneof_fields_map = {}
-        for field in message.field:
-            if field.HasField('oneof_index'):
-                # Proto3 optional fields have proto3_optional=True and use synthetic oneofs internally
-                # They should NOT be treated as oneof fields
-                is_proto3_optional = field.proto3_optional if hasattr(field, 'proto3_optional') else False
-                if is_proto3_optional:
-                    continue  # Skip proto3 optional fields
-                
-                oneof_idx = field.oneof_index
-                if oneof_idx not in oneof_fields_map:
-                    oneof_fields_map[oneof_idx] = []
-                oneof_fields_map[oneof_idx].append(field)
-        
-        # Create oneof structures
         for idx, oneof_decl in enumerate(message.oneof_decl):
             if idx in oneof_fields_map:
                 oneofs.append(OneofInfo(
@@ -115,76 +144,40 @@ class FieldUtils:
                     fields=oneof_fields_map[idx]
                 ))
         
-        return oneofs
-    
-    @staticmethod
-    def get_non_oneof_fields(message: pb2.DescriptorProto) -> List[pb2.FieldDescriptorProto]:
-        """Get all fields that are not part of a oneof or map entry."""
-        # Get map entry names
-        map_entry_names = set()
-        for nested_type in message.nested_type:
-            if nested_type.HasField('options') and nested_type.options.map_entry:
-                map_entry_names.add(nested_type.name)
-        
-        # Filter fields
-        non_oneof_fields = []
-        for field in message.field:
-            # Skip oneof fields (but NOT proto3 optional fields which use synthetic oneofs)
-            if field.HasField('oneof_index'):
-                # Proto3 optional fields have proto3_optional=True and use synthetic oneofs internally
-                # They should be treated as regular optional fields, not oneofs
-                is_proto3_optional = field.proto3_optional if hasattr(field, 'proto3_optional') else False
-                if not is_proto3_optional:
-                    continue  # This is a real oneof field, skip it
-            # Skip map entry fields
-            if field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
-                type_name = field.type_name.split('.')[-1]
-                if type_name in map_entry_names:
-                    continue
-            non_oneof_fields.append(field)
-        
-        return non_oneof_fields
+        return MessageLayout(regular_fields=regular_fields, maps=maps, oneofs=oneofs)
     
     @staticmethod
     def is_field_packed(field: pb2.FieldDescriptorProto, syntax: str) -> bool:
         """Determine if a repeated field should be packed."""
         # Only repeated fields can be packed
-        if field.label != pb2.FieldDescriptorProto.LABEL_REPEATED:
+        if field.label != LABEL_REPEATED:
             return False
         
         # Strings, bytes, messages are NEVER packed
-        if field.type in (pb2.FieldDescriptorProto.TYPE_STRING, 
-                         pb2.FieldDescriptorProto.TYPE_BYTES, 
-                         pb2.FieldDescriptorProto.TYPE_MESSAGE, 
-                         pb2.FieldDescriptorProto.TYPE_GROUP):
+        if field.type in _UNPACKABLE_TYPES:
             return False
         
         # Check if field has explicit packed option
-        if field.HasField('options') and field.options.HasField('packed'):
+        if field.options.HasField('packed'):
             return field.options.packed
         
         # Proto3: All numeric repeated fields are packed by default
         # Proto2: Only packed if field has [packed = true] option (which we checked above)
         if syntax == 'proto3':
             # In proto3, numeric/enum repeated fields are packed by default
-            return field.type in (
-                pb2.FieldDescriptorProto.TYPE_INT32, pb2.FieldDescriptorProto.TYPE_INT64,
-                pb2.FieldDescriptorProto.TYPE_UINT32, pb2.FieldDescriptorProto.TYPE_UINT64,
-                pb2.FieldDescriptorProto.TYPE_SINT32, pb2.FieldDescriptorProto.TYPE_SINT64,
-                pb2.FieldDescriptorProto.TYPE_BOOL, pb2.FieldDescriptorProto.TYPE_ENUM,
-                pb2.FieldDescriptorProto.TYPE_FIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED32,
-                pb2.FieldDescriptorProto.TYPE_FIXED64, pb2.FieldDescriptorProto.TYPE_SFIXED64,
-                pb2.FieldDescriptorProto.TYPE_FLOAT, pb2.FieldDescriptorProto.TYPE_DOUBLE
-            )
+            return field.type in _PACKED_NUMERIC_TYPES
         else:
             # Proto2: not packed by default (only if explicit)
             return False
     
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def get_short_type_name(type_name: str) -> str:
+        """Get the last component of a (possibly fully qualified) type_name."""
+        return type_name.rpartition('.')[2]
+    
     @staticmethod
     def get_group_type_name(type_name: str) -> str:
         """Extract the group type name from a type_name."""
-        if type_name.startswith('.'):
-            type_name = type_name[1:]
         # Groups are typically named like "MessageName.GroupName"
-        parts = type_name.split('.')
-        return parts[-1] if parts else 'UnknownGroup'
+        return FieldUtils.get_short_type_name(type_name)
@@ -5,13 +5,14 @@ Generates C++ header and implementation files from protobuf descriptors.
 """
 
 import os
-from typing import List
+from typing import Any, Dict, List, Optional, TextIO
 from jinja2 import Environment, FileSystemLoader
 from google.protobuf import descriptor_pb2 as pb2
 
 from ..base import LanguageGenerator
 from .cpp_utils import CppUtils
 from .message_codegen import MessageCodegen
+from .models import CodegenOptions
 from .serialization_codegen import SerializationCodegen
 from .type_mapper import TypeMapper
 from ...core.proto_parser import ProtoParser
@@ -20,34 +21,51 @@ from ...core.proto_parser import ProtoParser
 class CppGenerator(LanguageGenerator):
     """Generate C++ code from parsed protobuf structures."""
     
-    def __init__(self, namespace_prefix: str = ''):
+    def __init__(self, namespace_prefix: str = '', options: Optional[CodegenOptions] = None):
         """Initialize the generator with templates.
         
         Args:
             namespace_prefix: Optional prefix to add to all namespaces (e.g., "litepb_")
+            options: Code generation switches (defaults to CodegenOptions())
         """
         self.current_proto = None  # Track current proto for context (FileDescriptorProto)
         self.namespace_prefix = namespace_prefix
-        self.parser = ProtoParser()
+        self.options = options or CodegenOptions()
+        self._parser = None
         self.setup_templates()
     
+    @property
+    def parser(self) -> ProtoParser:
+        """Proto parser, created on first use since generation itself never needs it."""
+        if self._parser is None:
+            self._parser = ProtoParser()
+        return self._parser
+    
     def setup_templates(self):
         """Set up Jinja2 templates for code generation."""
         template_dir = os.path.join(os.path.dirname(__file__), 'templates')
-        self.env = Environment(loader=FileSystemLoader(template_dir))
+        # Templates ship with the package, so skip Jinja's per-lookup mtime check
+        self.env = Environment(loader=FileSystemLoader(template_dir), auto_reload=False)
         
-        # Register custom functions - they'll be called with current_proto context
-        self.env.globals['generate_enum'] = self.generate_enum
-        self.env.globals['generate_message'] = self.generate_message
-        self.env.globals['generate_message_declaration'] = self.generate_message_declaration
-        self.env.globals['generate_message_definition'] = self.generate_message_definition
-        self.env.globals['generate_serializer_spec'] = self.generate_serializer_spec
+        # Register custom functions - they'll be called with current_proto context.
+        # Header code is rendered in Python up front and passed in as strings.
         self.env.globals['generate_serializer_impl'] = self.generate_serializer_impl
+        
+        # Compile both templates once and reuse them for every file
+        self.header_template = self.env.get_template('header.j2')
+        self.source_template = self.env.get_template('source.j2')
     
     def generate_header(self, file_proto: pb2.FileDescriptorProto, filename: str) -> str:
         """Generate C++ header file content."""
+        return self.header_template.render(**self._header_context(file_proto, filename))
+    
+    def write_header(self, file_proto: pb2.FileDescriptorProto, filename: str, out: TextIO) -> None:
+        """Stream C++ header file content to out as the template renders it."""
+        self.header_template.stream(**self._header_context(file_proto, filename)).dump(out)
+    
+    def _header_context(self, file_proto: pb2.FileDescriptorProto, filename: str) -> Dict[str, Any]:
+        """Build the header template context for a proto file."""
         self.current_proto = file_proto  # Set context for type generation
-        template = self.env.get_template('header.j2')
         
         # Convert imports to include paths
         import_includes = []
@@ -66,83 +84,89 @@ class CppGenerator(LanguageGenerator):
         messages = list(file_proto.message_type)
         sorted_messages = CppUtils.topological_sort_messages(messages)
         
-        # Get namespace prefix before using it
-        namespace_prefix = CppUtils.get_namespace_prefix(file_proto.package if file_proto.package else '', self.namespace_prefix)
+        package = file_proto.package
+        
+        # Create serialization codegen instance for global serializer generation
+        serialization_codegen = SerializationCodegen(file_proto, self.namespace_prefix, self.options)
         
         # For serialization, we need just the package namespace path without the wrapper
         # When there's a wrapper namespace, serializers should reference types without it
-        package_ns = file_proto.package.replace('.', '::') if file_proto.package else ''
-        
-        # Create serialization codegen instance for global serializer generation
-        serialization_codegen = SerializationCodegen(file_proto, self.namespace_prefix)
+        package_ns = serialization_codegen.package_ns
         serializer_forward_declarations = serialization_codegen.generate_all_serializer_forward_declarations(sorted_messages, package_ns)
         serializers_code = serialization_codegen.generate_all_serializers(sorted_messages, package_ns, True)
         
+        # Render enum and message definitions here rather than calling back from the
+        # template once per item; each one is followed by a blank line
+        message_codegen = MessageCodegen(file_proto, self.namespace_prefix, self.options)
+        enum_definitions = ''.join(f'\n{message_codegen.generate_enum(enum)}\n' for enum in file_proto.enum_type)
+        message_definitions = ''.join(f'\n{message_codegen.generate_message_definition(message)}\n'
+                                      for message in sorted_messages)
+        
         # Prepare context
-        context = {
+        return {
             'header_guard': CppUtils.get_header_guard(filename),
-            'package': file_proto.package if file_proto.package else '',
-            'namespace_parts': CppUtils.get_namespace_parts(file_proto.package if file_proto.package else '', self.namespace_prefix),
+            'package': package,
+            'namespace_parts': CppUtils.get_namespace_parts(package, self.namespace_prefix),
             'namespace_prefix': self.namespace_prefix,  # Pass the raw prefix string for wrapper namespace
             'imports': import_includes,
-            'enums': list(file_proto.enum_type),
+            'enum_definitions': enum_definitions,
             'messages': sorted_messages,
+            'message_definitions': message_definitions,
             'serializer_forward_declarations': serializer_forward_declarations,
             'serializers_code': serializers_code,
+            'ordered_maps': self.options.ordered_maps,
         }
-        
-        return template.render(**context)
     
     def generate_implementation(self, file_proto: pb2.FileDescriptorProto, filename: str) -> str:
         """Generate C++ implementation file content."""
+        return self.source_template.render(**self._implementation_context(file_proto, filename))
+    
+    def write_implementation(self, file_proto: pb2.FileDescriptorProto, filename: str, out: TextIO) -> None:
+        """Stream C++ implementation file content to out as the template renders it."""
+        self.source_template.stream(**self._implementation_context(file_proto, filename)).dump(out)
+    
+    def _implementation_context(self, file_proto: pb2.FileDescriptorProto, filename: str) -> Dict[str, Any]:
+        """Build the source template context for a proto file."""
         self.current_proto = file_proto  # Set context for type generation
-        template = self.env.get_template('source.j2')
         
         # Prepare context
-        context = {
+        return {
             'include_file': CppUtils.get_include_filename(filename),
-            'namespace_prefix': CppUtils.get_namespace_prefix(file_proto.package if file_proto.package else '', self.namespace_prefix),
+            'namespace_prefix': CppUtils.get_namespace_prefix(file_proto.package, self.namespace_prefix),
             'messages': list(file_proto.message_type),
         }
-        
-        return template.render(**context)
     
     # Template helper methods - these are called by Jinja templates with current_proto already set
     
     def generate_enum(self, enum_proto: pb2.EnumDescriptorProto, indent: int = 0) -> str:
         """Generate enum definition."""
         assert self.current_proto is not None, "current_proto must be set before generating enum"
-        message_codegen = MessageCodegen(self.current_proto, self.namespace_prefix)
+        message_codegen = MessageCodegen(self.current_proto, self.namespace_prefix, self.options)
         return message_codegen.generate_enum(enum_proto, indent)
     
     def generate_message(self, message: pb2.DescriptorProto, indent: int = 0) -> str:
         """Generate message struct definition (legacy method, prefer generate_message_definition)."""
-        # Just delegate to generate_message_definition and adjust indentation
-        definition = self.generate_message_definition(message)
-        if indent == 0:
-            return definition
-        
-        # Add indentation
-        ind = '    ' * indent
-        lines = definition.split('\n')
-        return '\n'.join(f'{ind}{line}' if line.strip() else '' for line in lines)
+        assert self.current_proto is not None, "current_proto must be set before generating message"
+        # The indent is applied while the lines are built instead of re-indenting the result
+        message_codegen = MessageCodegen(self.current_proto, self.namespace_prefix, self.options)
+        return message_codegen.generate_message_definition(message, indent)
     
     def generate_message_declaration(self, message: pb2.DescriptorProto) -> str:
         """Generate forward declaration for a message and its nested types."""
         assert self.current_proto is not None, "current_proto must be set before generating message declaration"
-        message_codegen = MessageCodegen(self.current_proto, self.namespace_prefix)
+        message_codegen = MessageCodegen(self.current_proto, self.namespace_prefix, self.options)
         return message_codegen.generate_message_declaration(message)
 
     def generate_message_definition(self, message: pb2.DescriptorProto) -> str:
         """Generate complete definition for a message."""
         assert self.current_proto is not None, "current_proto must be set before generating message definition"
-        message_codegen = MessageCodegen(self.current_proto, self.namespace_prefix)
+        message_codegen = MessageCodegen(self.current_proto, self.namespace_prefix, self.options)
         return message_codegen.generate_message_definition(message)
 
     def generate_serializer_spec(self, message: pb2.DescriptorProto, ns_prefix: str, inline: bool) -> str:
         """Generate serializer specialization for a message and its nested messages."""
         assert self.current_proto is not None, "current_proto must be set before generating serializer spec"
-        serialization_codegen = SerializationCodegen(self.current_proto)
+        serialization_codegen = SerializationCodegen(self.current_proto, self.namespace_prefix, self.options)
         return serialization_codegen.generate_serializer_spec(message, ns_prefix, inline)
     
     def generate_serializer_impl(self, message: pb2.DescriptorProto, ns_prefix: str) -> str:
@@ -3,24 +3,34 @@
 Message and enum code generation for C++.
 """
 
+from typing import List, Optional
 from google.protobuf import descriptor_pb2 as pb2
 from .type_mapper import TypeMapper
 from .cpp_utils import CppUtils
 from .field_utils import FieldUtils
+from .models import CodegenOptions
+from .descriptor_consts import TYPE_GROUP, TYPE_MESSAGE, TYPE_ENUM, LABEL_REPEATED
 
 
 class MessageCodegen:
     """Generate C++ code for messages and enums."""
     
-    def __init__(self, current_proto: pb2.FileDescriptorProto, namespace_prefix: str = ''):
+    def __init__(self, current_proto: pb2.FileDescriptorProto, namespace_prefix: str = '',
+                 options: Optional[CodegenOptions] = None):
         """Initialize with current proto context.
         
         Args:
             current_proto: The FileDescriptorProto being processed
             namespace_prefix: Optional prefix to add to all namespaces
+            options: Code generation switches (defaults to CodegenOptions())
         """
         self.current_proto = current_proto
         self.namespace_prefix = namespace_prefix
+        self.options = options or CodegenOptions()
+        # Read once per file; every field below consults them
+        self.package = current_proto.package
+        self.package_ns = self.package.replace('.', '::')
+        self.syntax = current_proto.syntax or 'proto2'
     
     def generate_enum(self, enum_proto: pb2.EnumDescriptorProto, indent: int = 0) -> str:
         """Generate enum definition."""
@@ -39,171 +49,169 @@ class MessageCodegen:
     def generate_message_declaration(self, message: pb2.DescriptorProto) -> str:
         """Generate forward declaration for a message and its nested types."""
         lines = []
+        self._append_message_declaration(message, lines)
+        return '\n'.join(lines)
 
+    def _append_message_declaration(self, message: pb2.DescriptorProto, lines: List[str]) -> None:
+        """Append forward declarations for a message and its nested types to lines."""
         # Forward declare this message
         lines.append(f'struct {message.name};')
 
         # Recursively declare nested messages (except map entries)
         for nested_msg in message.nested_type:
-            if not (nested_msg.HasField('options') and nested_msg.options.map_entry):
-                nested_lines = self.generate_message_declaration(nested_msg)
-                lines.extend(nested_lines.split('\n'))
+            if not (nested_msg.options.map_entry):
+                self._append_message_declaration(nested_msg, lines)
 
+    def generate_message_definition(self, message: pb2.DescriptorProto, indent: int = 0) -> str:
+        """Generate complete definition for a message, indented by indent levels."""
+        lines = []
+        self._append_message_definition(message, lines, indent)
         return '\n'.join(lines)
 
-    def generate_message_definition(self, message: pb2.DescriptorProto) -> str:
-        """Generate complete definition for a message."""
-        lines = []
+    def _append_message_definition(self, message: pb2.DescriptorProto, lines: List[str], depth: int) -> None:
+        """Append the definition of a message, nested at the given depth, to lines.
+
+        Nested messages write into the same list with a deeper indent instead of
+        being rendered separately and re-indented line by line.
+        """
+        ind = '    ' * depth
 
         # Get context information
-        package = self.current_proto.package if self.current_proto.package else ''
-        package_ns = package.replace('.', '::') if package else ''
+        package = self.package
+        package_ns = self.package_ns
         # Build full message name from current context
         msg_fqn = f"{package}.{message.name}" if package else message.name
         msg_cpp_fqn = msg_fqn.replace('.', '::')
-        syntax = self.current_proto.syntax if self.current_proto.syntax else 'proto2'
+        syntax = self.syntax
 
-        lines.append(f'struct {message.name} {{')
+        lines.append(f'{ind}struct {message.name} {{')
 
         # Nested enums first (but not map entries)
         for nested_enum in message.enum_type:
-            enum_code = self.generate_enum(nested_enum, 1)
+            enum_code = self.generate_enum(nested_enum, depth + 1)
             lines.append(enum_code)
             lines.append('')
 
         # Forward declare all nested messages (except map entries)
         non_map_nested = [nt for nt in message.nested_type 
-                         if not (nt.HasField('options') and nt.options.map_entry)]
+                         if not (nt.options.map_entry)]
         if non_map_nested:
             for nested_msg in non_map_nested:
-                lines.append(f'    struct {nested_msg.name};')
+                lines.append(f'{ind}    struct {nested_msg.name};')
             lines.append('')
 
         # Nested message definitions (now they can reference each other)
         for nested_msg in non_map_nested:
-            nested_def = self.generate_message_definition(nested_msg)
-            # Indent the nested definition
-            nested_lines = nested_def.split('\n')
-            for line in nested_lines:
-                if line.strip():
-                    lines.append(f'    {line}')
-                else:
-                    lines.append('')
+            self._append_message_definition(nested_msg, lines, depth + 1)
 
         # Get regular fields (not in oneofs, not map entries)
-        regular_fields = FieldUtils.get_non_oneof_fields(message)
+        layout = FieldUtils.get_message_layout(message)
+        regular_fields = layout.regular_fields
         
         for field in regular_fields:
             # Determine if this field should use std::optional
             use_optional = FieldUtils.uses_optional(field, syntax)
 
-            if field.type == pb2.FieldDescriptorProto.TYPE_GROUP:
+            if field.type == TYPE_GROUP:
                 group_name = FieldUtils.get_group_type_name(field.type_name)
-                if field.label == pb2.FieldDescriptorProto.LABEL_REPEATED:
+                if field.label == LABEL_REPEATED:
                     cpp_type = f'std::vector<{group_name}>'
                 elif use_optional:
                     cpp_type = f'std::optional<{group_name}>'
                 else:
                     cpp_type = group_name
-            elif field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
+            elif field.type in (TYPE_MESSAGE, TYPE_ENUM):
                 type_name = field.type_name
                 qualified = TypeMapper.qualify_type_name(type_name, package, msg_fqn)
                 simple_type = CppUtils.simplify_type_in_context(qualified, package_ns, msg_cpp_fqn)
 
-                if field.label == pb2.FieldDescriptorProto.LABEL_REPEATED:
+                if field.label == LABEL_REPEATED:
                     cpp_type = f'std::vector<{simple_type}>'
                 elif use_optional:
                     cpp_type = f'std::optional<{simple_type}>'
                 else:
                     cpp_type = simple_type
             else:
-                base_type = TypeMapper.get_cpp_type(field.type)
+                base_type = TypeMapper.get_cpp_type(field.type, self.options.zero_copy_strings)
 
-                if field.label == pb2.FieldDescriptorProto.LABEL_REPEATED:
+                if field.label == LABEL_REPEATED:
                     cpp_type = f'std::vector<{base_type}>'
                 elif use_optional:
                     cpp_type = f'std::optional<{base_type}>'
                 else:
                     cpp_type = base_type
 
-            default_val = self._get_field_default(field, syntax)
+            default_val = self._get_field_default(field, use_optional)
             if default_val:
-                lines.append(f'    {cpp_type} {field.name} = {default_val};')
+                lines.append(f'{ind}    {cpp_type} {field.name} = {default_val};')
             else:
-                lines.append(f'    {cpp_type} {field.name};')
+                lines.append(f'{ind}    {cpp_type} {field.name};')
 
         # Map fields
-        maps = FieldUtils.extract_maps_from_message(message)
+        maps = layout.maps
         for map_field in maps:
-            key_type = TypeMapper.get_cpp_type(map_field.key_field.type)
+            key_type = TypeMapper.get_cpp_type(map_field.key_field.type, self.options.zero_copy_strings)
 
-            if map_field.value_field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
+            if map_field.value_field.type in (TYPE_MESSAGE, TYPE_ENUM):
                 value_name = map_field.value_field.type_name
                 qualified = TypeMapper.qualify_type_name(value_name, package, msg_fqn)
                 value_type = CppUtils.simplify_type_in_context(qualified, package_ns, msg_cpp_fqn)
             else:
-                value_type = TypeMapper.get_cpp_type(map_field.value_field.type)
+                value_type = TypeMapper.get_cpp_type(map_field.value_field.type, self.options.zero_copy_strings)
 
-            cpp_type = f'std::unordered_map<{key_type}, {value_type}>'
-            lines.append(f'    {cpp_type} {map_field.name};')
+            cpp_type = f'{TypeMapper.get_map_container(self.options.ordered_maps)}<{key_type}, {value_type}>'
+            lines.append(f'{ind}    {cpp_type} {map_field.name};')
 
         # Oneof fields - deduplicate types to avoid std::variant errors
-        oneofs = FieldUtils.extract_oneofs_from_message(message)
+        oneofs = layout.oneofs
         for oneof in oneofs:
             variant_types = ['std::monostate']
             seen_types = set()
             
             for field in oneof.fields:
-                if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
+                if field.type in (TYPE_MESSAGE, TYPE_ENUM):
                     type_name = field.type_name
                     qualified = TypeMapper.qualify_type_name(type_name, package, msg_fqn)
                     field_type = CppUtils.simplify_type_in_context(qualified, package_ns, msg_cpp_fqn)
                 else:
-                    field_type = TypeMapper.get_cpp_type(field.type)
+                    field_type = TypeMapper.get_cpp_type(field.type, self.options.zero_copy_strings)
                 
                 if field_type not in seen_types:
                     variant_types.append(field_type)
                     seen_types.add(field_type)
 
             oneof_type = f'std::variant<{", ".join(variant_types)}>'
-            lines.append(f'    {oneof_type} {oneof.name};')
+            lines.append(f'{ind}    {oneof_type} {oneof.name};')
 
         # Add unknown fields member for forward/backward compatibility
         lines.append('')
-        lines.append('    // Unknown field preservation for forward/backward compatibility')
+        lines.append(f'{ind}    // Unknown field preservation for forward/backward compatibility')
         # Use global scope if we have a namespace prefix to avoid resolution issues
         if self.namespace_prefix:
-            lines.append('    ::litepb::UnknownFieldSet unknown_fields;')
+            lines.append(f'{ind}    ::litepb::UnknownFieldSet unknown_fields;')
         else:
-            lines.append('    litepb::UnknownFieldSet unknown_fields;')
-
-        lines.append('};')
+            lines.append(f'{ind}    litepb::UnknownFieldSet unknown_fields;')
 
-        return '\n'.join(lines)
+        lines.append(f'{ind}}};')
 
-    def _get_field_default(self, field: pb2.FieldDescriptorProto, syntax: str) -> str:
-        """Get default value for field initialization."""
+    def _get_field_default(self, field: pb2.FieldDescriptorProto, use_optional: bool) -> str:
+        """Get default value for field initialization; use_optional is the field's FieldUtils.uses_optional."""
         # Repeated fields don't need initialization (vector has default constructor)
-        if field.label == pb2.FieldDescriptorProto.LABEL_REPEATED:
+        if field.label == LABEL_REPEATED:
             return ''
         
         # Fields wrapped in std::optional don't need initialization
-        if FieldUtils.uses_optional(field, syntax):
+        if use_optional:
             return ''
         
-        if field.HasField('default_value'):
+        if field.default_value:
             # Use TypeMapper.get_default_value with descriptor objects
-            return TypeMapper.get_default_value(field, self.current_proto)
+            return TypeMapper.get_default_value(field, self.package)
         
         # For proto3 implicit fields and proto2 required fields, provide default values
-        if field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
-            # Extract the simple type name from the full type name
-            type_name = field.type_name
-            # Remove leading dot if present
-            if type_name.startswith('.'):
-                type_name = type_name[1:]
+        if field.type == TYPE_ENUM:
             # Get just the enum name (last part after the final dot)
-            simple_name = type_name.split('.')[-1]
+            simple_name = FieldUtils.get_short_type_name(field.type_name)
             return f'static_cast<{simple_name}>(0)'
         
         return TypeMapper.DEFAULT_VALUES.get(field.type, '')
@@ -23,3 +23,38 @@ class OneofInfo:
     """Information about a protobuf oneof field."""
     name: str
     fields: List[pb2.FieldDescriptorProto]
+
+
+@dataclass
+class FieldShape:
+    """How the serializer reaches a regular field; shared by its write, size and read code."""
+    packed: bool
+    uses_optional: bool
+    # 'if (...) ' prefix guarding a singular field, empty when it is always written
+    guard: str
+    # Expression for the singular value, unwrapping std::optional
+    value_expr: str
+
+
+@dataclass
+class MessageLayout:
+    """Fields of a message grouped the way the generated struct and serializer use them."""
+    regular_fields: List[pb2.FieldDescriptorProto]
+    maps: List[MapFieldInfo]
+    oneofs: List[OneofInfo]
+
+
+@dataclass
+class CodegenOptions:
+    """Code generation switches that change the shape of the emitted C++."""
+    # Accept only packed encoding for proto3 repeated scalars that are packed by
+    # default. The unpacked fallback parser is dropped; unpacked input fails to parse.
+    proto3_packed_only: bool = False
+    # Generate map fields as std::map instead of std::unordered_map: no bucket
+    # array, smaller footprint for the few-entry maps typical on embedded
+    # targets, and entries serialized in key order.
+    ordered_maps: bool = False
+    # Map proto string fields to std::string_view pointing into the parsed input
+    # buffer instead of owning std::string. Nested messages are parsed in place,
+    # so parsing needs a stream that supports InputStream::borrow().
+    zero_copy_strings: bool = False
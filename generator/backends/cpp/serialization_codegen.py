@@ -3,30 +3,276 @@
 Serialization and deserialization code generation for C++.
 """
 
-from typing import List, Dict
+import functools
+from typing import List, Dict, Optional, Tuple
 from google.protobuf import descriptor_pb2 as pb2
 from .type_mapper import TypeMapper
 from .field_utils import FieldUtils
-from .models import MapFieldInfo, OneofInfo
+from .models import CodegenOptions, FieldShape, MapFieldInfo, OneofInfo
+from .descriptor_consts import (
+    TYPE_DOUBLE, TYPE_FLOAT, TYPE_INT64, TYPE_UINT64, TYPE_INT32, TYPE_FIXED64, TYPE_FIXED32,
+    TYPE_BOOL, TYPE_STRING, TYPE_GROUP, TYPE_MESSAGE, TYPE_BYTES, TYPE_UINT32, TYPE_ENUM,
+    TYPE_SFIXED32, TYPE_SFIXED64, TYPE_SINT32, TYPE_SINT64, LABEL_REPEATED
+)
+
+
+# Largest encoded size of a map entry part by encoding kind; a length prefix is a varint
+_MAP_PART_MAX_SIZES = {'varint': 10, 'varint32': 5, 'fixed32': 4, 'fixed64': 8, 'length': 10}
+
+# Closing part of every generated serialize(): unknown fields are written back last.
+_SERIALIZE_UNKNOWN_FIELD_TAIL = '\n'.join((
+    '        // Serialize unknown fields for forward/backward compatibility',
+    '        if (!value.unknown_fields.empty()) {',
+    '            if (LITEPB_UNLIKELY(!value.unknown_fields.serialize_to(stream))) return false;',
+    '        }',
+    '        return true;',
+    '    }',
+    '',
+))
+
+# Write shapes used by generate_field_write(), filled in with str.format. {tag} is the
+# field tag pre-encoded by TypeMapper.get_tag_bytes() and {body} is the already
+# indented code that writes one tagged value, see _generate_tagged_write().
+_PACKED_WRITE_TMPL = '\n'.join((
+    '        if (!value.{name}.empty()) {{',
+    '            // Calculate packed size',
+    '{size}',
+    '            ',
+    '            // Write tag with LENGTH_DELIMITED wire type',
+    '            writer.write_raw<{tag}>();  // field {number}, litepb::WIRE_TYPE_LENGTH_DELIMITED',
+    '            writer.write_varint(packed_size);',
+    '            ',
+    '            // Write all values without tags',
+    '            for (const auto& item : value.{name}) {{',
+    '                {write}',
+    '            }}',
+    '        }}',
+))
+_PACKED_CONSTANT_SIZE_TMPL = '            size_t packed_size = value.{name}.size() * {item_size};'
+_PACKED_SUMMED_SIZE_TMPL = '\n'.join((
+    '            size_t packed_size = 0;',
+    '            for (const auto& item : value.{name}) {{',
+    '                packed_size += {size_expr};',
+    '            }}',
+))
+_REPEATED_WRITE_TMPL = '\n'.join((
+    '        for (const auto& item : value.{name}) {{',
+    '{body}',
+    '        }}',
+))
+_SINGLE_WRITE_TMPL = '\n'.join((
+    '        {guard}{{',
+    '{body}',
+    '        }}',
+))
+
+# ProtoWriter methods that write a pre-encoded tag and a fixed-size value in one stream
+# write; other field types write the tag with write_raw() and then the value.
+_FUSED_FIELD_WRITERS = {
+    TYPE_BOOL: 'write_bool_field',
+    TYPE_FIXED32: 'write_fixed32_field',
+    TYPE_SFIXED32: 'write_fixed32_field',
+    TYPE_FLOAT: 'write_fixed32_field',
+    TYPE_FIXED64: 'write_fixed64_field',
+    TYPE_SFIXED64: 'write_fixed64_field',
+    TYPE_DOUBLE: 'write_fixed64_field',
+}
+
+# Size shapes used by generate_field_size(), mirroring the write shapes above. {body} adds
+# one value, tag included, to size.
+_PACKED_BYTE_SIZE_TMPL = '\n'.join((
+    '        if (!value.{name}.empty()) {{',
+    '{size}',
+    '            size += {tag_size} + litepb::ProtoWriter::varint_size(packed_size) + packed_size;',
+    '        }}',
+))
+_REPEATED_CONSTANT_BYTE_SIZE_TMPL = '        size += value.{name}.size() * {item_size};'
+_REPEATED_BYTE_SIZE_TMPL = '\n'.join((
+    '        for (const auto& item : value.{name}) {{',
+    '{body}',
+    '        }}',
+))
+_SINGLE_BYTE_SIZE_TMPL = '\n'.join((
+    '        {guard}{{',
+    '{body}',
+    '        }}',
+))
+
+# Closing part of every generated byte_size(); counterpart of _SERIALIZE_UNKNOWN_FIELD_TAIL.
+_BYTE_SIZE_UNKNOWN_FIELD_TAIL = '\n'.join((
+    '        size += value.unknown_fields.byte_size();',
+    '        return size;',
+    '    }',
+    '',
+))
+
+# Packed repeated read: the run length, then one ProtoReader call that decodes the whole
+# run. Shared by the packed-only and the packed-or-unpacked read cases.
+_PACKED_READ_TMPL = '\n'.join((
+    '                        // Packed repeated field',
+    '                        uint64_t length;',
+    '                        if (LITEPB_UNLIKELY(!reader.read_varint(length))) return false;',
+    '                        if (LITEPB_UNLIKELY(!reader.{method}(value.{name}, static_cast<size_t>(length)))) return false;',
+))
+
+# ProtoReader method that decodes a packed run of each packable field type
+_PACKED_READERS = {
+    TYPE_INT32: 'read_packed_varints',
+    TYPE_INT64: 'read_packed_varints',
+    TYPE_UINT32: 'read_packed_varints',
+    TYPE_UINT64: 'read_packed_varints',
+    TYPE_BOOL: 'read_packed_varints',
+    TYPE_ENUM: 'read_packed_varints',
+    TYPE_SINT32: 'read_packed_sint32',
+    TYPE_SINT64: 'read_packed_sint64',
+    TYPE_FIXED32: 'read_packed_fixed',
+    TYPE_SFIXED32: 'read_packed_fixed',
+    TYPE_FLOAT: 'read_packed_fixed',
+    TYPE_FIXED64: 'read_packed_fixed',
+    TYPE_SFIXED64: 'read_packed_fixed',
+    TYPE_DOUBLE: 'read_packed_fixed',
+}
+
+# Closing part of every generated parse(): the default case stores unrecognized fields in
+# value.unknown_fields, then the switch, loop, method and class are closed. It does not
+# depend on the message, so it is built once at import instead of line by line per message.
+_PARSE_UNKNOWN_FIELD_TAIL = '\n'.join((
+    '                default: {',
+    '                    // Capture unknown field for forward/backward compatibility',
+    '                    std::vector<uint8_t> unknown_data;',
+    '                    if (LITEPB_UNLIKELY(!reader.capture_unknown_field(wire_type, unknown_data))) return false;',
+    '                    ',
+    '                    // Store in UnknownFieldSet based on wire type',
+    '                    switch (wire_type) {',
+    '                        case litepb::WIRE_TYPE_VARINT: {',
+    '                            // Decode varint from captured data',
+    '                            uint64_t varint_value = 0;',
+    '                            size_t shift = 0;',
+    '                            for (size_t i = 0; i < unknown_data.size() && i < 10; ++i) {',
+    '                                varint_value |= static_cast<uint64_t>(unknown_data[i] & 0x7F) << shift;',
+    '                                if ((unknown_data[i] & 0x80) == 0) break;',
+    '                                shift += 7;',
+    '                            }',
+    '                            value.unknown_fields.add_varint(field_number, varint_value);',
+    '                            break;',
+    '                        }',
+    '                        case litepb::WIRE_TYPE_FIXED32: {',
+    '                            if (unknown_data.size() >= 4) {',
+    '                                uint32_t fixed32_value = ',
+    '                                    static_cast<uint32_t>(unknown_data[0]) |',
+    '                                    (static_cast<uint32_t>(unknown_data[1]) << 8) |',
+    '                                    (static_cast<uint32_t>(unknown_data[2]) << 16) |',
+    '                                    (static_cast<uint32_t>(unknown_data[3]) << 24);',
+    '                                value.unknown_fields.add_fixed32(field_number, fixed32_value);',
+    '                            }',
+    '                            break;',
+    '                        }',
+    '                        case litepb::WIRE_TYPE_FIXED64: {',
+    '                            if (unknown_data.size() >= 8) {',
+    '                                uint64_t fixed64_value = 0;',
+    '                                for (int i = 0; i < 8; ++i) {',
+    '                                    fixed64_value |= static_cast<uint64_t>(unknown_data[i]) << (i * 8);',
+    '                                }',
+    '                                value.unknown_fields.add_fixed64(field_number, fixed64_value);',
+    '                            }',
+    '                            break;',
+    '                        }',
+    '                        case litepb::WIRE_TYPE_LENGTH_DELIMITED: {',
+    '                            // Extract actual data (skip length prefix)',
+    '                            size_t pos = 0;',
+    '                            uint64_t len = 0;',
+    '                            int shift = 0;',
+    '                            while (pos < unknown_data.size() && pos < 10) {',
+    '                                len |= static_cast<uint64_t>(unknown_data[pos] & 0x7F) << shift;',
+    '                                if ((unknown_data[pos] & 0x80) == 0) {',
+    '                                    pos++;',
+    '                                    break;',
+    '                                }',
+    '                                shift += 7;',
+    '                                pos++;',
+    '                            }',
+    '                            if (pos < unknown_data.size()) {',
+    '                                value.unknown_fields.add_length_delimited(field_number, ',
+    '                                    unknown_data.data() + pos, unknown_data.size() - pos);',
+    '                            }',
+    '                            break;',
+    '                        }',
+    '                        case litepb::WIRE_TYPE_START_GROUP: {',
+    '                            value.unknown_fields.add_group(field_number, ',
+    '                                unknown_data.data(), unknown_data.size());',
+    '                            break;',
+    '                        }',
+    '                        default:',
+    '                            break;',
+    '                    }',
+    '                    break;',
+    '                }',
+    '            }',
+    '        }',
+    '        return true;',
+    '    }',
+    '};',
+))
 
 
 class SerializationCodegen:
     """Generate C++ serialization/deserialization code."""
     
-    def __init__(self, current_proto: pb2.FileDescriptorProto, namespace_prefix: str = ''):
+    def __init__(self, current_proto: pb2.FileDescriptorProto, namespace_prefix: str = '',
+                 options: Optional[CodegenOptions] = None):
         """Initialize with current proto context.
         
         Args:
             current_proto: The FileDescriptorProto being processed
             namespace_prefix: Optional prefix to add to all namespaces
+            options: Code generation switches (defaults to CodegenOptions())
         """
         self.current_proto = current_proto
         self.namespace_prefix = namespace_prefix
+        # Read once per file; every field below consults them
+        self.package = current_proto.package
+        self.package_ns = self.package.replace('.', '::')
+        self.syntax = current_proto.syntax or 'proto2'
+        self.options = options or CodegenOptions()
+        # Field shapes keyed by id(field); the descriptor is kept so its id stays unique
+        self._field_shapes: Dict[int, Tuple[pb2.FieldDescriptorProto, FieldShape]] = {}
+    
+    def _field_shape(self, field: pb2.FieldDescriptorProto) -> FieldShape:
+        """Get the packing, presence guard and value expression of a field, computed once per field."""
+        cached = self._field_shapes.get(id(field))
+        if cached is not None and cached[0] is field:
+            return cached[1]
+        
+        field_name = field.name
+        syntax = self.syntax
+        uses_optional = FieldUtils.uses_optional(field, syntax)
+        if uses_optional:
+            # Field with std::optional wrapper
+            guard = f'if (value.{field_name}.has_value()) '
+            value_expr = f'value.{field_name}.value()'
+        else:
+            # Proto3 singular field or proto2 required field; proto3 skips default values,
+            # and a field that is present in the message usually holds a non-default one
+            default_check = TypeMapper.get_default_check(field) if syntax == 'proto3' else ''
+            guard = f'if (LITEPB_LIKELY({default_check})) ' if default_check else ''
+            value_expr = f'value.{field_name}'
+        
+        shape = FieldShape(packed=FieldUtils.is_field_packed(field, syntax), uses_optional=uses_optional,
+                           guard=guard, value_expr=value_expr)
+        self._field_shapes[id(field)] = (field, shape)
+        return shape
+    
+    def _parse_message_call(self, target: str) -> str:
+        """Build the runtime call that parses a length-delimited submessage into target."""
+        if self.options.zero_copy_strings:
+            # String views in the submessage must point into the caller's buffer
+            return f'litepb::parse_length_prefixed_borrowed({target}, stream)'
+        return f'litepb::parse_length_prefixed({target}, stream)'
     
     def _collect_all_nested(self, message: pb2.DescriptorProto, ns_prefix: str, result: dict) -> None:
         """Recursively collect all nested messages into a dict."""
         for nested_msg in message.nested_type:
-            if not (nested_msg.HasField('options') and nested_msg.options.map_entry):
+            if not (nested_msg.options.map_entry):
                 nested_prefix = f'{ns_prefix}::{message.name}' if ns_prefix else message.name
                 full_name = f'{nested_prefix}::{nested_msg.name}'
                 # Apply namespace prefix wrapper if provided
@@ -38,19 +284,20 @@ class SerializationCodegen:
     def _build_dependency_graph(self, all_msgs: dict) -> dict:
         """Build dependency graph: msg_name -> set of messages it depends on."""
         deps = {name: set() for name in all_msgs}
+        suffix_index = self._build_suffix_index(all_msgs)
         
         for full_name, (msg, prefix) in all_msgs.items():
             # First, add dependencies for nested types - parent depends on its nested types
             # This ensures nested types are generated before their parent
             for nested_msg in msg.nested_type:
-                if not (nested_msg.HasField('options') and nested_msg.options.map_entry):
+                if not (nested_msg.options.map_entry):
                     nested_full_name = f'{full_name}::{nested_msg.name}'
                     if nested_full_name in all_msgs:
                         deps[full_name].add(nested_full_name)
             
             # Then check all fields including those in nested types and map fields
             for field in msg.field:
-                if field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
+                if field.type == TYPE_MESSAGE:
                     # Get the type name
                     type_name = field.type_name
                     # Remove leading dot if present
@@ -58,32 +305,39 @@ class SerializationCodegen:
                         type_name = type_name[1:]
                     
                     # Handle different name formats
-                    dep_name = self._find_message_in_all_msgs(type_name, all_msgs, full_name)
+                    dep_name = self._find_message_in_all_msgs(type_name, all_msgs, full_name, suffix_index)
                     if dep_name and dep_name != full_name:  # Don't add self-dependencies
                         deps[full_name].add(dep_name)
         
         return deps
     
-    def _find_message_in_all_msgs(self, type_name: str, all_msgs: dict, current_msg: str) -> str:
+    @staticmethod
+    def _build_suffix_index(all_msgs: dict) -> Dict[str, str]:
+        """Map every '::'-separated suffix of the names in all_msgs to the first name ending with it."""
+        index = {}
+        for msg_name in all_msgs:
+            parts = msg_name.split('::')
+            for start in range(len(parts)):
+                index.setdefault('::'.join(parts[start:]), msg_name)
+        return index
+    
+    def _find_message_in_all_msgs(self, type_name: str, all_msgs: dict, current_msg: str, suffix_index: Dict[str, str]) -> str:
         """Find a message type name in all_msgs dict, handling nested types."""
         # Remove leading dot if present
         if type_name.startswith('.'):
             type_name = type_name[1:]
         
         # If it has a package prefix, remove it for matching
-        if self.current_proto.package and type_name.startswith(self.current_proto.package + '.'):
-            type_name = type_name[len(self.current_proto.package) + 1:]
+        if self.package and type_name.startswith(self.package + '.'):
+            type_name = type_name[len(self.package) + 1:]
         
         # Convert proto path to C++ namespace format
         cpp_type = type_name.replace('.', '::')
         
-        # Try to find exact match first
-        for msg_name in all_msgs:
-            if msg_name == cpp_type:
-                return msg_name
-            # Check if it ends with this type (for namespace-prefixed types)
-            if msg_name.endswith('::' + cpp_type):
-                return msg_name
+        # First name equal to the type or ending with it (for namespace-prefixed types)
+        match = suffix_index.get(cpp_type)
+        if match is not None:
+            return match
         
         # If type is just a simple name, look for it in nested types of current message
         if '.' not in type_name and '::' not in type_name:
@@ -95,9 +349,8 @@ class SerializationCodegen:
                     return sibling
             
             # Check with namespace prefix
-            if self.current_proto.package:
-                ns_prefix = self.current_proto.package.replace('.', '::')
-                prefixed = f'{ns_prefix}::{type_name}'
+            if self.package:
+                prefixed = f'{self.package_ns}::{type_name}'
                 if prefixed in all_msgs:
                     return prefixed
         
@@ -133,7 +386,7 @@ class SerializationCodegen:
     def _collect_nested_messages_reverse(self, message: pb2.DescriptorProto, ns_prefix: str, result: List[tuple]) -> None:
         """Collect nested messages in reverse declaration order (later siblings first)."""
         for nested_msg in reversed(message.nested_type):
-            if not (nested_msg.HasField('options') and nested_msg.options.map_entry):
+            if not (nested_msg.options.map_entry):
                 nested_prefix = f'{ns_prefix}::{message.name}' if ns_prefix else message.name
                 # First add this message
                 result.append((nested_msg, nested_prefix))
@@ -152,7 +405,7 @@ class SerializationCodegen:
         # Generate forward declarations
         for msg_type, msg in all_msgs:
             # Skip map entry types - they don't need serializers
-            if msg.HasField('options') and msg.options.map_entry:
+            if msg.options.map_entry:
                 continue
             lines.append(f'template<> class Serializer<{msg_type}>;')
         
@@ -167,7 +420,7 @@ class SerializationCodegen:
         result.append((msg_type, message))
         
         for nested_msg in message.nested_type:
-            if not (nested_msg.HasField('options') and nested_msg.options.map_entry):
+            if not (nested_msg.options.map_entry):
                 nested_prefix = f'{ns_prefix}::{message.name}' if ns_prefix else message.name
                 self._collect_messages_for_forward_decl(nested_msg, nested_prefix, result)
     
@@ -193,9 +446,9 @@ class SerializationCodegen:
         # Generate serializers in dependency order
         for msg, prefix in sorted_msgs:
             # Skip map entry types - they don't need serializers
-            if msg.HasField('options') and msg.options.map_entry:
+            if msg.options.map_entry:
                 continue
-            lines.append(self._generate_single_serializer(msg, prefix, inline))
+            self._append_single_serializer(msg, prefix, inline, lines)
             lines.append('')
         
         return '\n'.join(lines)
@@ -204,7 +457,7 @@ class SerializationCodegen:
         """Collect messages depth-first, ensuring nested types come before parents."""
         # First, recursively collect all nested messages
         for nested_msg in message.nested_type:
-            if not (nested_msg.HasField('options') and nested_msg.options.map_entry):
+            if not (nested_msg.options.map_entry):
                 nested_prefix = f'{ns_prefix}::{message.name}' if ns_prefix else message.name
                 self._collect_messages_depth_first(nested_msg, nested_prefix, result)
         
@@ -237,16 +490,15 @@ class SerializationCodegen:
         # Generate serializers in dependency order
         for msg, prefix in sorted_msgs:
             # Skip map entry types - they don't need serializers
-            if msg.HasField('options') and msg.options.map_entry:
+            if msg.options.map_entry:
                 continue
-            lines.append(self._generate_single_serializer(msg, prefix, inline))
+            self._append_single_serializer(msg, prefix, inline, lines)
             lines.append('')
         
         return '\n'.join(lines)
     
-    def _generate_single_serializer(self, message: pb2.DescriptorProto, ns_prefix: str, inline: bool) -> str:
-        """Generate a single serializer specialization without recursion."""
-        lines = []
+    def _append_single_serializer(self, message: pb2.DescriptorProto, ns_prefix: str, inline: bool, lines: List[str]) -> None:
+        """Append a single serializer specialization, without recursion, to lines."""
         msg_type = f'{ns_prefix}::{message.name}' if ns_prefix else message.name
         # Apply namespace prefix wrapper if provided
         if self.namespace_prefix:
@@ -262,273 +514,171 @@ class SerializationCodegen:
         lines.append('        litepb::ProtoWriter writer(stream);')
         
         # Get non-oneof, non-map fields
-        regular_fields = FieldUtils.get_non_oneof_fields(message)
+        layout = FieldUtils.get_message_layout(message)
+        regular_fields = layout.regular_fields
         
         # Generate write code for each regular field
         for field in regular_fields:
             lines.append(self.generate_field_write(field, message))
         
         # Generate write code for maps
-        maps = FieldUtils.extract_maps_from_message(message)
+        maps = layout.maps
         for map_field in maps:
-            lines.append(self.generate_map_write(map_field, message))
+            self._append_map_write(map_field, message, lines)
         
         # Generate write code for oneofs
-        oneofs = FieldUtils.extract_oneofs_from_message(message)
+        oneofs = layout.oneofs
         for oneof in oneofs:
-            lines.append(self.generate_oneof_write(oneof, message))
+            self._append_oneof_write(oneof, message, lines)
         
         # Write unknown fields at the end
-        lines.append('        // Serialize unknown fields for forward/backward compatibility')
-        lines.append('        if (!value.unknown_fields.empty()) {')
-        lines.append('            if (!value.unknown_fields.serialize_to(stream)) return false;')
-        lines.append('        }')
+        lines.append(_SERIALIZE_UNKNOWN_FIELD_TAIL)
         
-        lines.append('        return true;')
-        lines.append('    }')
-        lines.append('')
+        # Size method, walking the fields in the same order as serialize()
+        lines.append(f'    {inline_str}static size_t byte_size(const {msg_type}& value) {{')
+        lines.append('        size_t size = 0;')
+        for field in regular_fields:
+            lines.append(self.generate_field_size(field))
+        for map_field in maps:
+            self._append_map_size(map_field, lines)
+        for oneof in oneofs:
+            self._append_oneof_size(oneof, lines)
+        lines.append(_BYTE_SIZE_UNKNOWN_FIELD_TAIL)
         
         # Parse method
         lines.append(f'    {inline_str}static bool parse({msg_type}& value, litepb::InputStream& stream) {{')
         lines.append('        litepb::ProtoReader reader(stream);')
         lines.append('        uint32_t field_number;')
         lines.append('        litepb::WireType wire_type;')
-        lines.append('        while (reader.read_tag(field_number, wire_type)) {')
+        lines.append('        while (LITEPB_LIKELY(reader.read_tag(field_number, wire_type))) {')
         lines.append('            ')
         lines.append('            switch (field_number) {')
         
         # Generate read cases for each regular field
         for field in regular_fields:
-            lines.append(self.generate_field_read(field, message))
+            self._append_field_read(field, message, lines)
         
         # Generate read cases for maps
         for map_field in maps:
-            lines.append(self.generate_map_read(map_field, message))
+            self._append_map_read(map_field, message, lines)
         
         # Generate read cases for oneofs
         for oneof in oneofs:
             for field in oneof.fields:
-                lines.append(self.generate_oneof_field_read(field, oneof, message))
-        
-        lines.append('                default: {')
-        lines.append('                    // Capture unknown field for forward/backward compatibility')
-        lines.append('                    std::vector<uint8_t> unknown_data;')
-        lines.append('                    if (!reader.capture_unknown_field(wire_type, unknown_data)) return false;')
-        lines.append('                    ')
-        lines.append('                    // Store in UnknownFieldSet based on wire type')
-        lines.append('                    switch (wire_type) {')
-        lines.append('                        case litepb::WIRE_TYPE_VARINT: {')
-        lines.append('                            // Decode varint from captured data')
-        lines.append('                            uint64_t varint_value = 0;')
-        lines.append('                            size_t shift = 0;')
-        lines.append('                            for (size_t i = 0; i < unknown_data.size() && i < 10; ++i) {')
-        lines.append('                                varint_value |= static_cast<uint64_t>(unknown_data[i] & 0x7F) << shift;')
-        lines.append('                                if ((unknown_data[i] & 0x80) == 0) break;')
-        lines.append('                                shift += 7;')
-        lines.append('                            }')
-        lines.append('                            value.unknown_fields.add_varint(field_number, varint_value);')
-        lines.append('                            break;')
-        lines.append('                        }')
-        lines.append('                        case litepb::WIRE_TYPE_FIXED32: {')
-        lines.append('                            if (unknown_data.size() >= 4) {')
-        lines.append('                                uint32_t fixed32_value = ')
-        lines.append('                                    static_cast<uint32_t>(unknown_data[0]) |')
-        lines.append('                                    (static_cast<uint32_t>(unknown_data[1]) << 8) |')
-        lines.append('                                    (static_cast<uint32_t>(unknown_data[2]) << 16) |')
-        lines.append('                                    (static_cast<uint32_t>(unknown_data[3]) << 24);')
-        lines.append('                                value.unknown_fields.add_fixed32(field_number, fixed32_value);')
-        lines.append('                            }')
-        lines.append('                            break;')
-        lines.append('                        }')
-        lines.append('                        case litepb::WIRE_TYPE_FIXED64: {')
-        lines.append('                            if (unknown_data.size() >= 8) {')
-        lines.append('                                uint64_t fixed64_value = 0;')
-        lines.append('                                for (int i = 0; i < 8; ++i) {')
-        lines.append('                                    fixed64_value |= static_cast<uint64_t>(unknown_data[i]) << (i * 8);')
-        lines.append('                                }')
-        lines.append('                                value.unknown_fields.add_fixed64(field_number, fixed64_value);')
-        lines.append('                            }')
-        lines.append('                            break;')
-        lines.append('                        }')
-        lines.append('                        case litepb::WIRE_TYPE_LENGTH_DELIMITED: {')
-        lines.append('                            // Extract actual data (skip length prefix)')
-        lines.append('                            size_t pos = 0;')
-        lines.append('                            uint64_t len = 0;')
-        lines.append('                            int shift = 0;')
-        lines.append('                            while (pos < unknown_data.size() && pos < 10) {')
-        lines.append('                                len |= static_cast<uint64_t>(unknown_data[pos] & 0x7F) << shift;')
-        lines.append('                                if ((unknown_data[pos] & 0x80) == 0) {')
-        lines.append('                                    pos++;')
-        lines.append('                                    break;')
-        lines.append('                                }')
-        lines.append('                                shift += 7;')
-        lines.append('                                pos++;')
-        lines.append('                            }')
-        lines.append('                            if (pos < unknown_data.size()) {')
-        lines.append('                                value.unknown_fields.add_length_delimited(field_number, ')
-        lines.append('                                    unknown_data.data() + pos, unknown_data.size() - pos);')
-        lines.append('                            }')
-        lines.append('                            break;')
-        lines.append('                        }')
-        lines.append('                        case litepb::WIRE_TYPE_START_GROUP: {')
-        lines.append('                            value.unknown_fields.add_group(field_number, ')
-        lines.append('                                unknown_data.data(), unknown_data.size());')
-        lines.append('                            break;')
-        lines.append('                        }')
-        lines.append('                        default:')
-        lines.append('                            break;')
-        lines.append('                    }')
-        lines.append('                    break;')
-        lines.append('                }')
-        lines.append('            }')
-        lines.append('        }')
-        lines.append('        return true;')
-        lines.append('    }')
-        
-        lines.append('};')
+                self._append_oneof_field_read(field, oneof, message, lines)
         
-        return '\n'.join(lines)
+        lines.append(_PARSE_UNKNOWN_FIELD_TAIL)
     
     def generate_field_write(self, field: pb2.FieldDescriptorProto, message: pb2.DescriptorProto) -> str:
         """Generate write code for a field."""
         field_num = field.number
         field_name = field.name
-        syntax = self.current_proto.syntax if self.current_proto.syntax else 'proto2'
+        shape = self._field_shape(field)
 
-        # Check if field uses std::optional wrapper
-        use_optional_field = FieldUtils.uses_optional(field, syntax)
-
-        if field.label == pb2.FieldDescriptorProto.LABEL_REPEATED:
-            # Repeated field - check if it should be packed
-            lines = []
-            
-            if FieldUtils.is_field_packed(field, syntax):
-                # Packed encoding
-                lines.append(f'        if (!value.{field_name}.empty()) {{')
-                lines.append(f'            // Calculate packed size')
-                lines.append(f'            size_t packed_size = 0;')
-                lines.append(f'            for (const auto& item : value.{field_name}) {{')
-                
-                # Add size calculation based on field type
-                size_expr = TypeMapper.get_packed_size_expression(field.type, 'item')
-                lines.append(f'                packed_size += {size_expr};')
-                lines.append(f'            }}')
-                lines.append(f'            ')
-                lines.append(f'            // Write tag with LENGTH_DELIMITED wire type')
-                lines.append(f'            writer.write_tag({field_num}, litepb::WIRE_TYPE_LENGTH_DELIMITED);')
-                lines.append(f'            writer.write_varint(packed_size);')
-                lines.append(f'            ')
-                lines.append(f'            // Write all values without tags')
-                lines.append(f'            for (const auto& item : value.{field_name}) {{')
-                
-                # Add write code based on field type
-                write_code = self._generate_packed_write_value(field.type, 'item')
-                lines.append(f'                {write_code}')
-                lines.append(f'            }}')
-                lines.append(f'        }}')
-            else:
-                # Unpacked encoding
-                lines.append(f'        for (const auto& item : value.{field_name}) {{')
-                wire_type = TypeMapper.get_wire_type(field.type)
-                lines.append(f'            writer.write_tag({field_num}, {wire_type});')
-                
-                if field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
-                    # For messages, we need to write the length first
-                    lines.append(f'            {{')
-                    lines.append(f'                litepb::BufferOutputStream temp_stream;')
-                    lines.append(f'                if (!litepb::Serializer<std::decay_t<decltype(item)>>::serialize(item, temp_stream)) return false;')
-                    lines.append(f'                writer.write_varint(temp_stream.size());')
-                    lines.append(f'                stream.write(temp_stream.data(), temp_stream.size());')
-                    lines.append(f'            }}')
-                elif field.type == pb2.FieldDescriptorProto.TYPE_GROUP:
-                    # GROUP is deprecated and not length-delimited
-                    lines.append(f'            if (!litepb::Serializer<std::decay_t<decltype(item)>>::serialize(item, stream)) return false;')
-                elif field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
-                    lines.append(f'            writer.write_varint(static_cast<uint64_t>(item));')
-                elif field.type == pb2.FieldDescriptorProto.TYPE_BYTES:
-                    method = TypeMapper.get_serialization_method(field.type)
-                    lines.append(f'            writer.{method}(item.data(), item.size());')
+        if field.label == LABEL_REPEATED:
+            if shape.packed:
+                # Packed encoding: one tag and length, then the values without tags
+                item_size = TypeMapper.get_constant_item_size(field.type)
+                if item_size is not None:
+                    size = _PACKED_CONSTANT_SIZE_TMPL.format(name=field_name, item_size=item_size)
                 else:
-                    method = TypeMapper.get_serialization_method(field.type)
-                    lines.append(f'            writer.{method}(item);')
-                lines.append(f'        }}')
+                    size_expr = TypeMapper.get_packed_size_expression(field.type, 'item')
+                    size = _PACKED_SUMMED_SIZE_TMPL.format(name=field_name, size_expr=size_expr)
+                tag = TypeMapper.get_tag_bytes(field_num, 'litepb::WIRE_TYPE_LENGTH_DELIMITED')
+                return _PACKED_WRITE_TMPL.format(name=field_name, number=field_num, tag=tag, size=size,
+                                                 write=self._generate_packed_write_value(field.type, 'item'))
             
-            return '\n'.join(lines)
+            # Unpacked encoding
+            return _REPEATED_WRITE_TMPL.format(name=field_name, body=self._generate_tagged_write(field, 'item'))
         
-        # Optional or singular field
-        lines = []
+        return _SINGLE_WRITE_TMPL.format(guard=shape.guard, body=self._generate_tagged_write(field, shape.value_expr))
+
+    def _generate_tagged_write(self, field: pb2.FieldDescriptorProto, value_expr: str, indent: str = '            ') -> str:
+        """Generate code that writes a field's tag followed by one value."""
+        field_num = field.number
+        wire_type = TypeMapper.get_wire_type(field.type)
+        tag = TypeMapper.get_tag_bytes(field_num, wire_type)
+        fused_writer = _FUSED_FIELD_WRITERS.get(field.type)
+        if fused_writer is not None:
+            return f'{indent}writer.{fused_writer}<{tag}>({value_expr});  // field {field_num}, {wire_type}'
+        return '\n'.join((
+            f'{indent}writer.write_raw<{tag}>();  // field {field_num}, {wire_type}',
+            self._generate_value_write(field, value_expr, indent),
+        ))
+
+    def _generate_value_write(self, field: pb2.FieldDescriptorProto, value_expr: str, indent: str = '            ') -> str:
+        """Generate code that writes one field value after its tag has been written."""
+        field_type = field.type
+        if field_type == TYPE_MESSAGE:
+            # Length prefix comes from byte_size(), then the message is written straight to the stream.
+            # Sizes are not cached, so each enclosing level re-sizes its submessages: O(depth * size).
+            serializer = f'litepb::Serializer<std::decay_t<decltype({value_expr})>>'
+            return '\n'.join((
+                f'{indent}size_t msg_size = {serializer}::byte_size({value_expr});',
+                f'{indent}writer.write_varint(msg_size);',
+                f'{indent}if (LITEPB_UNLIKELY(!{serializer}::serialize({value_expr}, stream))) return false;',
+            ))
+        elif field_type == TYPE_GROUP:
+            # GROUP is deprecated and not length-delimited
+            return f'{indent}if (LITEPB_UNLIKELY(!litepb::Serializer<std::decay_t<decltype({value_expr})>>::serialize({value_expr}, stream))) return false;'
+        elif field_type == TYPE_ENUM:
+            return f'{indent}writer.write_varint(static_cast<uint64_t>({value_expr}));'
+        
+        method = TypeMapper.get_serialization_method(field_type)
+        if field_type == TYPE_BYTES:
+            return f'{indent}writer.{method}({value_expr}.data(), {value_expr}.size());'
+        return f'{indent}writer.{method}({value_expr});'
+
+    def generate_field_size(self, field: pb2.FieldDescriptorProto) -> str:
+        """Generate code that adds the encoded size of a field to size, mirroring generate_field_write()."""
+        field_num = field.number
+        field_name = field.name
+        shape = self._field_shape(field)
         
-        if use_optional_field:
-            # Field with std::optional wrapper
-            lines.append(f'        if (value.{field_name}.has_value()) {{')
-            wire_type = TypeMapper.get_wire_type(field.type)
-            lines.append(f'            writer.write_tag({field_num}, {wire_type});')
-            
-            if field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
-                # For messages, we need to write the length first
-                lines.append(f'            {{')
-                lines.append(f'                litepb::BufferOutputStream temp_stream;')
-                lines.append(f'                if (!litepb::Serializer<std::decay_t<decltype(value.{field_name}.value())>>::serialize(value.{field_name}.value(), temp_stream)) return false;')
-                lines.append(f'                writer.write_varint(temp_stream.size());')
-                lines.append(f'                stream.write(temp_stream.data(), temp_stream.size());')
-                lines.append(f'            }}')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_GROUP:
-                # GROUP is deprecated and not length-delimited
-                lines.append(f'            if (!litepb::Serializer<std::decay_t<decltype(value.{field_name}.value())>>::serialize(value.{field_name}.value(), stream)) return false;')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
-                lines.append(f'            writer.write_varint(static_cast<uint64_t>(value.{field_name}.value()));')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_BYTES:
-                method = TypeMapper.get_serialization_method(field.type)
-                lines.append(f'            writer.{method}(value.{field_name}.value().data(), value.{field_name}.value().size());')
-            else:
-                method = TypeMapper.get_serialization_method(field.type)
-                lines.append(f'            writer.{method}(value.{field_name}.value());')
-            lines.append(f'        }}')
-        else:
-            # Proto3 singular field or proto2 required field
-            # Skip default values in proto3
-            if syntax == 'proto3':
-                default_check = TypeMapper.get_default_check(field)
-                if default_check:
-                    lines.append(f'        if ({default_check}) {{')
+        if field.label == LABEL_REPEATED:
+            item_size = TypeMapper.get_constant_item_size(field.type)
+            if shape.packed:
+                if item_size is not None:
+                    size = _PACKED_CONSTANT_SIZE_TMPL.format(name=field_name, item_size=item_size)
                 else:
-                    lines.append(f'        {{')
-            else:
-                lines.append(f'        {{')
-            
-            wire_type = TypeMapper.get_wire_type(field.type)
-            lines.append(f'            writer.write_tag({field_num}, {wire_type});')
+                    size_expr = TypeMapper.get_packed_size_expression(field.type, 'item')
+                    size = _PACKED_SUMMED_SIZE_TMPL.format(name=field_name, size_expr=size_expr)
+                return _PACKED_BYTE_SIZE_TMPL.format(name=field_name, size=size,
+                                                     tag_size=TypeMapper.get_tag_size(field_num))
             
-            if field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
-                # For messages, we need to write the length first
-                lines.append(f'            {{')
-                lines.append(f'                litepb::BufferOutputStream temp_stream;')
-                lines.append(f'                if (!litepb::Serializer<std::decay_t<decltype(value.{field_name})>>::serialize(value.{field_name}, temp_stream)) return false;')
-                lines.append(f'                writer.write_varint(temp_stream.size());')
-                lines.append(f'                stream.write(temp_stream.data(), temp_stream.size());')
-                lines.append(f'            }}')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_GROUP:
-                # GROUP is deprecated and not length-delimited
-                lines.append(f'            if (!litepb::Serializer<std::decay_t<decltype(value.{field_name})>>::serialize(value.{field_name}, stream)) return false;')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
-                lines.append(f'            writer.write_varint(static_cast<uint64_t>(value.{field_name}));')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_BYTES:
-                method = TypeMapper.get_serialization_method(field.type)
-                lines.append(f'            writer.{method}(value.{field_name}.data(), value.{field_name}.size());')
-            else:
-                method = TypeMapper.get_serialization_method(field.type)
-                lines.append(f'            writer.{method}(value.{field_name});')
-            lines.append(f'        }}')
+            if item_size is not None:
+                return _REPEATED_CONSTANT_BYTE_SIZE_TMPL.format(
+                    name=field_name, item_size=TypeMapper.get_tag_size(field_num) + item_size)
+            return _REPEATED_BYTE_SIZE_TMPL.format(name=field_name, body=self._generate_value_size(field, 'item'))
         
-        return '\n'.join(lines)
-
+        return _SINGLE_BYTE_SIZE_TMPL.format(guard=shape.guard, body=self._generate_value_size(field, shape.value_expr))
+    
+    def _generate_value_size(self, field: pb2.FieldDescriptorProto, value_expr: str, indent: str = '            ') -> str:
+        """Generate code that adds the encoded size of one field value, tag included, to size."""
+        tag_size = TypeMapper.get_tag_size(field.number)
+        field_type = field.type
+        if field_type == TYPE_MESSAGE:
+            return '\n'.join((
+                f'{indent}size_t msg_size = litepb::Serializer<std::decay_t<decltype({value_expr})>>::byte_size({value_expr});',
+                f'{indent}size += {tag_size} + litepb::ProtoWriter::varint_size(msg_size) + msg_size;',
+            ))
+        elif field_type == TYPE_GROUP:
+            return f'{indent}size += {tag_size} + litepb::Serializer<std::decay_t<decltype({value_expr})>>::byte_size({value_expr});'
+        elif field_type in (TYPE_STRING, TYPE_BYTES):
+            return f'{indent}size += {tag_size} + litepb::ProtoWriter::varint_size({value_expr}.size()) + {value_expr}.size();'
+        item_size = TypeMapper.get_constant_item_size(field_type)
+        if item_size is not None:
+            # Fixed-width value: tag and payload fold into one constant at generation time
+            return f'{indent}size += {tag_size + item_size};'
+        return f'{indent}size += {tag_size} + {TypeMapper.get_packed_size_expression(field_type, value_expr)};'
+    
     def _generate_packed_write_value(self, field_type: int, item_name: str) -> str:
         """Generate code to write a single value in packed format."""
-        if field_type == pb2.FieldDescriptorProto.TYPE_ENUM:
+        if field_type == TYPE_ENUM:
             return f'writer.write_varint(static_cast<uint64_t>({item_name}));'
-        elif field_type in (pb2.FieldDescriptorProto.TYPE_SFIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED64):
-            unsigned_type = 'uint32_t' if field_type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'uint64_t'
-            method = 'write_fixed32' if field_type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'write_fixed64'
+        elif field_type in (TYPE_SFIXED32, TYPE_SFIXED64):
+            unsigned_type = 'uint32_t' if field_type == TYPE_SFIXED32 else 'uint64_t'
+            method = 'write_fixed32' if field_type == TYPE_SFIXED32 else 'write_fixed64'
             return f'{unsigned_type} temp; std::memcpy(&temp, &{item_name}, sizeof(temp)); writer.{method}(temp);'
         else:
             method = TypeMapper.get_serialization_method(field_type)
@@ -537,139 +687,188 @@ class SerializationCodegen:
             else:
                 return f'writer.{method}({item_name});'
     
-    def generate_map_write(self, map_field: MapFieldInfo, message: pb2.DescriptorProto) -> str:
-        """Generate write code for a map field."""
-        lines = []
-        lines.append(f'        for (const auto& [key, val] : value.{map_field.name}) {{')
-        lines.append(f'            writer.write_tag({map_field.number}, litepb::WIRE_TYPE_LENGTH_DELIMITED);')
-        lines.append(f'            ')
-        lines.append(f'            // Calculate entry size')
-        lines.append(f'            size_t entry_size = 0;')
-        
-        # Key size
-        key_wire = TypeMapper.get_wire_type(map_field.key_field.type)
-        key_method = TypeMapper.get_serialization_method(map_field.key_field.type)
-        lines.append(f'            entry_size += litepb::ProtoWriter::varint_size((1 << 3) | {key_wire});')
-        if key_method == 'write_string':
-            lines.append(f'            entry_size += litepb::ProtoWriter::varint_size(key.size()) + key.size();')
-        elif key_method == 'write_varint':
-            lines.append(f'            entry_size += litepb::ProtoWriter::varint_size(static_cast<uint64_t>(key));')
-        elif key_method in ('write_fixed32', 'write_sfixed32'):
-            lines.append(f'            entry_size += 4;')
-        elif key_method in ('write_fixed64', 'write_sfixed64'):
-            lines.append(f'            entry_size += 8;')
-        
-        # Value size
-        val_wire = TypeMapper.get_wire_type(map_field.value_field.type)
-        val_method = TypeMapper.get_serialization_method(map_field.value_field.type)
-        lines.append(f'            entry_size += litepb::ProtoWriter::varint_size((2 << 3) | {val_wire});')
-        if map_field.value_field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
-            lines.append(f'            // Message value size calculated during write')
-            lines.append(f'            litepb::BufferOutputStream msg_stream;')
-            lines.append(f'            litepb::Serializer<std::decay_t<decltype(val)>>::serialize(val, msg_stream);')
-            lines.append(f'            entry_size += litepb::ProtoWriter::varint_size(msg_stream.size()) + msg_stream.size();')
-        elif val_method == 'write_string':
-            lines.append(f'            entry_size += litepb::ProtoWriter::varint_size(val.size()) + val.size();')
-        elif val_method == 'write_varint':
-            lines.append(f'            entry_size += litepb::ProtoWriter::varint_size(static_cast<uint64_t>(val));')
-        elif val_method in ('write_fixed32', 'write_sfixed32'):
-            lines.append(f'            entry_size += 4;')
-        elif val_method in ('write_fixed64', 'write_sfixed64'):
-            lines.append(f'            entry_size += 8;')
+    def _map_entry_encoding(self, field: pb2.FieldDescriptorProto, var: str) -> tuple:
+        """Describe how a map key or value is encoded inside an entry.
         
-        lines.append(f'            ')
-        lines.append(f'            writer.write_varint(entry_size);')
-        lines.append(f'            ')
-        lines.append(f'            // Write key')
-        lines.append(f'            writer.write_tag(1, {key_wire});')
-        lines.append(f'            writer.{key_method}({"static_cast<uint64_t>(key)" if key_method == "write_varint" else "key"});')
-        lines.append(f'            ')
-        lines.append(f'            // Write value')
-        lines.append(f'            writer.write_tag(2, {val_wire});')
-        if map_field.value_field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
-            lines.append(f'            writer.write_varint(msg_stream.size());')
-            lines.append(f'            stream.write(msg_stream.data(), msg_stream.size());')
-        elif map_field.value_field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
-            lines.append(f'            writer.write_varint(static_cast<uint64_t>(val));')
-        elif val_method == 'write_bytes':
-            lines.append(f'            writer.{val_method}(val.data(), val.size());')
-        elif val_method == 'write_varint':
-            lines.append(f'            writer.{val_method}(static_cast<uint64_t>(val));')
+        Returns (kind, value_expr, data_expr, prelude) where kind is one of
+        'varint', 'varint32', 'fixed32', 'fixed64' or 'length'. For 'length' value_expr is
+        the payload size and data_expr points at the payload bytes, or is None for
+        a message that is serialized in place.
+        """
+        field_type = field.type
+        if field_type == TYPE_SINT32:
+            return 'varint32', f'static_cast<uint32_t>(litepb::ProtoWriter::zigzag_encode32({var}))', None, []
+        elif field_type == TYPE_SINT64:
+            return 'varint', f'litepb::ProtoWriter::zigzag_encode64({var})', None, []
+        elif field_type in (TYPE_UINT32, TYPE_BOOL):
+            return 'varint32', f'static_cast<uint32_t>({var})', None, []
+        elif field_type in (TYPE_FIXED32, TYPE_SFIXED32):
+            return 'fixed32', f'static_cast<uint32_t>({var})', None, []
+        elif field_type in (TYPE_FIXED64, TYPE_SFIXED64):
+            return 'fixed64', f'static_cast<uint64_t>({var})', None, []
+        elif field_type == TYPE_FLOAT:
+            return 'fixed32', f'{var}_bits', None, [f'uint32_t {var}_bits;',
+                                                     f'std::memcpy(&{var}_bits, &{var}, sizeof({var}_bits));']
+        elif field_type == TYPE_DOUBLE:
+            return 'fixed64', f'{var}_bits', None, [f'uint64_t {var}_bits;',
+                                                     f'std::memcpy(&{var}_bits, &{var}, sizeof({var}_bits));']
+        elif field_type == TYPE_STRING:
+            return 'length', f'{var}.size()', f'reinterpret_cast<const uint8_t*>({var}.data())', []
+        elif field_type == TYPE_BYTES:
+            return 'length', f'{var}.size()', f'{var}.data()', []
+        elif field_type == TYPE_MESSAGE:
+            # No payload pointer: the message is serialized straight to the stream after its prefix
+            return 'length', f'{var}_size', None, []
         else:
-            lines.append(f'            writer.{val_method}(val);')
-        lines.append(f'        }}')
-        
-        return '\n'.join(lines)
+            # int32/int64/uint64/enum
+            return 'varint', f'static_cast<uint64_t>({var})', None, []
     
-    def generate_oneof_write(self, oneof: OneofInfo, message: pb2.DescriptorProto) -> str:
-        """Generate write code for a oneof field."""
-        lines = []
-        lines.append(f'        std::visit([&](const auto& oneof_val) {{')
-        lines.append(f'            using T = std::decay_t<decltype(oneof_val)>;')
-        lines.append(f'            if constexpr (!std::is_same_v<T, std::monostate>) {{')
+    def _append_map_write(self, map_field: MapFieldInfo, message: pb2.DescriptorProto, lines: List[str]) -> None:
+        """Append write code for a map field to lines.
+        
+        The map tag, entry length, key/value tags and fixed-width values are
+        assembled in a stack buffer so each entry costs one stream write, plus
+        one per string, bytes or message payload.
+        """
+        parts = [(1, map_field.key_field, 'key'), (2, map_field.value_field, 'val')]
+        encodings = [self._map_entry_encoding(field, var) for _, field, var in parts]
+        
+        lines.append(f'        for (const auto& [key, val] : value.{map_field.name}) {{')
+        self._append_map_entry_size(parts, encodings, lines)
         
-        for i, field in enumerate(oneof.fields):
+        buffer_size = TypeMapper.get_tag_size(map_field.number) + _MAP_PART_MAX_SIZES['varint']
+        buffer_size += sum(TypeMapper.get_tag_size(number) + _MAP_PART_MAX_SIZES[kind]
+                           for (number, _, _), (kind, _, _, _) in zip(parts, encodings))
+        lines.append(f'            ')
+        lines.append(f'            // Assemble map tag, entry length, tags and fixed-width values in one buffer')
+        lines.append(f'            uint8_t entry_buf[{buffer_size}];')
+        map_tag = TypeMapper.get_tag_bytes(map_field.number, 'litepb::WIRE_TYPE_LENGTH_DELIMITED').split(', ')
+        for index, tag_byte in enumerate(map_tag):
+            lines.append(f'            entry_buf[{index}] = {tag_byte};')
+        lines.append(f'            size_t entry_pos = {len(map_tag)};  // field {map_field.number}, litepb::WIRE_TYPE_LENGTH_DELIMITED')
+        lines.append(f'            entry_pos += litepb::ProtoWriter::encode_varint(entry_size, entry_buf + entry_pos);')
+        pending = True
+        for index, ((number, field, var), (kind, value_expr, data_expr, prelude)) in enumerate(zip(parts, encodings)):
             wire_type = TypeMapper.get_wire_type(field.type)
-            field_num = field.number
-            
-            if i == 0:
-                lines.append(f'                if constexpr (std::is_same_v<T, {self._get_oneof_field_cpp_type(field)}>) {{')
+            lines.append(f'            entry_buf[entry_pos++] = static_cast<uint8_t>(({number} << 3) | {wire_type});')
+            pending = True
+            for prelude_line in prelude:
+                lines.append(f'            {prelude_line}')
+            if kind == 'varint':
+                lines.append(f'            entry_pos += litepb::ProtoWriter::encode_varint({value_expr}, entry_buf + entry_pos);')
+            elif kind == 'varint32':
+                lines.append(f'            entry_pos += litepb::ProtoWriter::encode_varint32({value_expr}, entry_buf + entry_pos);')
+            elif kind == 'fixed32':
+                lines.append(f'            entry_pos += litepb::ProtoWriter::encode_fixed32({value_expr}, entry_buf + entry_pos);')
+            elif kind == 'fixed64':
+                lines.append(f'            entry_pos += litepb::ProtoWriter::encode_fixed64({value_expr}, entry_buf + entry_pos);')
             else:
-                lines.append(f'                }} else if constexpr (std::is_same_v<T, {self._get_oneof_field_cpp_type(field)}>) {{')
-            
-            lines.append(f'                    writer.write_tag({field_num}, {wire_type});')
-            
-            if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_GROUP):
-                lines.append(f'                    litepb::Serializer<T>::serialize(oneof_val, stream);')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
-                lines.append(f'                    writer.write_varint(static_cast<uint64_t>(oneof_val));')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_BYTES:
-                method = TypeMapper.get_serialization_method(field.type)
-                lines.append(f'                    writer.{method}(oneof_val.data(), oneof_val.size());')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_STRING:
-                method = TypeMapper.get_serialization_method(field.type)
-                lines.append(f'                    writer.{method}(oneof_val);')
+                # Length prefix goes into the buffer, the payload is written straight from its storage
+                lines.append(f'            entry_pos += litepb::ProtoWriter::encode_varint({value_expr}, entry_buf + entry_pos);')
+                lines.append(f'            if (LITEPB_UNLIKELY(!stream.write(entry_buf, entry_pos))) return false;')
+                if data_expr is None:
+                    lines.append(f'            if (LITEPB_UNLIKELY(!litepb::Serializer<std::decay_t<decltype({var})>>::serialize({var}, stream))) return false;')
+                else:
+                    lines.append(f'            if ({value_expr} > 0 && LITEPB_UNLIKELY(!stream.write({data_expr}, {value_expr}))) return false;')
+                pending = False
+                if index + 1 < len(parts):
+                    lines.append(f'            entry_pos = 0;')
+        if pending:
+            lines.append(f'            if (LITEPB_UNLIKELY(!stream.write(entry_buf, entry_pos))) return false;')
+        lines.append(f'        }}')
+    
+    def _append_map_entry_size(self, parts: list, encodings: list, lines: List[str]) -> None:
+        """Append code computing entry_size, the encoded size of one map entry, to lines."""
+        lines.append(f'            // Calculate entry size')
+        lines.append(f'            size_t entry_size = 0;')
+        for (number, field, var), (kind, value_expr, _, _) in zip(parts, encodings):
+            lines.append(f'            entry_size += {TypeMapper.get_tag_size(number)};  // {"key" if number == 1 else "value"} tag')
+            if field.type == TYPE_MESSAGE:
+                lines.append(f'            size_t {value_expr} = litepb::Serializer<std::decay_t<decltype({var})>>::byte_size({var});')
+            if kind in ('varint', 'varint32'):
+                lines.append(f'            entry_size += litepb::ProtoWriter::varint_size({value_expr});')
+            elif kind == 'length':
+                lines.append(f'            entry_size += litepb::ProtoWriter::varint_size({value_expr}) + {value_expr};')
             else:
-                method = TypeMapper.get_serialization_method(field.type)
-                lines.append(f'                    writer.{method}(oneof_val);')
-        
-        if oneof.fields:
-            lines.append(f'                }}')
+                lines.append(f'            entry_size += {_MAP_PART_MAX_SIZES[kind]};')
+    
+    def _append_map_size(self, map_field: MapFieldInfo, lines: List[str]) -> None:
+        """Append code adding the encoded size of a map field to size."""
+        parts = [(1, map_field.key_field, 'key'), (2, map_field.value_field, 'val')]
+        encodings = [self._map_entry_encoding(field, var) for _, field, var in parts]
         
-        lines.append(f'            }}')
-        lines.append(f'        }}, value.{oneof.name});')
+        lines.append(f'        for (const auto& [key, val] : value.{map_field.name}) {{')
+        self._append_map_entry_size(parts, encodings, lines)
+        lines.append(f'            size += {TypeMapper.get_tag_size(map_field.number)} + litepb::ProtoWriter::varint_size(entry_size) + entry_size;')
+        lines.append(f'        }}')
+    
+    def _oneof_alternatives(self, oneof: OneofInfo) -> List[tuple]:
+        """List (variant index, field, C++ type) for each alternative of a oneof's std::variant.
         
-        return '\n'.join(lines)
+        Fields that share a C++ type share one alternative, as in the generated struct;
+        the first such field is the one written.
+        """
+        alternatives = []
+        seen_types = set()
+        for field in oneof.fields:
+            cpp_type = self._get_oneof_field_cpp_type(field)
+            if cpp_type not in seen_types:
+                seen_types.add(cpp_type)
+                # Index 0 is std::monostate
+                alternatives.append((len(alternatives) + 1, field, cpp_type))
+        return alternatives
+    
+    def _append_oneof_size(self, oneof: OneofInfo, lines: List[str]) -> None:
+        """Append code adding the encoded size of the set oneof alternative to size."""
+        lines.append(f'        switch (value.{oneof.name}.index()) {{')
+        for index, field, cpp_type in self._oneof_alternatives(oneof):
+            lines.append(f'            case {index}: {{')
+            lines.append(f'                const auto& oneof_val = std::get<{index}>(value.{oneof.name});')
+            lines.append(self._generate_value_size(field, 'oneof_val', '                '))
+            lines.append(f'                break;')
+            lines.append(f'            }}')
+        lines.append(f'        }}')
+    
+    def _append_oneof_write(self, oneof: OneofInfo, message: pb2.DescriptorProto, lines: List[str]) -> None:
+        """Append write code for a oneof field to lines, dispatching on the variant index."""
+        lines.append(f'        switch (value.{oneof.name}.index()) {{')
+        for index, field, cpp_type in self._oneof_alternatives(oneof):
+            lines.append(f'            case {index}: {{')
+            lines.append(f'                const auto& oneof_val = std::get<{index}>(value.{oneof.name});')
+            # Messages get the same byte_size() length prefix as any other submessage
+            lines.append(self._generate_tagged_write(field, 'oneof_val', '                '))
+            lines.append(f'                break;')
+            lines.append(f'            }}')
+        lines.append(f'        }}')
     
     def _get_oneof_field_cpp_type(self, field: pb2.FieldDescriptorProto) -> str:
         """Get C++ type for a oneof field alternative."""
-        if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
+        if field.type in (TYPE_MESSAGE, TYPE_ENUM):
             type_name = field.type_name
             return TypeMapper.qualify_type_name(type_name, "")
         else:
-            return TypeMapper.get_cpp_type(field.type)
+            return TypeMapper.get_cpp_type(field.type, self.options.zero_copy_strings)
     
-    def generate_field_read(self, field: pb2.FieldDescriptorProto, message: pb2.DescriptorProto) -> str:
-        """Generate read case for a field."""
+    def _append_field_read(self, field: pb2.FieldDescriptorProto, message: pb2.DescriptorProto, lines: List[str]) -> None:
+        """Append the read case for a field to lines."""
         field_num = field.number
         field_name = field.name
-        syntax = self.current_proto.syntax if self.current_proto.syntax else 'proto2'
-        use_optional = FieldUtils.uses_optional(field, syntax)
+        syntax = self.syntax
+        shape = self._field_shape(field)
         
-        lines = []
         lines.append(f'                case {field_num}: {{')
         
-        if field.label == pb2.FieldDescriptorProto.LABEL_REPEATED:
-            # Check if packed
-            if FieldUtils.is_field_packed(field, syntax):
+        if field.label == LABEL_REPEATED:
+            # Check if packed; proto3 scalars without an explicit option are packed by default
+            packed = shape.packed
+            if packed and self.options.proto3_packed_only and syntax == 'proto3' and not field.options.HasField('packed'):
+                lines.append(f'                    if (LITEPB_UNLIKELY(wire_type != litepb::WIRE_TYPE_LENGTH_DELIMITED)) return false;')
+                lines.append(f'                    {{')
+                self._append_packed_read(lines, field.type, field_name)
+                lines.append(f'                    }}')
+            elif packed:
                 lines.append(f'                    if (wire_type == litepb::WIRE_TYPE_LENGTH_DELIMITED) {{')
-                lines.append(f'                        // Packed repeated field')
-                lines.append(f'                        uint64_t length;')
-                lines.append(f'                        if (!reader.read_varint(length)) return false;')
-                lines.append(f'                        size_t end_pos = reader.position() + length;')
-                lines.append(f'                        while (reader.position() < end_pos) {{')
-                self._generate_packed_read_code(lines, field.type, field_name)
-                lines.append(f'                        }}')
+                self._append_packed_read(lines, field.type, field_name)
                 lines.append(f'                    }} else {{')
                 lines.append(f'                        // Unpacked (for backward compat)')
                 self._generate_unpacked_read_code(lines, field.type, field_name)
@@ -677,184 +876,108 @@ class SerializationCodegen:
             else:
                 # Always unpacked
                 self._generate_unpacked_read_code(lines, field.type, field_name)
-        elif use_optional:
+        elif shape.uses_optional:
             # Optional field
-            if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_GROUP):
-                lines.append(f'                    // Read length-delimited message')
-                lines.append(f'                    uint64_t msg_length;')
-                lines.append(f'                    if (!reader.read_varint(msg_length)) return false;')
-                lines.append(f'                    ')
-                lines.append(f'                    // Read message bytes into buffer')
-                lines.append(f'                    std::vector<uint8_t> msg_buffer(msg_length);')
-                lines.append(f'                    if (!stream.read(msg_buffer.data(), msg_length)) return false;')
-                lines.append(f'                    ')
-                lines.append(f'                    // Create a stream from the buffer and parse')
-                lines.append(f'                    decltype(value.{field_name})::value_type temp;')
-                lines.append(f'                    litepb::BufferInputStream msg_stream(msg_buffer.data(), msg_buffer.size());')
-                lines.append(f'                    if (!litepb::Serializer<std::decay_t<decltype(temp)>>::parse(temp, msg_stream)) return false;')
-                lines.append(f'                    value.{field_name} = std::move(temp);')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
+            if field.type in (TYPE_MESSAGE, TYPE_GROUP):
+                # Parse straight into the engaged optional
+                lines.append(f'                    if (LITEPB_UNLIKELY(!{self._parse_message_call(f"value.{field_name}.emplace()")})) return false;')
+            elif field.type == TYPE_ENUM:
                 lines.append(f'                    uint64_t enum_val;')
-                lines.append(f'                    if (!reader.read_varint(enum_val)) return false;')
+                lines.append(f'                    if (LITEPB_UNLIKELY(!reader.read_varint(enum_val))) return false;')
                 lines.append(f'                    value.{field_name} = static_cast<decltype(value.{field_name})::value_type>(enum_val);')
             else:
                 self._generate_simple_read_to_optional(lines, field.type, field_name)
         else:
             # Required or singular
-            if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_GROUP):
-                lines.append(f'                    // Read length-delimited message')
-                lines.append(f'                    uint64_t msg_length;')
-                lines.append(f'                    if (!reader.read_varint(msg_length)) return false;')
-                lines.append(f'                    ')
-                lines.append(f'                    // Read message bytes into buffer')
-                lines.append(f'                    std::vector<uint8_t> msg_buffer(msg_length);')
-                lines.append(f'                    if (!stream.read(msg_buffer.data(), msg_length)) return false;')
-                lines.append(f'                    ')
-                lines.append(f'                    // Create a stream from the buffer and parse')
-                lines.append(f'                    litepb::BufferInputStream msg_stream(msg_buffer.data(), msg_buffer.size());')
-                lines.append(f'                    if (!litepb::Serializer<std::decay_t<decltype(value.{field_name})>>::parse(value.{field_name}, msg_stream)) return false;')
-            elif field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
+            if field.type in (TYPE_MESSAGE, TYPE_GROUP):
+                lines.append(f'                    if (LITEPB_UNLIKELY(!{self._parse_message_call(f"value.{field_name}")})) return false;')
+            elif field.type == TYPE_ENUM:
                 lines.append(f'                    uint64_t enum_val;')
-                lines.append(f'                    if (!reader.read_varint(enum_val)) return false;')
+                lines.append(f'                    if (LITEPB_UNLIKELY(!reader.read_varint(enum_val))) return false;')
                 lines.append(f'                    value.{field_name} = static_cast<decltype(value.{field_name})>(enum_val);')
             else:
-                method = TypeMapper.get_deserialization_method(field.type)
-                if field.type in (pb2.FieldDescriptorProto.TYPE_SFIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED64):
-                    unsigned_type = 'uint32_t' if field.type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'uint64_t'
-                    lines.append(f'                    {unsigned_type} temp_unsigned;')
-                    lines.append(f'                    if (!reader.{method}(temp_unsigned)) return false;')
-                    lines.append(f'                    std::memcpy(&value.{field_name}, &temp_unsigned, sizeof(value.{field_name}));')
-                elif method == 'read_varint':
-                    lines.append(f'                    uint64_t temp_varint;')
-                    lines.append(f'                    if (!reader.{method}(temp_varint)) return false;')
-                    if field.type == pb2.FieldDescriptorProto.TYPE_BOOL:
-                        lines.append(f'                    value.{field_name} = (temp_varint != 0);')
-                    else:
-                        lines.append(f'                    value.{field_name} = static_cast<decltype(value.{field_name})>(temp_varint);')
-                else:
-                    lines.append(f'                    if (!reader.{method}(value.{field_name})) return false;')
+                method = TypeMapper.get_deserialization_method(field.type, self.options.zero_copy_strings)
+                lines.append(self._scalar_read_template(field.type, method, False).format(name=field_name))
         
         lines.append('                    break;')
         lines.append('                }')
-        
-        return '\n'.join(lines)
     
-    def _generate_packed_read_code(self, lines: List[str], field_type: int, field_name: str) -> None:
-        """Generate code to read a single value in packed format (inside a loop)."""
-        cpp_type = TypeMapper.get_cpp_type(field_type)
-        method = TypeMapper.get_deserialization_method(field_type)
-        
-        if field_type == pb2.FieldDescriptorProto.TYPE_ENUM:
-            lines.append(f'                            uint64_t enum_val;')
-            lines.append(f'                            if (!reader.read_varint(enum_val)) return false;')
-            lines.append(f'                            value.{field_name}.push_back(static_cast<decltype(value.{field_name})::value_type>(enum_val));')
-        elif method == 'read_varint':
-            lines.append(f'                            uint64_t temp_varint;')
-            lines.append(f'                            if (!reader.{method}(temp_varint)) return false;')
-            if field_type == pb2.FieldDescriptorProto.TYPE_BOOL:
-                lines.append(f'                            value.{field_name}.push_back(temp_varint != 0);')
-            else:
-                lines.append(f'                            value.{field_name}.push_back(static_cast<{cpp_type}>(temp_varint));')
-        elif method in ('read_sint32', 'read_sint64'):
-            lines.append(f'                            {cpp_type} temp;')
-            lines.append(f'                            if (!reader.{method}(temp)) return false;')
-            lines.append(f'                            value.{field_name}.push_back(temp);')
-        elif field_type in (pb2.FieldDescriptorProto.TYPE_SFIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED64):
-            unsigned_type = 'uint32_t' if field_type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'uint64_t'
-            lines.append(f'                            {unsigned_type} temp_unsigned;')
-            lines.append(f'                            if (!reader.{method}(temp_unsigned)) return false;')
-            lines.append(f'                            {cpp_type} temp;')
-            lines.append(f'                            std::memcpy(&temp, &temp_unsigned, sizeof(temp));')
-            lines.append(f'                            value.{field_name}.push_back(temp);')
-        else:
-            lines.append(f'                            {cpp_type} temp;')
-            lines.append(f'                            if (!reader.{method}(temp)) return false;')
-            lines.append(f'                            value.{field_name}.push_back(temp);')
+    def _append_packed_read(self, lines: List[str], field_type: int, field_name: str) -> None:
+        """Append code reading a whole packed run into a repeated field to lines."""
+        lines.append(_PACKED_READ_TMPL.format(method=_PACKED_READERS[field_type], name=field_name))
     
     def _generate_unpacked_read_code(self, lines: List[str], field_type: int, field_name: str) -> None:
         """Generate code to read a single value in unpacked format."""
-        cpp_type = TypeMapper.get_cpp_type(field_type)
-        method = TypeMapper.get_deserialization_method(field_type)
-        
-        if field_type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_GROUP):
-            lines.append(f'                    // Read length-delimited message')
-            lines.append(f'                    uint64_t msg_length;')
-            lines.append(f'                    if (!reader.read_varint(msg_length)) return false;')
-            lines.append(f'                    ')
-            lines.append(f'                    // Read message bytes into buffer')
-            lines.append(f'                    std::vector<uint8_t> msg_buffer(msg_length);')
-            lines.append(f'                    if (!stream.read(msg_buffer.data(), msg_length)) return false;')
-            lines.append(f'                    ')
-            lines.append(f'                    // Create a stream from the buffer and parse')
-            lines.append(f'                    decltype(value.{field_name})::value_type temp;')
-            lines.append(f'                    litepb::BufferInputStream msg_stream(msg_buffer.data(), msg_buffer.size());')
-            lines.append(f'                    if (!litepb::Serializer<std::decay_t<decltype(temp)>>::parse(temp, msg_stream)) return false;')
-            lines.append(f'                    value.{field_name}.push_back(std::move(temp));')
-        elif field_type == pb2.FieldDescriptorProto.TYPE_ENUM:
-            lines.append(f'                        uint64_t enum_val;')
-            lines.append(f'                        if (!reader.read_varint(enum_val)) return false;')
-            lines.append(f'                        value.{field_name}.push_back(static_cast<decltype(value.{field_name})::value_type>(enum_val));')
+        if field_type in (TYPE_MESSAGE, TYPE_GROUP):
+            # Parse straight into the new element instead of moving a temporary in
+            lines.append(f'                    if (LITEPB_UNLIKELY(!{self._parse_message_call(f"value.{field_name}.emplace_back()")})) return false;')
+            return
+        cpp_type = TypeMapper.get_cpp_type(field_type, self.options.zero_copy_strings)
+        method = TypeMapper.get_deserialization_method(field_type, self.options.zero_copy_strings)
+        lines.append(self._repeated_read_template(field_type, method, cpp_type).format(name=field_name))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _repeated_read_template(field_type: int, method: str, cpp_type: str) -> str:
+        """Build the statements appending one unpacked scalar to a repeated field, with a {name} placeholder (memoized)."""
+        if field_type == TYPE_ENUM:
+            lines = ['                        uint64_t enum_val;',
+                     '                        if (LITEPB_UNLIKELY(!reader.read_varint(enum_val))) return false;',
+                     '                        value.{name}.push_back(static_cast<decltype(value.{name})::value_type>(enum_val));']
         elif method == 'read_varint':
-            lines.append(f'                        uint64_t temp_varint;')
-            lines.append(f'                        if (!reader.{method}(temp_varint)) return false;')
-            if field_type == pb2.FieldDescriptorProto.TYPE_BOOL:
-                lines.append(f'                        value.{field_name}.push_back(temp_varint != 0);')
+            lines = ['                        uint64_t temp_varint;',
+                     f'                        if (LITEPB_UNLIKELY(!reader.{method}(temp_varint))) return false;']
+            if field_type == TYPE_BOOL:
+                lines.append('                        value.{name}.push_back(temp_varint != 0);')
             else:
-                lines.append(f'                        value.{field_name}.push_back(static_cast<{cpp_type}>(temp_varint));')
-        elif method in ('read_sint32', 'read_sint64'):
-            lines.append(f'                        {cpp_type} temp;')
-            lines.append(f'                        if (!reader.{method}(temp)) return false;')
-            lines.append(f'                        value.{field_name}.push_back(temp);')
-        elif field_type in (pb2.FieldDescriptorProto.TYPE_SFIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED64):
-            unsigned_type = 'uint32_t' if field_type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'uint64_t'
-            lines.append(f'                        {unsigned_type} temp_unsigned;')
-            lines.append(f'                        if (!reader.{method}(temp_unsigned)) return false;')
-            lines.append(f'                        {cpp_type} temp;')
-            lines.append(f'                        std::memcpy(&temp, &temp_unsigned, sizeof(temp));')
-            lines.append(f'                        value.{field_name}.push_back(temp);')
+                lines.append(f'                        value.{{name}}.push_back(static_cast<{cpp_type}>(temp_varint));')
         else:
-            lines.append(f'                        {cpp_type} temp;')
-            lines.append(f'                        if (!reader.{method}(temp)) return false;')
-            lines.append(f'                        value.{field_name}.push_back(temp);')
+            # sint and sfixed types decode through their signed readers; other types read directly
+            lines = [f'                        {cpp_type} temp;',
+                     f'                        if (LITEPB_UNLIKELY(!reader.{method}(temp))) return false;',
+                     '                        value.{name}.push_back(temp);']
+        return '\n'.join(lines)
     
     def _generate_simple_read_to_optional(self, lines: List[str], field_type: int, field_name: str) -> None:
         """Generate read code for simple types into optional."""
-        method = TypeMapper.get_deserialization_method(field_type)
-        
-        if field_type in (pb2.FieldDescriptorProto.TYPE_SFIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED64):
-            unsigned_type = 'uint32_t' if field_type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'uint64_t'
-            lines.append(f'                    {unsigned_type} temp_unsigned;')
-            lines.append(f'                    if (!reader.{method}(temp_unsigned)) return false;')
-            lines.append(f'                    decltype(value.{field_name})::value_type temp;')
-            lines.append(f'                    std::memcpy(&temp, &temp_unsigned, sizeof(temp));')
-            lines.append(f'                    value.{field_name} = temp;')
-        elif method == 'read_varint':
-            lines.append(f'                    uint64_t temp_varint;')
-            lines.append(f'                    if (!reader.{method}(temp_varint)) return false;')
-            if field_type == pb2.FieldDescriptorProto.TYPE_BOOL:
-                lines.append(f'                    value.{field_name} = (temp_varint != 0);')
+        method = TypeMapper.get_deserialization_method(field_type, self.options.zero_copy_strings)
+        lines.append(self._scalar_read_template(field_type, method, True).format(name=field_name))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _scalar_read_template(field_type: int, method: str, optional: bool) -> str:
+        """Build the read statements for a singular scalar field, with a {name} placeholder (memoized)."""
+        # Optional fields read into a temporary of the wrapped type and assign it
+        target_type = 'decltype(value.{name})::value_type' if optional else 'decltype(value.{name})'
+        if method == 'read_varint':
+            lines = ['                    uint64_t temp_varint;',
+                     f'                    if (LITEPB_UNLIKELY(!reader.{method}(temp_varint))) return false;']
+            if field_type == TYPE_BOOL:
+                lines.append('                    value.{name} = (temp_varint != 0);')
             else:
-                lines.append(f'                    value.{field_name} = static_cast<decltype(value.{field_name})::value_type>(temp_varint);')
+                lines.append(f'                    value.{{name}} = static_cast<{target_type}>(temp_varint);')
+        elif optional:
+            lines = [f'                    {target_type} temp;',
+                     f'                    if (LITEPB_UNLIKELY(!reader.{method}(temp))) return false;',
+                     '                    value.{name} = temp;']
         else:
-            lines.append(f'                    decltype(value.{field_name})::value_type temp;')
-            lines.append(f'                    if (!reader.{method}(temp)) return false;')
-            lines.append(f'                    value.{field_name} = temp;')
+            lines = [f'                    if (LITEPB_UNLIKELY(!reader.{method}(value.{{name}}))) return false;']
+        return '\n'.join(lines)
     
-    def generate_map_read(self, map_field: MapFieldInfo, message: pb2.DescriptorProto) -> str:
-        """Generate read case for a map field."""
-        lines = []
+    def _append_map_read(self, map_field: MapFieldInfo, message: pb2.DescriptorProto, lines: List[str]) -> None:
+        """Append the read case for a map field to lines."""
         lines.append(f'                case {map_field.number}: {{')
         lines.append(f'                    // Read map entry')
         lines.append(f'                    uint64_t entry_length;')
-        lines.append(f'                    if (!reader.read_varint(entry_length)) return false;')
+        lines.append(f'                    if (LITEPB_UNLIKELY(!reader.read_varint(entry_length))) return false;')
         lines.append(f'                    ')
         
         # Declare key and value variables
-        key_cpp_type = TypeMapper.get_cpp_type(map_field.key_field.type)
-        if map_field.value_field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
+        key_cpp_type = TypeMapper.get_cpp_type(map_field.key_field.type, self.options.zero_copy_strings)
+        if map_field.value_field.type in (TYPE_MESSAGE, TYPE_ENUM):
             val_cpp_type = TypeMapper.qualify_type_name(map_field.value_field.type_name, "")
         else:
-            val_cpp_type = TypeMapper.get_cpp_type(map_field.value_field.type)
+            val_cpp_type = TypeMapper.get_cpp_type(map_field.value_field.type, self.options.zero_copy_strings)
         
         lines.append(f'                    {key_cpp_type} entry_key{{}};')
         lines.append(f'                    {val_cpp_type} entry_val{{}};')
@@ -863,115 +986,81 @@ class SerializationCodegen:
         lines.append(f'                    while (reader.position() < entry_end) {{')
         lines.append(f'                        uint32_t entry_field;')
         lines.append(f'                        litepb::WireType entry_wire;')
-        lines.append(f'                        if (!reader.read_tag(entry_field, entry_wire)) return false;')
+        lines.append(f'                        if (LITEPB_UNLIKELY(!reader.read_tag(entry_field, entry_wire))) return false;')
         lines.append(f'                        ')
         lines.append(f'                        if (entry_field == 1) {{  // key')
         
         # Read key
-        key_method = TypeMapper.get_deserialization_method(map_field.key_field.type)
-        if map_field.key_field.type in (pb2.FieldDescriptorProto.TYPE_SFIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED64):
-            unsigned_type = 'uint32_t' if map_field.key_field.type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'uint64_t'
-            lines.append(f'                            {unsigned_type} temp_unsigned;')
-            lines.append(f'                            if (!reader.{key_method}(temp_unsigned)) return false;')
-            lines.append(f'                            std::memcpy(&entry_key, &temp_unsigned, sizeof(entry_key));')
-        elif key_method == 'read_varint':
+        key_method = TypeMapper.get_deserialization_method(map_field.key_field.type, self.options.zero_copy_strings)
+        if key_method == 'read_varint':
             lines.append(f'                            uint64_t temp;')
-            lines.append(f'                            if (!reader.{key_method}(temp)) return false;')
-            if map_field.key_field.type == pb2.FieldDescriptorProto.TYPE_BOOL:
+            lines.append(f'                            if (LITEPB_UNLIKELY(!reader.{key_method}(temp))) return false;')
+            if map_field.key_field.type == TYPE_BOOL:
                 lines.append(f'                            entry_key = (temp != 0);')
             else:
                 lines.append(f'                            entry_key = static_cast<{key_cpp_type}>(temp);')
         else:
-            lines.append(f'                            if (!reader.{key_method}(entry_key)) return false;')
+            lines.append(f'                            if (LITEPB_UNLIKELY(!reader.{key_method}(entry_key))) return false;')
         
         lines.append(f'                        }} else if (entry_field == 2) {{  // value')
         
         # Read value
-        if map_field.value_field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
-            lines.append(f'                            // Read length-delimited message')
-            lines.append(f'                            uint64_t msg_length;')
-            lines.append(f'                            if (!reader.read_varint(msg_length)) return false;')
-            lines.append(f'                            ')
-            lines.append(f'                            // Read message bytes into buffer')
-            lines.append(f'                            std::vector<uint8_t> msg_buffer(msg_length);')
-            lines.append(f'                            if (!stream.read(msg_buffer.data(), msg_length)) return false;')
-            lines.append(f'                            ')
-            lines.append(f'                            // Create a stream from the buffer and parse')
-            lines.append(f'                            litepb::BufferInputStream msg_stream(msg_buffer.data(), msg_buffer.size());')
-            lines.append(f'                            if (!litepb::Serializer<{val_cpp_type}>::parse(entry_val, msg_stream)) return false;')
-        elif map_field.value_field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
+        if map_field.value_field.type == TYPE_MESSAGE:
+            lines.append(f'                            if (LITEPB_UNLIKELY(!{self._parse_message_call("entry_val")})) return false;')
+        elif map_field.value_field.type == TYPE_ENUM:
             lines.append(f'                            uint64_t temp;')
-            lines.append(f'                            if (!reader.read_varint(temp)) return false;')
+            lines.append(f'                            if (LITEPB_UNLIKELY(!reader.read_varint(temp))) return false;')
             lines.append(f'                            entry_val = static_cast<{val_cpp_type}>(temp);')
         else:
-            val_method = TypeMapper.get_deserialization_method(map_field.value_field.type)
-            if map_field.value_field.type in (pb2.FieldDescriptorProto.TYPE_SFIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED64):
-                unsigned_type = 'uint32_t' if map_field.value_field.type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'uint64_t'
-                lines.append(f'                            {unsigned_type} temp_unsigned;')
-                lines.append(f'                            if (!reader.{val_method}(temp_unsigned)) return false;')
-                lines.append(f'                            std::memcpy(&entry_val, &temp_unsigned, sizeof(entry_val));')
-            elif val_method == 'read_varint':
+            val_method = TypeMapper.get_deserialization_method(map_field.value_field.type, self.options.zero_copy_strings)
+            if val_method == 'read_varint':
                 lines.append(f'                            uint64_t temp;')
-                lines.append(f'                            if (!reader.{val_method}(temp)) return false;')
-                if map_field.value_field.type == pb2.FieldDescriptorProto.TYPE_BOOL:
+                lines.append(f'                            if (LITEPB_UNLIKELY(!reader.{val_method}(temp))) return false;')
+                if map_field.value_field.type == TYPE_BOOL:
                     lines.append(f'                            entry_val = (temp != 0);')
                 else:
                     lines.append(f'                            entry_val = static_cast<{val_cpp_type}>(temp);')
             else:
-                lines.append(f'                            if (!reader.{val_method}(entry_val)) return false;')
+                lines.append(f'                            if (LITEPB_UNLIKELY(!reader.{val_method}(entry_val))) return false;')
         
         lines.append(f'                        }} else {{')
-        lines.append(f'                            if (!reader.skip_field(entry_wire)) return false;')
+        lines.append(f'                            if (LITEPB_UNLIKELY(!reader.skip_field(entry_wire))) return false;')
         lines.append(f'                        }}')
         lines.append(f'                    }}')
         lines.append(f'                    ')
-        lines.append(f'                    value.{map_field.name}[entry_key] = entry_val;')
+        lines.append(f'                    value.{map_field.name}.insert_or_assign(std::move(entry_key), std::move(entry_val));')
         lines.append('                    break;')
         lines.append('                }')
-        
-        return '\n'.join(lines)
     
-    def generate_oneof_field_read(self, field: pb2.FieldDescriptorProto, oneof: OneofInfo, message: pb2.DescriptorProto) -> str:
-        """Generate read case for a field within a oneof."""
+    def _append_oneof_field_read(self, field: pb2.FieldDescriptorProto, oneof: OneofInfo, message: pb2.DescriptorProto, lines: List[str]) -> None:
+        """Append the read case for a field within a oneof to lines."""
         oneof_name = oneof.name
         field_num = field.number
         
-        lines = []
         lines.append(f'                case {field_num}: {{')
         
         cpp_type = self._get_oneof_field_cpp_type(field)
         
-        if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_GROUP):
-            lines.append(f'                    {cpp_type} oneof_val;')
-            lines.append(f'                    if (!litepb::Serializer<{cpp_type}>::parse(oneof_val, stream)) return false;')
-            lines.append(f'                    value.{oneof_name} = std::move(oneof_val);')
-        elif field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
+        if field.type in (TYPE_MESSAGE, TYPE_GROUP):
+            # Parse straight into the variant alternative instead of moving a temporary in
+            lines.append(f'                    auto& oneof_val = value.{oneof_name}.emplace<{cpp_type}>();')
+            lines.append(f'                    if (LITEPB_UNLIKELY(!{self._parse_message_call("oneof_val")})) return false;')
+        elif field.type == TYPE_ENUM:
             lines.append(f'                    uint64_t enum_val;')
-            lines.append(f'                    if (!reader.read_varint(enum_val)) return false;')
+            lines.append(f'                    if (LITEPB_UNLIKELY(!reader.read_varint(enum_val))) return false;')
             lines.append(f'                    value.{oneof_name} = static_cast<{cpp_type}>(enum_val);')
         else:
-            method = TypeMapper.get_deserialization_method(field.type)
-            if field.type in (pb2.FieldDescriptorProto.TYPE_SFIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED64):
-                unsigned_type = 'uint32_t' if field.type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'uint64_t'
-                read_method = 'read_fixed32' if field.type == pb2.FieldDescriptorProto.TYPE_SFIXED32 else 'read_fixed64'
-                lines.append(f'                    {unsigned_type} temp_unsigned;')
-                lines.append(f'                    if (!reader.{read_method}(temp_unsigned)) return false;')
-                lines.append(f'                    {cpp_type} oneof_val;')
-                lines.append(f'                    std::memcpy(&oneof_val, &temp_unsigned, sizeof(oneof_val));')
-                lines.append(f'                    value.{oneof_name} = oneof_val;')
-            elif method == 'read_varint':
+            method = TypeMapper.get_deserialization_method(field.type, self.options.zero_copy_strings)
+            if method == 'read_varint':
                 lines.append(f'                    uint64_t temp_varint;')
-                lines.append(f'                    if (!reader.{method}(temp_varint)) return false;')
-                if field.type == pb2.FieldDescriptorProto.TYPE_BOOL:
+                lines.append(f'                    if (LITEPB_UNLIKELY(!reader.{method}(temp_varint))) return false;')
+                if field.type == TYPE_BOOL:
                     lines.append(f'                    value.{oneof_name} = (temp_varint != 0);')
                 else:
                     lines.append(f'                    value.{oneof_name} = static_cast<{cpp_type}>(temp_varint);')
             else:
-                lines.append(f'                    {cpp_type} oneof_val;')
-                lines.append(f'                    if (!reader.{method}(oneof_val)) return false;')
-                lines.append(f'                    value.{oneof_name} = oneof_val;')
+                lines.append(f'                    auto& oneof_val = value.{oneof_name}.emplace<{cpp_type}>();')
+                lines.append(f'                    if (LITEPB_UNLIKELY(!reader.{method}(oneof_val))) return false;')
         
         lines.append('                    break;')
         lines.append('                }')
-        
-        return '\n'.join(lines)
@@ -4,8 +4,29 @@ Type mapper for converting protobuf types to C++ types.
 Uses protobuf enums directly instead of string conversions.
 """
 
-from typing import Dict, Optional
+import functools
+import sys
+from typing import Dict, Optional, Tuple
 from google.protobuf import descriptor_pb2 as pb2
+from .descriptor_consts import (
+    TYPE_DOUBLE, TYPE_FLOAT, TYPE_INT64, TYPE_UINT64, TYPE_INT32, TYPE_FIXED64, TYPE_FIXED32,
+    TYPE_BOOL, TYPE_STRING, TYPE_MESSAGE, TYPE_BYTES, TYPE_UINT32, TYPE_ENUM, TYPE_SFIXED32,
+    TYPE_SFIXED64, TYPE_SINT32, TYPE_SINT64
+)
+
+
+# Field type enums are small dense integers (TYPE_DOUBLE=1 .. TYPE_SINT64=18)
+_TYPE_TABLE_SIZE = max(pb2.FieldDescriptorProto.Type.values()) + 1
+
+
+def _dense_table(mapping: Dict[int, str], default: str) -> Tuple[str, ...]:
+    """
+    Flatten a type-keyed dict into a tuple indexed directly by the type enum.
+    
+    Values are interned so the many equal strings handed out per field share
+    one object and compare by identity on the fast path.
+    """
+    return tuple(sys.intern(mapping.get(field_type, default)) for field_type in range(_TYPE_TABLE_SIZE))
 
 
 class TypeMapper:
@@ -13,246 +34,213 @@ class TypeMapper:
     
     # Map from protobuf type enums to C++ types
     CPP_TYPE_MAP: Dict[int, str] = {
-        pb2.FieldDescriptorProto.TYPE_DOUBLE: 'double',
-        pb2.FieldDescriptorProto.TYPE_FLOAT: 'float',
-        pb2.FieldDescriptorProto.TYPE_INT64: 'int64_t',
-        pb2.FieldDescriptorProto.TYPE_UINT64: 'uint64_t',
-        pb2.FieldDescriptorProto.TYPE_INT32: 'int32_t',
-        pb2.FieldDescriptorProto.TYPE_FIXED64: 'uint64_t',
-        pb2.FieldDescriptorProto.TYPE_FIXED32: 'uint32_t',
-        pb2.FieldDescriptorProto.TYPE_BOOL: 'bool',
-        pb2.FieldDescriptorProto.TYPE_STRING: 'std::string',
-        pb2.FieldDescriptorProto.TYPE_BYTES: 'std::vector<uint8_t>',
-        pb2.FieldDescriptorProto.TYPE_UINT32: 'uint32_t',
-        pb2.FieldDescriptorProto.TYPE_SFIXED32: 'int32_t',
-        pb2.FieldDescriptorProto.TYPE_SFIXED64: 'int64_t',
-        pb2.FieldDescriptorProto.TYPE_SINT32: 'int32_t',
-        pb2.FieldDescriptorProto.TYPE_SINT64: 'int64_t',
+        TYPE_DOUBLE: 'double',
+        TYPE_FLOAT: 'float',
+        TYPE_INT64: 'int64_t',
+        TYPE_UINT64: 'uint64_t',
+        TYPE_INT32: 'int32_t',
+        TYPE_FIXED64: 'uint64_t',
+        TYPE_FIXED32: 'uint32_t',
+        TYPE_BOOL: 'bool',
+        TYPE_STRING: 'std::string',
+        TYPE_BYTES: 'std::vector<uint8_t>',
+        TYPE_UINT32: 'uint32_t',
+        TYPE_SFIXED32: 'int32_t',
+        TYPE_SFIXED64: 'int64_t',
+        TYPE_SINT32: 'int32_t',
+        TYPE_SINT64: 'int64_t',
     }
     
     # Wire type mapping
     WIRE_TYPE_MAP: Dict[int, str] = {
-        pb2.FieldDescriptorProto.TYPE_DOUBLE: 'litepb::WIRE_TYPE_FIXED64',
-        pb2.FieldDescriptorProto.TYPE_FLOAT: 'litepb::WIRE_TYPE_FIXED32',
-        pb2.FieldDescriptorProto.TYPE_INT64: 'litepb::WIRE_TYPE_VARINT',
-        pb2.FieldDescriptorProto.TYPE_UINT64: 'litepb::WIRE_TYPE_VARINT',
-        pb2.FieldDescriptorProto.TYPE_INT32: 'litepb::WIRE_TYPE_VARINT',
-        pb2.FieldDescriptorProto.TYPE_FIXED64: 'litepb::WIRE_TYPE_FIXED64',
-        pb2.FieldDescriptorProto.TYPE_FIXED32: 'litepb::WIRE_TYPE_FIXED32',
-        pb2.FieldDescriptorProto.TYPE_BOOL: 'litepb::WIRE_TYPE_VARINT',
-        pb2.FieldDescriptorProto.TYPE_STRING: 'litepb::WIRE_TYPE_LENGTH_DELIMITED',
-        pb2.FieldDescriptorProto.TYPE_BYTES: 'litepb::WIRE_TYPE_LENGTH_DELIMITED',
-        pb2.FieldDescriptorProto.TYPE_UINT32: 'litepb::WIRE_TYPE_VARINT',
-        pb2.FieldDescriptorProto.TYPE_SFIXED32: 'litepb::WIRE_TYPE_FIXED32',
-        pb2.FieldDescriptorProto.TYPE_SFIXED64: 'litepb::WIRE_TYPE_FIXED64',
-        pb2.FieldDescriptorProto.TYPE_SINT32: 'litepb::WIRE_TYPE_VARINT',
-        pb2.FieldDescriptorProto.TYPE_SINT64: 'litepb::WIRE_TYPE_VARINT',
-        pb2.FieldDescriptorProto.TYPE_MESSAGE: 'litepb::WIRE_TYPE_LENGTH_DELIMITED',
-        pb2.FieldDescriptorProto.TYPE_ENUM: 'litepb::WIRE_TYPE_VARINT',
+        TYPE_DOUBLE: 'litepb::WIRE_TYPE_FIXED64',
+        TYPE_FLOAT: 'litepb::WIRE_TYPE_FIXED32',
+        TYPE_INT64: 'litepb::WIRE_TYPE_VARINT',
+        TYPE_UINT64: 'litepb::WIRE_TYPE_VARINT',
+        TYPE_INT32: 'litepb::WIRE_TYPE_VARINT',
+        TYPE_FIXED64: 'litepb::WIRE_TYPE_FIXED64',
+        TYPE_FIXED32: 'litepb::WIRE_TYPE_FIXED32',
+        TYPE_BOOL: 'litepb::WIRE_TYPE_VARINT',
+        TYPE_STRING: 'litepb::WIRE_TYPE_LENGTH_DELIMITED',
+        TYPE_BYTES: 'litepb::WIRE_TYPE_LENGTH_DELIMITED',
+        TYPE_UINT32: 'litepb::WIRE_TYPE_VARINT',
+        TYPE_SFIXED32: 'litepb::WIRE_TYPE_FIXED32',
+        TYPE_SFIXED64: 'litepb::WIRE_TYPE_FIXED64',
+        TYPE_SINT32: 'litepb::WIRE_TYPE_VARINT',
+        TYPE_SINT64: 'litepb::WIRE_TYPE_VARINT',
+        TYPE_MESSAGE: 'litepb::WIRE_TYPE_LENGTH_DELIMITED',
+        TYPE_ENUM: 'litepb::WIRE_TYPE_VARINT',
     }
     
     # Default values for each type
     DEFAULT_VALUES: Dict[int, str] = {
-        pb2.FieldDescriptorProto.TYPE_DOUBLE: '0.0',
-        pb2.FieldDescriptorProto.TYPE_FLOAT: '0.0f',
-        pb2.FieldDescriptorProto.TYPE_INT64: '0',
-        pb2.FieldDescriptorProto.TYPE_UINT64: '0',
-        pb2.FieldDescriptorProto.TYPE_INT32: '0',
-        pb2.FieldDescriptorProto.TYPE_FIXED64: '0',
-        pb2.FieldDescriptorProto.TYPE_FIXED32: '0',
-        pb2.FieldDescriptorProto.TYPE_BOOL: 'false',
-        pb2.FieldDescriptorProto.TYPE_STRING: '""',
-        pb2.FieldDescriptorProto.TYPE_BYTES: '{}',
-        pb2.FieldDescriptorProto.TYPE_UINT32: '0',
-        pb2.FieldDescriptorProto.TYPE_SFIXED32: '0',
-        pb2.FieldDescriptorProto.TYPE_SFIXED64: '0',
-        pb2.FieldDescriptorProto.TYPE_SINT32: '0',
-        pb2.FieldDescriptorProto.TYPE_SINT64: '0',
+        TYPE_DOUBLE: '0.0',
+        TYPE_FLOAT: '0.0f',
+        TYPE_INT64: '0',
+        TYPE_UINT64: '0',
+        TYPE_INT32: '0',
+        TYPE_FIXED64: '0',
+        TYPE_FIXED32: '0',
+        TYPE_BOOL: 'false',
+        TYPE_STRING: '""',
+        TYPE_BYTES: '{}',
+        TYPE_UINT32: '0',
+        TYPE_SFIXED32: '0',
+        TYPE_SFIXED64: '0',
+        TYPE_SINT32: '0',
+        TYPE_SINT64: '0',
     }
     
-    @classmethod
-    def get_cpp_type(cls, field_type: int) -> str:
-        """Get the C++ type for a protobuf type enum."""
-        return cls.CPP_TYPE_MAP.get(field_type, '')
+    # ProtoWriter method used to serialize each type; int32 and enum stay on write_varint
+    # because negative values are sign-extended to ten bytes
+    SERIALIZATION_METHOD_MAP: Dict[int, str] = {
+        TYPE_DOUBLE: 'write_double',
+        TYPE_FLOAT: 'write_float',
+        TYPE_INT64: 'write_varint',
+        TYPE_UINT64: 'write_varint',
+        TYPE_INT32: 'write_varint',
+        TYPE_FIXED64: 'write_fixed64',
+        TYPE_FIXED32: 'write_fixed32',
+        TYPE_BOOL: 'write_varint32',
+        TYPE_STRING: 'write_string',
+        TYPE_BYTES: 'write_bytes',
+        TYPE_UINT32: 'write_varint32',
+        TYPE_SFIXED32: 'write_sfixed32',
+        TYPE_SFIXED64: 'write_sfixed64',
+        TYPE_SINT32: 'write_sint32',
+        TYPE_SINT64: 'write_sint64',
+    }
     
-    @classmethod
-    def get_field_cpp_type(cls, field: pb2.FieldDescriptorProto, file_proto: pb2.FileDescriptorProto) -> str:
-        """
-        Get the complete C++ type for a field, including containers.
-        
-        Args:
-            field: Field descriptor
-            file_proto: File descriptor for context
-            
-        Returns:
-            Complete C++ type string
-        """
-        base_type = ''
-        
-        # Get base type
-        if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
-            # Use the type name directly, qualified if needed
-            type_name = field.type_name if field.HasField('type_name') else ''
-            package = file_proto.package if file_proto.package else ''
-            base_type = cls.qualify_type_name(type_name, package)
-        else:
-            base_type = cls.get_cpp_type(field.type)
-        
-        # Handle repeated fields
-        if field.label == pb2.FieldDescriptorProto.LABEL_REPEATED:
-            if field.type == pb2.FieldDescriptorProto.TYPE_BYTES:
-                # Special case: repeated bytes is vector<vector<uint8_t>>
-                return 'std::vector<std::vector<uint8_t>>'
-            return f'std::vector<{base_type}>'
-        
-        # Handle optional fields
-        syntax = file_proto.syntax if file_proto.syntax else 'proto2'
-        if field.label == pb2.FieldDescriptorProto.LABEL_OPTIONAL:
-            # Proto2 optional or proto3 explicit optional
-            return f'std::optional<{base_type}>'
-        
-        return base_type
+    # ProtoReader method used to deserialize each type
+    DESERIALIZATION_METHOD_MAP: Dict[int, str] = {
+        TYPE_DOUBLE: 'read_double',
+        TYPE_FLOAT: 'read_float',
+        TYPE_INT64: 'read_varint',
+        TYPE_UINT64: 'read_varint',
+        TYPE_INT32: 'read_varint',
+        TYPE_FIXED64: 'read_fixed64',
+        TYPE_FIXED32: 'read_fixed32',
+        TYPE_BOOL: 'read_varint',
+        TYPE_STRING: 'read_string',
+        TYPE_BYTES: 'read_bytes',
+        TYPE_UINT32: 'read_varint',
+        TYPE_SFIXED32: 'read_sfixed32',
+        TYPE_SFIXED64: 'read_sfixed64',
+        TYPE_SINT32: 'read_sint32',
+        TYPE_SINT64: 'read_sint64',
+    }
+    
+    # Tuples indexed by type enum, used by the per-field lookups below
+    _CPP_TYPES = _dense_table(CPP_TYPE_MAP, '')
+    _CPP_VIEW_TYPES = _dense_table({**CPP_TYPE_MAP, TYPE_STRING: 'std::string_view'}, '')
+    _WIRE_TYPES = _dense_table(WIRE_TYPE_MAP, 'litepb::WIRE_TYPE_VARINT')
+    _DEFAULT_VALUES = _dense_table(DEFAULT_VALUES, '{}')
+    _SERIALIZATION_METHODS = _dense_table(SERIALIZATION_METHOD_MAP, 'write_varint')
+    _DESERIALIZATION_METHODS = _dense_table(DESERIALIZATION_METHOD_MAP, 'read_varint')
+    _VIEW_DESERIALIZATION_METHODS = _dense_table({**DESERIALIZATION_METHOD_MAP, TYPE_STRING: 'read_string_view'},
+                                                 'read_varint')
+    
+    # Size expression of one packed item; varint-encoded types use the default
+    _PACKED_SIZE_FORMATS = _dense_table({
+        TYPE_SINT32: 'litepb::ProtoWriter::sint32_size({item})',
+        TYPE_SINT64: 'litepb::ProtoWriter::sint64_size({item})',
+        TYPE_FIXED32: 'litepb::ProtoWriter::fixed32_size()',
+        TYPE_SFIXED32: 'litepb::ProtoWriter::fixed32_size()',
+        TYPE_FLOAT: 'litepb::ProtoWriter::fixed32_size()',
+        TYPE_FIXED64: 'litepb::ProtoWriter::fixed64_size()',
+        TYPE_SFIXED64: 'litepb::ProtoWriter::fixed64_size()',
+        TYPE_DOUBLE: 'litepb::ProtoWriter::fixed64_size()',
+    }, 'litepb::ProtoWriter::varint_size(static_cast<uint64_t>({item}))')
+    
+    # Numeric litepb::WireType values, used to pre-encode tags at generation time
+    _WIRE_TYPE_VALUES: Dict[str, int] = {
+        'litepb::WIRE_TYPE_VARINT': 0,
+        'litepb::WIRE_TYPE_FIXED64': 1,
+        'litepb::WIRE_TYPE_LENGTH_DELIMITED': 2,
+        'litepb::WIRE_TYPE_START_GROUP': 3,
+        'litepb::WIRE_TYPE_END_GROUP': 4,
+        'litepb::WIRE_TYPE_FIXED32': 5,
+    }
+    
+    # Escapes backslashes and quotes in string defaults in a single pass
+    _STRING_ESC_TABLE = str.maketrans({'\\': '\\\\', '"': '\\"'})
+    
+    # Types whose encoded item size is fixed; bool is always a one-byte varint
+    _CONSTANT_ITEM_SIZES: Dict[int, int] = {
+        TYPE_BOOL: 1,
+        TYPE_FIXED32: 4,
+        TYPE_SFIXED32: 4,
+        TYPE_FLOAT: 4,
+        TYPE_FIXED64: 8,
+        TYPE_SFIXED64: 8,
+        TYPE_DOUBLE: 8,
+    }
     
     @classmethod
-    def get_map_cpp_type(cls, key_field: pb2.FieldDescriptorProto, value_field: pb2.FieldDescriptorProto, file_proto: pb2.FileDescriptorProto) -> str:
-        """
-        Get the C++ type for a map field.
-        
-        Args:
-            key_field: Key field descriptor from map entry
-            value_field: Value field descriptor from map entry
-            file_proto: File descriptor for context
-            
-        Returns:
-            C++ map type string
-        """
-        # Get key type
-        key_type = cls.get_cpp_type(key_field.type)
-        
-        # Get value type
-        if value_field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
-            value_type_name = value_field.type_name if value_field.HasField('type_name') else ''
-            package = file_proto.package if file_proto.package else ''
-            value_type = cls.qualify_type_name(value_type_name, package)
-        else:
-            value_type = cls.get_cpp_type(value_field.type)
-        
-        return f'std::unordered_map<{key_type}, {value_type}>'
+    def get_cpp_type(cls, field_type: int, zero_copy_strings: bool = False) -> str:
+        """Get the C++ type for a protobuf type enum (std::string_view for strings in zero-copy mode)."""
+        table = cls._CPP_VIEW_TYPES if zero_copy_strings else cls._CPP_TYPES
+        return table[field_type] if 0 <= field_type < _TYPE_TABLE_SIZE else ''
     
     @classmethod
-    def get_oneof_cpp_type(cls, fields: list, file_proto: pb2.FileDescriptorProto) -> str:
-        """
-        Get the C++ type for a oneof field (using std::variant).
-        
-        Args:
-            fields: List of FieldDescriptorProto objects in the oneof
-            file_proto: File descriptor for context
-            
-        Returns:
-            C++ variant type string
-        """
-        variant_types = ['std::monostate']  # Default empty state
-        
-        for field in fields:
-            if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
-                type_name = field.type_name if field.HasField('type_name') else ''
-                package = file_proto.package if file_proto.package else ''
-                field_type = cls.qualify_type_name(type_name, package)
-            else:
-                field_type = cls.get_cpp_type(field.type)
-            variant_types.append(field_type)
-        
-        return f'std::variant<{", ".join(variant_types)}>'
+    def get_map_container(cls, ordered: bool = False) -> str:
+        """Get the C++ container template for map fields (std::map when ordered)."""
+        return 'std::map' if ordered else 'std::unordered_map'
     
     @classmethod
     def get_wire_type(cls, field_type: int) -> str:
         """Get the wire type for a protobuf type enum."""
-        return cls.WIRE_TYPE_MAP.get(field_type, 'litepb::WIRE_TYPE_VARINT')
+        return cls._WIRE_TYPES[field_type] if 0 <= field_type < _TYPE_TABLE_SIZE else 'litepb::WIRE_TYPE_VARINT'
     
     @classmethod
-    def get_default_value(cls, field: pb2.FieldDescriptorProto, file_proto: pb2.FileDescriptorProto) -> str:
+    def get_default_value(cls, field: pb2.FieldDescriptorProto, package: str) -> str:
         """
         Get the default value for a field.
         
         Args:
             field: Field descriptor
-            file_proto: File descriptor for context
+            package: Proto package of the file being generated
             
         Returns:
             Default value as C++ code string
         """
         # Check for explicit default value
-        if field.HasField('default_value'):
-            default_val = field.default_value
-            
+        default_val = field.default_value
+        if default_val:
             # Handle string defaults
-            if field.type == pb2.FieldDescriptorProto.TYPE_STRING:
+            if field.type == TYPE_STRING:
                 # Escape the string properly
-                escaped = default_val.replace('\\', '\\\\').replace('"', '\\"')
+                escaped = default_val.translate(cls._STRING_ESC_TABLE)
                 return f'"{escaped}"'
             
             # Handle bool defaults
-            if field.type == pb2.FieldDescriptorProto.TYPE_BOOL:
+            if field.type == TYPE_BOOL:
                 return 'true' if default_val.lower() == 'true' else 'false'
             
             # Handle enum defaults
-            if field.type == pb2.FieldDescriptorProto.TYPE_ENUM:
+            if field.type == TYPE_ENUM:
                 # Return the enum value name
-                package = file_proto.package if file_proto.package else ''
                 return cls.qualify_type_name(default_val, package)
             
             # For numeric types, return as-is
             return default_val
         
         # Return standard defaults
-        if field.type in (pb2.FieldDescriptorProto.TYPE_MESSAGE, pb2.FieldDescriptorProto.TYPE_ENUM):
+        if field.type in (TYPE_MESSAGE, TYPE_ENUM):
             return '{}'
         
-        return cls.DEFAULT_VALUES.get(field.type, '{}')
+        return cls._DEFAULT_VALUES[field.type] if 0 <= field.type < _TYPE_TABLE_SIZE else '{}'
     
     @classmethod
     def get_serialization_method(cls, field_type: int) -> str:
         """Get the ProtoWriter method name for serializing a type."""
-        method_map: Dict[int, str] = {
-            pb2.FieldDescriptorProto.TYPE_DOUBLE: 'write_double',
-            pb2.FieldDescriptorProto.TYPE_FLOAT: 'write_float',
-            pb2.FieldDescriptorProto.TYPE_INT64: 'write_varint',
-            pb2.FieldDescriptorProto.TYPE_UINT64: 'write_varint',
-            pb2.FieldDescriptorProto.TYPE_INT32: 'write_varint',
-            pb2.FieldDescriptorProto.TYPE_FIXED64: 'write_fixed64',
-            pb2.FieldDescriptorProto.TYPE_FIXED32: 'write_fixed32',
-            pb2.FieldDescriptorProto.TYPE_BOOL: 'write_varint',
-            pb2.FieldDescriptorProto.TYPE_STRING: 'write_string',
-            pb2.FieldDescriptorProto.TYPE_BYTES: 'write_bytes',
-            pb2.FieldDescriptorProto.TYPE_UINT32: 'write_varint',
-            pb2.FieldDescriptorProto.TYPE_SFIXED32: 'write_sfixed32',
-            pb2.FieldDescriptorProto.TYPE_SFIXED64: 'write_sfixed64',
-            pb2.FieldDescriptorProto.TYPE_SINT32: 'write_sint32',
-            pb2.FieldDescriptorProto.TYPE_SINT64: 'write_sint64',
-        }
-        return method_map.get(field_type, 'write_varint')
+        return cls._SERIALIZATION_METHODS[field_type] if 0 <= field_type < _TYPE_TABLE_SIZE else 'write_varint'
 
     @classmethod
-    def get_deserialization_method(cls, field_type: int) -> str:
+    def get_deserialization_method(cls, field_type: int, zero_copy_strings: bool = False) -> str:
         """Get the ProtoReader method name for deserializing a type."""
-        method_map: Dict[int, str] = {
-            pb2.FieldDescriptorProto.TYPE_DOUBLE: 'read_double',
-            pb2.FieldDescriptorProto.TYPE_FLOAT: 'read_float',
-            pb2.FieldDescriptorProto.TYPE_INT64: 'read_varint',
-            pb2.FieldDescriptorProto.TYPE_UINT64: 'read_varint',
-            pb2.FieldDescriptorProto.TYPE_INT32: 'read_varint',
-            pb2.FieldDescriptorProto.TYPE_FIXED64: 'read_fixed64',
-            pb2.FieldDescriptorProto.TYPE_FIXED32: 'read_fixed32',
-            pb2.FieldDescriptorProto.TYPE_BOOL: 'read_varint',
-            pb2.FieldDescriptorProto.TYPE_STRING: 'read_string',
-            pb2.FieldDescriptorProto.TYPE_BYTES: 'read_bytes',
-            pb2.FieldDescriptorProto.TYPE_UINT32: 'read_varint',
-            pb2.FieldDescriptorProto.TYPE_SFIXED32: 'read_fixed32',
-            pb2.FieldDescriptorProto.TYPE_SFIXED64: 'read_fixed64',
-            pb2.FieldDescriptorProto.TYPE_SINT32: 'read_sint32',
-            pb2.FieldDescriptorProto.TYPE_SINT64: 'read_sint64',
-        }
-        return method_map.get(field_type, 'read_varint')
+        table = cls._VIEW_DESERIALIZATION_METHODS if zero_copy_strings else cls._DESERIALIZATION_METHODS
+        return table[field_type] if 0 <= field_type < _TYPE_TABLE_SIZE else 'read_varint'
 
     @classmethod
     def needs_pointer(cls, field_type: int) -> bool:
@@ -262,6 +250,7 @@ class TypeMapper:
         return False
     
     @classmethod
+    @functools.lru_cache(maxsize=4096)
     def qualify_type_name(cls, type_name: str, package: str = '', current_scope: str = '') -> str:
         """
         Qualify a protobuf type name for C++ usage.
@@ -289,23 +278,47 @@ class TypeMapper:
     @classmethod
     def get_packed_size_expression(cls, field_type: int, item_name: str) -> str:
         """Get the expression to calculate the size of a packed field item."""
-        if field_type in (pb2.FieldDescriptorProto.TYPE_INT32, pb2.FieldDescriptorProto.TYPE_INT64,
-                         pb2.FieldDescriptorProto.TYPE_UINT32, pb2.FieldDescriptorProto.TYPE_UINT64,
-                         pb2.FieldDescriptorProto.TYPE_BOOL, pb2.FieldDescriptorProto.TYPE_ENUM):
-            return f'litepb::ProtoWriter::varint_size(static_cast<uint64_t>({item_name}))'
-        elif field_type == pb2.FieldDescriptorProto.TYPE_SINT32:
-            return f'litepb::ProtoWriter::sint32_size({item_name})'
-        elif field_type == pb2.FieldDescriptorProto.TYPE_SINT64:
-            return f'litepb::ProtoWriter::sint64_size({item_name})'
-        elif field_type in (pb2.FieldDescriptorProto.TYPE_FIXED32, pb2.FieldDescriptorProto.TYPE_SFIXED32, 
-                           pb2.FieldDescriptorProto.TYPE_FLOAT):
-            return f'litepb::ProtoWriter::fixed32_size()'
-        elif field_type in (pb2.FieldDescriptorProto.TYPE_FIXED64, pb2.FieldDescriptorProto.TYPE_SFIXED64,
-                           pb2.FieldDescriptorProto.TYPE_DOUBLE):
-            return f'litepb::ProtoWriter::fixed64_size()'
-        else:
-            # Fallback
-            return f'litepb::ProtoWriter::varint_size(static_cast<uint64_t>({item_name}))'
+        if 0 <= field_type < _TYPE_TABLE_SIZE:
+            return cls._PACKED_SIZE_FORMATS[field_type].format(item=item_name)
+        return cls._PACKED_SIZE_FORMATS[0].format(item=item_name)
+    
+    @classmethod
+    def get_constant_item_size(cls, field_type: int) -> Optional[int]:
+        """
+        Get the encoded size of one packed item when it does not depend on the value.
+        
+        Enums are left out on purpose: proto3 enums are open, so a parsed value
+        can exceed the largest declared enumerant.
+        """
+        return cls._CONSTANT_ITEM_SIZES.get(field_type)
+    
+    @classmethod
+    def get_tag_size(cls, field_number: int) -> int:
+        """Get the encoded size of a field tag, known at generation time."""
+        tag = field_number << 3
+        size = 1
+        while tag >= 128:
+            tag >>= 7
+            size += 1
+        return size
+    
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def get_tag_bytes(cls, field_number: int, wire_type: str) -> str:
+        """
+        Get the varint-encoded tag of a field as a C++ byte list, e.g. '0x82, 0x01'.
+        
+        Args:
+            field_number: Field number from the .proto definition
+            wire_type: Wire type constant as returned by get_wire_type()
+        """
+        tag = (field_number << 3) | cls._WIRE_TYPE_VALUES[wire_type]
+        tag_bytes = []
+        while tag >= 0x80:
+            tag_bytes.append(f'0x{(tag & 0x7F) | 0x80:02x}')
+            tag >>= 7
+        tag_bytes.append(f'0x{tag:02x}')
+        return ', '.join(tag_bytes)
     
     @classmethod
     def get_default_check(cls, field: pb2.FieldDescriptorProto) -> Optional[str]:
@@ -313,7 +326,7 @@ class TypeMapper:
         field_name = field.name
         
         # Don't check messages - they always need to be encoded if present
-        if field.type == pb2.FieldDescriptorProto.TYPE_MESSAGE:
+        if field.type == TYPE_MESSAGE:
             return None
         
         default_val = cls.DEFAULT_VALUES.get(field.type, None)
@@ -321,11 +334,11 @@ class TypeMapper:
             return None
         
         # Special cases
-        if field.type == pb2.FieldDescriptorProto.TYPE_STRING:
+        if field.type == TYPE_STRING:
             return f'!value.{field_name}.empty()'
-        elif field.type == pb2.FieldDescriptorProto.TYPE_BYTES:
+        elif field.type == TYPE_BYTES:
             return f'!value.{field_name}.empty()'
-        elif field.type == pb2.FieldDescriptorProto.TYPE_BOOL:
+        elif field.type == TYPE_BOOL:
             return f'value.{field_name}'
         else:
             return f'value.{field_name} != {default_val}'
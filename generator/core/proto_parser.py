@@ -4,19 +4,23 @@ Protobuf file parser using protoc compiler.
 Parses .proto files and extracts descriptors for code generation.
 """
 
+import hashlib
+import json
 import os
+import shutil
 import subprocess
 import tempfile
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from google.protobuf import descriptor_pb2 as pb2
 
 
 class ProtoParser:
     """Parse .proto files using protoc and return FileDescriptorProto."""
     
-    def __init__(self, import_paths: Optional[List[str]] = None):
-        """Initialize parser with optional import paths."""
+    def __init__(self, import_paths: Optional[List[str]] = None, cache_dir: Optional[str] = None):
+        """Initialize parser with optional import paths and descriptor cache directory."""
         self.import_paths = import_paths or []
+        self.cache_dir = cache_dir
     
     def parse_proto_file(self, proto_path: str) -> pb2.FileDescriptorProto:
         """
@@ -28,60 +32,179 @@ class ProtoParser:
         Returns:
             FileDescriptorProto object for the parsed file
         """
-        # Use protoc to generate descriptor set
-        descriptor_set = self._run_protoc(proto_path)
-        
-        # Parse the descriptor set
-        file_descriptor_set = pb2.FileDescriptorSet()
-        file_descriptor_set.ParseFromString(descriptor_set)
-        
-        # Return the main file (last one in the set)
-        if file_descriptor_set.file:
-            return file_descriptor_set.file[-1]
-        
-        # Return empty FileDescriptorProto if no files found
-        return pb2.FileDescriptorProto()
+        return self.parse_proto_files([proto_path])[proto_path]
     
-    def _run_protoc(self, proto_path: str) -> bytes:
-        """Run protoc compiler to generate descriptor set."""
-        with tempfile.NamedTemporaryFile(suffix='.desc', delete=False) as tmp:
-            tmp_path = tmp.name
+    def parse_proto_files(self, proto_paths: List[str]) -> Dict[str, pb2.FileDescriptorProto]:
+        """
+        Parse several .proto files, running protoc once per source directory.
         
-        try:
-            # Build protoc command
-            cmd = ['protoc']
-            
-            # Get absolute path and directory
-            proto_abs_path = os.path.abspath(proto_path)
-            proto_dir = os.path.dirname(proto_abs_path)
-            proto_basename = os.path.basename(proto_abs_path)
-            
-            # Add import paths
-            for import_path in self.import_paths:
-                cmd.extend(['-I', import_path])
-            
-            # Add directory of the proto file as import path
-            cmd.extend(['-I', proto_dir])
+        Files are passed to protoc by basename with their directory on the
+        import path, exactly as for a single file, so descriptor names match.
+        If the batched run fails, each file of that directory is retried with
+        its own protoc run so clashes between inputs don't fail the whole batch.
+        
+        Args:
+            proto_paths: Paths to the .proto files
             
-            # Output descriptor set
-            cmd.extend(['--descriptor_set_out=' + tmp_path])
+        Returns:
+            Mapping from each given path to its FileDescriptorProto
+        """
+        # Group inputs by directory; each group becomes one protoc invocation
+        paths_by_dir: Dict[str, List[str]] = {}
+        for proto_path in proto_paths:
+            proto_dir = os.path.dirname(os.path.abspath(proto_path))
+            paths_by_dir.setdefault(proto_dir, []).append(proto_path)
+        
+        result: Dict[str, pb2.FileDescriptorProto] = {}
+        for proto_dir, paths in paths_by_dir.items():
+            basenames = list(dict.fromkeys(os.path.basename(path) for path in paths))
             
-            # Include imports in descriptor set
-            cmd.append('--include_imports')
+            # Use protoc to generate one descriptor set for the whole group
+            try:
+                descriptor_sets = [self._get_descriptor_set(proto_dir, basenames)]
+            except RuntimeError:
+                if len(basenames) == 1:
+                    raise
+                # Files that clash with each other (e.g. duplicate symbols) only fail when
+                # compiled together; a file that is broken on its own still raises here
+                descriptor_sets = [self._get_descriptor_set(proto_dir, [basename]) for basename in basenames]
             
-            # Add the proto file (relative to its directory)
-            cmd.append(proto_basename)
+            files_by_name: Dict[str, pb2.FileDescriptorProto] = {}
+            for descriptor_set in descriptor_sets:
+                file_descriptor_set = pb2.FileDescriptorSet()
+                file_descriptor_set.ParseFromString(descriptor_set)
+                for file_proto in file_descriptor_set.file:
+                    files_by_name.setdefault(file_proto.name, file_proto)
             
-            # Run protoc
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise RuntimeError(f"protoc failed: {result.stderr}")
+            for proto_path in paths:
+                # Return empty FileDescriptorProto if the file is missing from the set
+                result[proto_path] = files_by_name.get(os.path.basename(proto_path), pb2.FileDescriptorProto())
+        
+        return result
+    
+    def _get_descriptor_set(self, proto_dir: str, proto_basenames: List[str]) -> bytes:
+        """Return the descriptor set for files in one directory, reusing a cached one if still valid."""
+        cache_base = self._descriptor_cache_base(proto_dir, proto_basenames)
+        if cache_base is not None:
+            cached = self._read_cached_descriptor_set(cache_base, proto_dir)
+            if cached is not None:
+                return cached
+        
+        descriptor_set = self._run_protoc(proto_dir, proto_basenames)
+        
+        if cache_base is not None:
+            self._write_cached_descriptor_set(cache_base, proto_dir, descriptor_set)
+        return descriptor_set
+    
+    def _descriptor_cache_base(self, proto_dir: str, proto_basenames: List[str]) -> Optional[str]:
+        """Cache file path (without extension) for this protoc invocation, or None if caching is off."""
+        if not self.cache_dir:
+            return None
+        
+        # protoc identity is part of the key: another version may emit different descriptors
+        protoc_path = shutil.which('protoc') or 'protoc'
+        try:
+            protoc_mtime = os.stat(protoc_path).st_mtime_ns
+        except OSError:
+            protoc_mtime = 0
+        
+        key_source = json.dumps([
+            proto_dir,
+            proto_basenames,
+            [os.path.abspath(import_path) for import_path in self.import_paths],
+            protoc_path,
+            protoc_mtime,
+        ])
+        key = hashlib.blake2b(key_source.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, key)
+    
+    def _resolve_proto_stamp(self, proto_name: str, proto_dir: str) -> Tuple[Optional[str], int, int]:
+        """Resolve a descriptor file name through the -I search order and stamp it with mtime and size."""
+        for search_dir in self.import_paths + [proto_dir]:
+            candidate = os.path.join(search_dir, proto_name)
+            try:
+                stat = os.stat(candidate)
+            except OSError:
+                continue
+            return os.path.abspath(candidate), stat.st_mtime_ns, stat.st_size
+        # Not on the import path (e.g. protoc's bundled google/protobuf/*.proto)
+        return None, 0, 0
+    
+    def _read_cached_descriptor_set(self, cache_base: str, proto_dir: str) -> Optional[bytes]:
+        """Load a cached descriptor set if every file it was built from is unchanged."""
+        try:
+            with open(cache_base + '.deps', 'r') as f:
+                stamps = json.load(f)
+            for proto_name, stamp in stamps.items():
+                if list(self._resolve_proto_stamp(proto_name, proto_dir)) != stamp:
+                    return None
+            with open(cache_base + '.desc', 'rb') as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+    
+    def _write_cached_descriptor_set(self, cache_base: str, proto_dir: str, descriptor_set: bytes) -> None:
+        """Store a descriptor set together with stamps of the files it was built from."""
+        file_descriptor_set = pb2.FileDescriptorSet()
+        file_descriptor_set.ParseFromString(descriptor_set)
+        stamps = {file_proto.name: list(self._resolve_proto_stamp(file_proto.name, proto_dir))
+                  for file_proto in file_descriptor_set.file}
+        
+        # Write to temp files and os.replace() so readers never see partial entries.
+        # The .desc is replaced first; the .deps file is what makes an entry valid.
+        try:
+            os.makedirs(os.path.dirname(cache_base), exist_ok=True)
+            for suffix, data in (('.desc', descriptor_set), ('.deps', json.dumps(stamps).encode())):
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_base))
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp_path, cache_base + suffix)
+                except OSError:
+                    os.unlink(tmp_path)
+                    raise
+        except OSError:
+            # The cache is an optimization only; an unwritable cache dir is not an error
+            pass
+    
+    def _run_protoc(self, proto_dir: str, proto_basenames: List[str]) -> bytes:
+        """Run protoc compiler to generate descriptor set for files in one directory."""
+        # Where /dev/stdout exists, protoc streams the descriptor set straight into our pipe
+        if os.name == 'posix' and os.path.exists('/dev/stdout'):
+            return self._invoke_protoc(proto_dir, proto_basenames, '/dev/stdout')
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = os.path.join(tmp_dir, 'descriptor_set.desc')
+            self._invoke_protoc(proto_dir, proto_basenames, tmp_path)
             
             # Read descriptor set
             with open(tmp_path, 'rb') as f:
                 return f.read()
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
     
+    def _invoke_protoc(self, proto_dir: str, proto_basenames: List[str], descriptor_set_out: str) -> bytes:
+        """Run protoc writing the descriptor set to descriptor_set_out; returns protoc's stdout."""
+        # Build protoc command
+        cmd = ['protoc']
+        
+        # Add import paths
+        for import_path in self.import_paths:
+            cmd.extend(['-I', import_path])
+        
+        # Add directory of the proto files as import path
+        cmd.extend(['-I', proto_dir])
+        
+        # Output descriptor set
+        cmd.extend(['--descriptor_set_out=' + descriptor_set_out])
+        
+        # Include imports in descriptor set
+        cmd.append('--include_imports')
+        
+        # Add the proto files (relative to their directory)
+        cmd.extend(proto_basenames)
+        
+        # Run protoc; stdout stays bytes since it may carry the binary descriptor set
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"protoc failed: {result.stderr.decode(errors='replace')}")
+        
+        return result.stdout
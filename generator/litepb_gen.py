@@ -7,10 +7,13 @@ Generates lightweight C++ code from .proto files for embedded systems.
 import os
 import sys
 import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from generator.core.proto_parser import ProtoParser
 from generator.backends.cpp.generator import CppGenerator
+from generator.backends.cpp.models import CodegenOptions
 
 
 def check_dependencies():
@@ -38,6 +41,45 @@ def check_dependencies():
     return True
 
 
+# Generator owned by the current process; built once per worker by _init_generator
+_cpp_gen = None
+
+
+def _init_generator(namespace_prefix, options):
+    """Create the C++ generator used by _generate_one in this process."""
+    global _cpp_gen
+    _cpp_gen = CppGenerator(namespace_prefix=namespace_prefix, options=options)
+
+
+def _write_atomically(path, write):
+    """Stream write(f) into a temp file next to path and move it over path only on success."""
+    tmp = tempfile.NamedTemporaryFile('w', dir=path.parent, prefix=f'.{path.name}.', delete=False)
+    try:
+        with tmp as f:
+            write(f)
+        # The temp file is created 0600; give it the mode a plain open() would have
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp.name, 0o666 & ~umask)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+def _generate_one(proto_file, proto_data, output_dir):
+    """Generate and write the .pb.h/.pb.cpp pair for one parsed proto file."""
+    base_name = os.path.basename(proto_file).replace('.proto', '')
+    header_file = output_dir / f"{base_name}.pb.h"
+    source_file = output_dir / f"{base_name}.pb.cpp"
+    
+    # Stream each file to disk as it renders; a failed render leaves the old file in place
+    _write_atomically(header_file, lambda f: _cpp_gen.write_header(proto_data, proto_file, f))
+    _write_atomically(source_file, lambda f: _cpp_gen.write_implementation(proto_data, proto_file, f))
+    
+    return header_file, source_file
+
+
 def main():
     """Main entry point for the generator."""
     # Check dependencies first
@@ -70,6 +112,32 @@ def main():
         default='',
         help='Prefix to add to all generated namespaces (e.g., "litepb_" for namespace conflict resolution)'
     )
+    parser.add_argument(
+        '--proto3-packed-only',
+        action='store_true',
+        help='Reject unpacked encoding for proto3 repeated scalars (not wire compatible with unpacked writers)'
+    )
+    parser.add_argument(
+        '--ordered-maps',
+        action='store_true',
+        help='Generate map fields as std::map (key-ordered, no hash table) instead of std::unordered_map'
+    )
+    parser.add_argument(
+        '--zero-copy-strings',
+        action='store_true',
+        help='Generate std::string_view string fields that point into the parsed input buffer (parse requires BufferInputStream/FixedInputStream)'
+    )
+    parser.add_argument(
+        '--descriptor-cache',
+        metavar='DIR',
+        help='Cache protoc descriptor sets in DIR and reuse them while the .proto files and their imports are unchanged'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of worker processes for code generation (default: 1, generate in-process; 0 uses one per CPU)'
+    )
     
     args = parser.parse_args()
     
@@ -85,49 +153,65 @@ def main():
         print("Info: No include paths specified. If imports fail, use -I to add proto directories", file=sys.stderr)
     
     # Initialize parser and generator
-    proto_parser = ProtoParser(import_paths=include_paths)
-    cpp_gen = CppGenerator(namespace_prefix=args.namespace_prefix)
+    proto_parser = ProtoParser(import_paths=include_paths, cache_dir=args.descriptor_cache)
+    codegen_options = CodegenOptions(
+        proto3_packed_only=args.proto3_packed_only,
+        ordered_maps=args.ordered_maps,
+        zero_copy_strings=args.zero_copy_strings,
+    )
     
-    # Process each proto file
+    # Check that every input exists before invoking protoc
     for proto_file in args.proto_files:
+        if not os.path.exists(proto_file):
+            print(f"Error: File not found: {proto_file}", file=sys.stderr)
+            sys.exit(1)
+    
+    # Parse all proto files up front (one protoc run per source directory)
+    try:
+        print(f"Parsing {', '.join(args.proto_files)}...")
+        parsed_protos = proto_parser.parse_proto_files(args.proto_files)
+    except Exception as e:
+        print(f"Error parsing proto files: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    
+    # Generate each file; files are independent, so -j spreads them over worker processes
+    jobs = min(args.jobs or os.cpu_count() or 1, len(args.proto_files))
+    generator_args = (args.namespace_prefix, codegen_options)
+    executor = None
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_generator, initargs=generator_args)
+        pending = [executor.submit(_generate_one, proto_file, parsed_protos[proto_file], output_dir)
+                   for proto_file in args.proto_files]
+    else:
+        _init_generator(*generator_args)
+    
+    # Report in input order
+    for index, proto_file in enumerate(args.proto_files):
         try:
-            print(f"Parsing {proto_file}...")
-            
-            # Check if file exists
-            if not os.path.exists(proto_file):
-                print(f"Error: File not found: {proto_file}", file=sys.stderr)
-                sys.exit(1)
-            
-            # Parse the proto file
-            proto_data = proto_parser.parse_proto_file(proto_file)
-            
-            # Generate output filenames
-            base_name = os.path.basename(proto_file).replace('.proto', '')
-            header_file = output_dir / f"{base_name}.pb.h"
-            source_file = output_dir / f"{base_name}.pb.cpp"
-            
-            # Generate C++ code
-            print(f"Generating {header_file}")
-            header_content = cpp_gen.generate_header(proto_data, proto_file)
-            
-            print(f"Generating {source_file}")
-            source_content = cpp_gen.generate_implementation(proto_data, proto_file)
-            
-            # Write output files
-            with open(header_file, 'w') as f:
-                f.write(header_content)
-            
-            with open(source_file, 'w') as f:
-                f.write(source_content)
+            if executor is not None:
+                header_file, source_file = pending[index].result()
+            else:
+                header_file, source_file = _generate_one(proto_file, parsed_protos[proto_file], output_dir)
             
+            print(f"Generated {header_file}")
+            print(f"Generated {source_file}")
             print(f"Successfully generated files for {proto_file}")
             
         except Exception as e:
             print(f"Error processing {proto_file}: {e}", file=sys.stderr)
             import traceback
             traceback.print_exc()
+            if executor is not None:
+                for future in pending:
+                    future.cancel()
+                executor.shutdown()
             sys.exit(1)
     
+    if executor is not None:
+        executor.shutdown()
+    
     print("Code generation complete!")
     return 0
 
@@ -66,6 +66,7 @@ print(f"[litepb] Generator   : {GEN}")
 # Read options
 custom_litepb_protos = env.GetProjectOption("custom_litepb_protos", "").split()
 custom_litepb_include_dirs = env.GetProjectOption("custom_litepb_include_dirs", "").split()
+custom_litepb_flags = env.GetProjectOption("custom_litepb_flags", "").split()
 ################################################################################
 
 # Expand glob patterns in custom_litepb_protos (supports **, *.proto, etc.)
@@ -149,6 +150,9 @@ else:
         # Output dir
         cmd += ["-o", str(OUTDIR_DIR)]
 
+        # Extra generator options (e.g. --zero-copy-strings)
+        cmd += custom_litepb_flags
+
         # Proto files (only the main ones you listed)
         cmd += proto_files
 
@@ -194,4 +198,6 @@ else:
         print("   -", pf)
     print(f"[litepb] Include dirs ({len(proto_include_paths)}):")
     for inc in proto_include_paths:
-        print("   -", inc)
\ No newline at end of file
+        print("   -", inc)
+    if custom_litepb_flags:
+        print(f"[litepb] Generator flags: {' '.join(custom_litepb_flags)}")
\ No newline at end of file
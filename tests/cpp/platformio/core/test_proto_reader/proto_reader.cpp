@@ -275,6 +275,31 @@ void test_read_string_truncated()
     TEST_ASSERT_FALSE(reader.read_string(value));
 }
 
+void test_read_string_view()
+{
+    litepb::BufferOutputStream out_stream;
+    litepb::ProtoWriter writer(out_stream);
+    writer.write_string(std::string_view("Hello"));
+    writer.write_string("");
+
+    litepb::BufferInputStream in_stream(out_stream.data(), out_stream.size());
+    litepb::ProtoReader reader(in_stream);
+    std::string_view value;
+    TEST_ASSERT_TRUE(reader.read_string_view(value));
+    TEST_ASSERT_EQUAL_UINT32(5, value.size());
+    TEST_ASSERT_TRUE(value == "Hello");
+    // The view points into the input buffer, not a copy
+    TEST_ASSERT_EQUAL_PTR(out_stream.data() + 1, value.data());
+
+    TEST_ASSERT_TRUE(reader.read_string_view(value));
+    TEST_ASSERT_TRUE(value.empty());
+
+    const uint8_t truncated_data[] = { 0x05, 'H', 'i' };
+    litepb::BufferInputStream truncated_stream(truncated_data, sizeof(truncated_data));
+    litepb::ProtoReader truncated_reader(truncated_stream);
+    TEST_ASSERT_FALSE(truncated_reader.read_string_view(value));
+}
+
 void test_read_empty_bytes()
 {
     litepb::BufferOutputStream out_stream;
@@ -504,6 +529,152 @@ void test_skip_field_end_group()
     TEST_ASSERT_FALSE(reader.skip_field(litepb::WIRE_TYPE_END_GROUP));
 }
 
+void test_count_varints()
+{
+    litepb::BufferOutputStream out_stream;
+    litepb::ProtoWriter writer(out_stream);
+    const uint64_t values[] = { 0, 1, 127, 128, 300, 16384, 0xFFFFFFFFULL, 5, 0xFFFFFFFFFFFFFFFFULL, 42, 7, 1000000 };
+    for (uint64_t value : values) {
+        writer.write_varint(value);
+    }
+
+    const size_t count = sizeof(values) / sizeof(values[0]);
+    TEST_ASSERT_EQUAL_size_t(count, litepb::ProtoReader::count_varints(out_stream.data(), out_stream.size()));
+    TEST_ASSERT_EQUAL_size_t(0, litepb::ProtoReader::count_varints(out_stream.data(), 0));
+
+    // A trailing truncated varint is not counted
+    TEST_ASSERT_EQUAL_size_t(count - 1, litepb::ProtoReader::count_varints(out_stream.data(), out_stream.size() - 1));
+}
+
+// Input stream without peek(), so packed runs take the value-at-a-time path
+class UnbufferedInputStream : public litepb::InputStream {
+    litepb::BufferInputStream inner_;
+
+public:
+    UnbufferedInputStream(const uint8_t * data, size_t size)
+        : inner_(data, size)
+    {
+    }
+
+    bool read(uint8_t * data, size_t size) override { return inner_.read(data, size); }
+    bool skip(size_t size) override { return inner_.skip(size); }
+    size_t position() const override { return inner_.position(); }
+    size_t available() const override { return inner_.available(); }
+};
+
+void test_read_packed_varints()
+{
+    litepb::BufferOutputStream out_stream;
+    litepb::ProtoWriter writer(out_stream);
+    const int32_t values[] = { 0, 1, -1, 300, std::numeric_limits<int32_t>::min(), std::numeric_limits<int32_t>::max() };
+    for (int32_t value : values) {
+        writer.write_varint(static_cast<uint64_t>(static_cast<int64_t>(value)));
+    }
+    writer.write_varint(99); // next field, must be left unread
+    const size_t run_length = out_stream.size() - 1;
+    const size_t count      = sizeof(values) / sizeof(values[0]);
+
+    litepb::BufferInputStream buffered(out_stream.data(), out_stream.size());
+    litepb::ProtoReader buffered_reader(buffered);
+    std::vector<int32_t> buffered_values = { 7 };
+    TEST_ASSERT_TRUE(buffered_reader.read_packed_varints(buffered_values, run_length));
+    TEST_ASSERT_EQUAL_size_t(run_length, buffered.position());
+
+    UnbufferedInputStream unbuffered(out_stream.data(), out_stream.size());
+    litepb::ProtoReader unbuffered_reader(unbuffered);
+    std::vector<int32_t> unbuffered_values = { 7 };
+    TEST_ASSERT_TRUE(unbuffered_reader.read_packed_varints(unbuffered_values, run_length));
+    TEST_ASSERT_EQUAL_size_t(run_length, unbuffered.position());
+
+    // Values are appended after what the vector already holds
+    TEST_ASSERT_EQUAL_size_t(count + 1, buffered_values.size());
+    TEST_ASSERT_EQUAL_INT32_ARRAY(values, buffered_values.data() + 1, count);
+    TEST_ASSERT_EQUAL_INT32_ARRAY(values, unbuffered_values.data() + 1, count);
+
+    // A varint cut off by the end of the run is rejected
+    litepb::BufferInputStream truncated(out_stream.data(), out_stream.size());
+    litepb::ProtoReader truncated_reader(truncated);
+    std::vector<int32_t> truncated_values;
+    TEST_ASSERT_FALSE(truncated_reader.read_packed_varints(truncated_values, run_length - 1));
+}
+
+void test_read_packed_sint_and_fixed()
+{
+    litepb::BufferOutputStream out_stream;
+    litepb::ProtoWriter writer(out_stream);
+    writer.write_sint32(-2);
+    writer.write_sint32(1000);
+    const size_t sint_length = out_stream.size();
+    writer.write_double(-0.5);
+    writer.write_double(1e100);
+    const size_t fixed_length = out_stream.size() - sint_length;
+
+    for (int pass = 0; pass < 2; pass++) {
+        litepb::BufferInputStream buffered(out_stream.data(), out_stream.size());
+        UnbufferedInputStream unbuffered(out_stream.data(), out_stream.size());
+        litepb::InputStream & stream = pass == 0 ? static_cast<litepb::InputStream &>(buffered) : unbuffered;
+        litepb::ProtoReader reader(stream);
+
+        std::vector<int32_t> sints;
+        TEST_ASSERT_TRUE(reader.read_packed_sint32(sints, sint_length));
+        TEST_ASSERT_EQUAL_size_t(2, sints.size());
+        TEST_ASSERT_EQUAL_INT32(-2, sints[0]);
+        TEST_ASSERT_EQUAL_INT32(1000, sints[1]);
+
+        std::vector<double> doubles;
+        TEST_ASSERT_TRUE(reader.read_packed_fixed(doubles, fixed_length));
+        TEST_ASSERT_EQUAL_size_t(2, doubles.size());
+        TEST_ASSERT_EQUAL_DOUBLE(-0.5, doubles[0]);
+        TEST_ASSERT_EQUAL_DOUBLE(1e100, doubles[1]);
+        TEST_ASSERT_EQUAL_size_t(0, stream.available());
+    }
+
+    // A run that is not a whole number of values is rejected
+    litepb::BufferInputStream partial(out_stream.data() + sint_length, fixed_length);
+    litepb::ProtoReader partial_reader(partial);
+    std::vector<uint32_t> fixed32s;
+    TEST_ASSERT_FALSE(partial_reader.read_packed_fixed(fixed32s, fixed_length - 2));
+}
+
+void test_read_packed_fixed_appends()
+{
+    litepb::BufferOutputStream out_stream;
+    litepb::ProtoWriter writer(out_stream);
+    writer.write_sfixed32(-7);
+    writer.write_sfixed32(std::numeric_limits<int32_t>::min());
+    writer.write_sfixed32(123456789);
+    writer.write_varint(99); // next field, must be left unread
+    const size_t run_length = out_stream.size() - 1;
+
+    for (int pass = 0; pass < 2; pass++) {
+        litepb::BufferInputStream buffered(out_stream.data(), out_stream.size());
+        UnbufferedInputStream unbuffered(out_stream.data(), out_stream.size());
+        litepb::InputStream & stream = pass == 0 ? static_cast<litepb::InputStream &>(buffered) : unbuffered;
+        litepb::ProtoReader reader(stream);
+
+        std::vector<int32_t> values = { 5 };
+        TEST_ASSERT_TRUE(reader.read_packed_fixed(values, run_length));
+        const int32_t expected[] = { 5, -7, std::numeric_limits<int32_t>::min(), 123456789 };
+        TEST_ASSERT_EQUAL_size_t(4, values.size());
+        TEST_ASSERT_EQUAL_INT32_ARRAY(expected, values.data(), 4);
+
+        uint64_t next;
+        TEST_ASSERT_TRUE(reader.read_varint(next));
+        TEST_ASSERT_EQUAL_UINT64(99, next);
+    }
+
+    // A run longer than the remaining input fails instead of reading past it
+    for (int pass = 0; pass < 2; pass++) {
+        litepb::BufferInputStream buffered(out_stream.data(), run_length);
+        UnbufferedInputStream unbuffered(out_stream.data(), run_length);
+        litepb::InputStream & stream = pass == 0 ? static_cast<litepb::InputStream &>(buffered) : unbuffered;
+        litepb::ProtoReader reader(stream);
+
+        std::vector<uint64_t> values;
+        TEST_ASSERT_FALSE(reader.read_packed_fixed(values, run_length + 4));
+    }
+}
+
 void test_read_varint_10byte_overflow()
 {
     const uint8_t invalid_data[] = { 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x02 };
@@ -631,6 +802,7 @@ int runTests()
     RUN_TEST(test_read_empty_string);
     RUN_TEST(test_read_normal_string);
     RUN_TEST(test_read_string_truncated);
+    RUN_TEST(test_read_string_view);
     RUN_TEST(test_read_empty_bytes);
     RUN_TEST(test_read_normal_bytes);
     RUN_TEST(test_read_bytes_truncated);
@@ -649,6 +821,10 @@ int runTests()
     RUN_TEST(test_skip_field_start_group);
     RUN_TEST(test_skip_field_end_group);
     RUN_TEST(test_read_varint_10byte_overflow);
+    RUN_TEST(test_count_varints);
+    RUN_TEST(test_read_packed_varints);
+    RUN_TEST(test_read_packed_sint_and_fixed);
+    RUN_TEST(test_read_packed_fixed_appends);
     RUN_TEST(test_read_varint_stream_failure);
     RUN_TEST(test_read_fixed32_stream_failure);
     RUN_TEST(test_read_fixed64_stream_failure);
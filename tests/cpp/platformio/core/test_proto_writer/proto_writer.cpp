@@ -59,6 +59,28 @@ void test_write_varint_large()
     TEST_ASSERT_EQUAL_UINT32(10, stream.size());
 }
 
+void test_write_varint32_matches_write_varint()
+{
+    const uint32_t values[] = { 0, 1, 127, 128, 16383, 16384, 2097151, 2097152, 268435455, 268435456, 0xFFFFFFFFU };
+
+    for (uint32_t value : values) {
+        litepb::BufferOutputStream stream32;
+        litepb::ProtoWriter writer32(stream32);
+        litepb::BufferOutputStream stream64;
+        litepb::ProtoWriter writer64(stream64);
+
+        TEST_ASSERT_TRUE(writer32.write_varint32(value));
+        TEST_ASSERT_TRUE(writer64.write_varint(value));
+        TEST_ASSERT_EQUAL_UINT32(stream64.size(), stream32.size());
+        TEST_ASSERT_EQUAL_UINT32(litepb::ProtoWriter::varint_size(value), stream32.size());
+        TEST_ASSERT_EQUAL_UINT8_ARRAY(stream64.data(), stream32.data(), stream32.size());
+
+        uint8_t buffer[5];
+        TEST_ASSERT_EQUAL_UINT32(stream32.size(), litepb::ProtoWriter::encode_varint32(value, buffer));
+        TEST_ASSERT_EQUAL_UINT8_ARRAY(stream32.data(), buffer, stream32.size());
+    }
+}
+
 void test_write_fixed32()
 {
     litepb::BufferOutputStream stream;
@@ -237,6 +259,57 @@ void test_write_tag_large_field_number()
     TEST_ASSERT_TRUE(stream.size() > 1);
 }
 
+void test_write_raw_matches_write_tag()
+{
+    litepb::BufferOutputStream raw_stream;
+    litepb::ProtoWriter raw_writer(raw_stream);
+    litepb::BufferOutputStream tag_stream;
+    litepb::ProtoWriter tag_writer(tag_stream);
+
+    // Field 300, length-delimited: (300 << 3) | 2 = 2402 encodes as 0xE2 0x12
+    TEST_ASSERT_TRUE((raw_writer.write_raw<0xE2, 0x12>()));
+    TEST_ASSERT_TRUE(tag_writer.write_tag(300, litepb::WIRE_TYPE_LENGTH_DELIMITED));
+    TEST_ASSERT_EQUAL_UINT32(tag_stream.size(), raw_stream.size());
+    TEST_ASSERT_EQUAL_UINT8_ARRAY(tag_stream.data(), raw_stream.data(), raw_stream.size());
+
+    TEST_ASSERT_TRUE(raw_writer.write_raw<0x08>());
+    TEST_ASSERT_EQUAL_UINT32(3, raw_stream.size());
+    TEST_ASSERT_EQUAL_UINT8(0x08, raw_stream.data()[2]);
+}
+
+void test_fused_field_writes_match_tag_and_value()
+{
+    litepb::BufferOutputStream fused_stream;
+    litepb::ProtoWriter fused_writer(fused_stream);
+    litepb::BufferOutputStream split_stream;
+    litepb::ProtoWriter split_writer(split_stream);
+
+    // Field 1 fixed32 (0x0D), field 2 fixed64 (0x11), field 300 bool (0xE0 0x12),
+    // field 4 float (0x25), field 5 sfixed64 (0x29)
+    TEST_ASSERT_TRUE((fused_writer.write_fixed32_field<0x0D>(0xDEADBEEFU)));
+    TEST_ASSERT_TRUE((fused_writer.write_fixed64_field<0x11>(0x0123456789ABCDEFULL)));
+    TEST_ASSERT_TRUE((fused_writer.write_bool_field<0xE0, 0x12>(true)));
+    TEST_ASSERT_TRUE((fused_writer.write_bool_field<0xE0, 0x12>(false)));
+    TEST_ASSERT_TRUE((fused_writer.write_fixed32_field<0x25>(-1.5f)));
+    TEST_ASSERT_TRUE((fused_writer.write_fixed64_field<0x29>(static_cast<int64_t>(-2))));
+
+    TEST_ASSERT_TRUE(split_writer.write_tag(1, litepb::WIRE_TYPE_FIXED32));
+    TEST_ASSERT_TRUE(split_writer.write_fixed32(0xDEADBEEFU));
+    TEST_ASSERT_TRUE(split_writer.write_tag(2, litepb::WIRE_TYPE_FIXED64));
+    TEST_ASSERT_TRUE(split_writer.write_fixed64(0x0123456789ABCDEFULL));
+    TEST_ASSERT_TRUE(split_writer.write_tag(300, litepb::WIRE_TYPE_VARINT));
+    TEST_ASSERT_TRUE(split_writer.write_varint(1));
+    TEST_ASSERT_TRUE(split_writer.write_tag(300, litepb::WIRE_TYPE_VARINT));
+    TEST_ASSERT_TRUE(split_writer.write_varint(0));
+    TEST_ASSERT_TRUE(split_writer.write_tag(4, litepb::WIRE_TYPE_FIXED32));
+    TEST_ASSERT_TRUE(split_writer.write_float(-1.5f));
+    TEST_ASSERT_TRUE(split_writer.write_tag(5, litepb::WIRE_TYPE_FIXED64));
+    TEST_ASSERT_TRUE(split_writer.write_sfixed64(-2));
+
+    TEST_ASSERT_EQUAL_UINT32(split_stream.size(), fused_stream.size());
+    TEST_ASSERT_EQUAL_UINT8_ARRAY(split_stream.data(), fused_stream.data(), fused_stream.size());
+}
+
 void test_write_sint32_positive()
 {
     litepb::BufferOutputStream stream;
@@ -304,6 +377,49 @@ void test_varint_size()
     TEST_ASSERT_EQUAL_UINT32(10, litepb::ProtoWriter::varint_size(0xFFFFFFFFFFFFFFFFULL));
 }
 
+void test_varint_size_boundaries()
+{
+    // Every 7-bit boundary must agree with the number of bytes write_varint emits
+    for (int bits = 1; bits <= 64; ++bits) {
+        uint64_t max_value = bits == 64 ? 0xFFFFFFFFFFFFFFFFULL : (1ULL << bits) - 1;
+        uint64_t min_value = 1ULL << (bits - 1);
+        size_t expected    = static_cast<size_t>((bits + 6) / 7);
+        TEST_ASSERT_EQUAL_UINT32(expected, litepb::ProtoWriter::varint_size(max_value));
+        TEST_ASSERT_EQUAL_UINT32(expected, litepb::ProtoWriter::varint_size(min_value));
+
+        litepb::BufferOutputStream stream;
+        litepb::ProtoWriter writer(stream);
+        TEST_ASSERT_TRUE(writer.write_varint(max_value));
+        TEST_ASSERT_EQUAL_UINT32(expected, stream.size());
+    }
+
+    static_assert(litepb::ProtoWriter::varint_size(300) == 2, "varint_size must be usable in constant expressions");
+}
+
+void test_encode_helpers_match_writer()
+{
+    const uint64_t values[] = { 0, 1, 127, 128, 300, 0xFFFFFFFFULL, 0xFFFFFFFFFFFFFFFFULL };
+    for (uint64_t value : values) {
+        litepb::BufferOutputStream stream;
+        litepb::ProtoWriter writer(stream);
+        TEST_ASSERT_TRUE(writer.write_varint(value));
+
+        uint8_t buffer[10];
+        size_t size = litepb::ProtoWriter::encode_varint(value, buffer);
+        TEST_ASSERT_EQUAL_UINT32(stream.size(), size);
+        TEST_ASSERT_EQUAL_UINT32(litepb::ProtoWriter::varint_size(value), size);
+        TEST_ASSERT_EQUAL_MEMORY(stream.data(), buffer, size);
+    }
+
+    uint8_t fixed[8];
+    TEST_ASSERT_EQUAL_UINT32(4, litepb::ProtoWriter::encode_fixed32(0x12345678, fixed));
+    TEST_ASSERT_EQUAL_UINT8(0x78, fixed[0]);
+    TEST_ASSERT_EQUAL_UINT8(0x12, fixed[3]);
+    TEST_ASSERT_EQUAL_UINT32(8, litepb::ProtoWriter::encode_fixed64(0x0102030405060708ULL, fixed));
+    TEST_ASSERT_EQUAL_UINT8(0x08, fixed[0]);
+    TEST_ASSERT_EQUAL_UINT8(0x01, fixed[7]);
+}
+
 void test_fixed_sizes()
 {
     TEST_ASSERT_EQUAL_UINT32(4, litepb::ProtoWriter::fixed32_size());
@@ -375,6 +491,7 @@ void test_write_tag_stream_failure()
     litepb::ProtoWriter writer(stream);
 
     TEST_ASSERT_FALSE(writer.write_tag(1, litepb::WIRE_TYPE_VARINT));
+    TEST_ASSERT_FALSE(writer.write_raw<0x08>());
 }
 
 void test_write_sint32_stream_failure()
@@ -401,6 +518,7 @@ int runTests()
     RUN_TEST(test_write_varint_128);
     RUN_TEST(test_write_varint_255);
     RUN_TEST(test_write_varint_large);
+    RUN_TEST(test_write_varint32_matches_write_varint);
     RUN_TEST(test_write_fixed32);
     RUN_TEST(test_write_fixed32_zero);
     RUN_TEST(test_write_fixed64);
@@ -418,6 +536,8 @@ int runTests()
     RUN_TEST(test_write_normal_bytes);
     RUN_TEST(test_write_tag);
     RUN_TEST(test_write_tag_large_field_number);
+    RUN_TEST(test_write_raw_matches_write_tag);
+    RUN_TEST(test_fused_field_writes_match_tag_and_value);
     RUN_TEST(test_write_sint32_positive);
     RUN_TEST(test_write_sint32_negative);
     RUN_TEST(test_write_sint32_min_max);
@@ -425,6 +545,8 @@ int runTests()
     RUN_TEST(test_write_sint64_negative);
     RUN_TEST(test_write_sint64_min_max);
     RUN_TEST(test_varint_size);
+    RUN_TEST(test_varint_size_boundaries);
+    RUN_TEST(test_encode_helpers_match_writer);
     RUN_TEST(test_fixed_sizes);
     RUN_TEST(test_sint_sizes);
     RUN_TEST(test_write_bytes_null_data_pointer);
@@ -157,6 +157,100 @@ void test_fixed_input_stream_truncation()
     TEST_ASSERT_FALSE(stream.read(buffer, 1));
 }
 
+void test_input_stream_borrow()
+{
+    const uint8_t data[] = { 0x01, 0x02, 0x03, 0x04, 0x05 };
+    litepb::BufferInputStream buffer_stream(data, sizeof(data));
+
+    // BufferInputStream lends out the caller's memory
+    const uint8_t * borrowed = buffer_stream.borrow(3);
+    TEST_ASSERT_EQUAL_PTR(data, borrowed);
+    TEST_ASSERT_EQUAL_UINT32(3, buffer_stream.position());
+    TEST_ASSERT_NULL(buffer_stream.borrow(3));
+    TEST_ASSERT_EQUAL_UINT32(3, buffer_stream.position());
+
+    // FixedInputStream lends out its internal copy
+    litepb::FixedInputStream<16> fixed_stream(data, sizeof(data));
+    TEST_ASSERT_TRUE(fixed_stream.skip(1));
+    borrowed = fixed_stream.borrow(4);
+    TEST_ASSERT_NOT_NULL(borrowed);
+    TEST_ASSERT_EQUAL_UINT8_ARRAY(data + 1, borrowed, 4);
+    TEST_ASSERT_EQUAL_UINT32(0, fixed_stream.available());
+    TEST_ASSERT_NULL(fixed_stream.borrow(1));
+}
+
+void test_input_stream_peek()
+{
+    const uint8_t data[] = { 0x01, 0x02, 0x03 };
+    litepb::BufferInputStream buffer_stream(data, sizeof(data));
+
+    // Peeking leaves the position alone
+    TEST_ASSERT_EQUAL_PTR(data, buffer_stream.peek(3));
+    TEST_ASSERT_EQUAL_UINT32(0, buffer_stream.position());
+    TEST_ASSERT_NULL(buffer_stream.peek(4));
+    TEST_ASSERT_TRUE(buffer_stream.skip(2));
+    TEST_ASSERT_EQUAL_PTR(data + 2, buffer_stream.peek(1));
+
+    litepb::FixedInputStream<8> fixed_stream(data, sizeof(data));
+    const uint8_t * peeked = fixed_stream.peek(3);
+    TEST_ASSERT_NOT_NULL(peeked);
+    TEST_ASSERT_EQUAL_UINT8_ARRAY(data, peeked, 3);
+    TEST_ASSERT_EQUAL_UINT32(3, fixed_stream.available());
+    TEST_ASSERT_NULL(fixed_stream.peek(4));
+}
+
+void test_input_stream_read_varint()
+{
+    const uint64_t values[] = { 0, 1, 127, 128, 300, 16383, 16384, (1ULL << 35) - 1, (1ULL << 49), (1ULL << 56) - 1, (1ULL << 56),
+                                (1ULL << 63) - 1, UINT64_MAX };
+
+    for (uint64_t expected : values) {
+        // Encode by hand, then pad with continuation bytes so wide loads see a long tail
+        uint8_t data[20];
+        size_t length = 0;
+        uint64_t remaining = expected;
+        while (remaining >= 0x80) {
+            data[length++] = static_cast<uint8_t>(remaining | 0x80);
+            remaining >>= 7;
+        }
+        data[length++] = static_cast<uint8_t>(remaining);
+        std::memset(data + length, 0xFF, sizeof(data) - length);
+
+        uint64_t value = 0;
+        litepb::BufferInputStream padded(data, sizeof(data));
+        TEST_ASSERT_TRUE(padded.read_varint(value));
+        TEST_ASSERT_EQUAL_UINT64(expected, value);
+        TEST_ASSERT_EQUAL_UINT32(length, padded.position());
+
+        value = 0;
+        litepb::BufferInputStream exact(data, length);
+        TEST_ASSERT_TRUE(exact.read_varint(value));
+        TEST_ASSERT_EQUAL_UINT64(expected, value);
+        TEST_ASSERT_EQUAL_UINT32(0, exact.available());
+
+        value = 0;
+        litepb::FixedInputStream<20> fixed(data, length);
+        TEST_ASSERT_TRUE(fixed.read_varint(value));
+        TEST_ASSERT_EQUAL_UINT64(expected, value);
+        TEST_ASSERT_EQUAL_UINT32(length, fixed.position());
+
+        // A varint cut short by the end of the buffer is rejected
+        if (length > 1) {
+            litepb::BufferInputStream truncated(data, length - 1);
+            TEST_ASSERT_FALSE(truncated.read_varint(value));
+        }
+    }
+
+    // Eleven continuation bytes never terminate
+    const uint8_t overlong[] = { 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01 };
+    uint64_t value;
+    litepb::BufferInputStream overlong_stream(overlong, sizeof(overlong));
+    TEST_ASSERT_FALSE(overlong_stream.read_varint(value));
+
+    litepb::BufferInputStream empty(nullptr, 0);
+    TEST_ASSERT_FALSE(empty.read_varint(value));
+}
+
 int runTests()
 {
     UNITY_BEGIN();
@@ -168,5 +262,8 @@ int runTests()
     RUN_TEST(test_fixed_input_stream_basic);
     RUN_TEST(test_fixed_input_stream_skip);
     RUN_TEST(test_fixed_input_stream_truncation);
+    RUN_TEST(test_input_stream_borrow);
+    RUN_TEST(test_input_stream_peek);
+    RUN_TEST(test_input_stream_read_varint);
     return UNITY_END();
 }
@@ -178,6 +178,128 @@ void test_mixed_with_maps()
     TEST_ASSERT_EQUAL_STRING("test", deserialized.message_map[1].name.c_str());
 }
 
+void test_all_key_types()
+{
+    using namespace test::maps;
+
+    // Create message using every scalar key type, including negative signed keys
+    AllKeyTypes msg;
+    msg.int32_key    = { { -5, "int32" } };
+    msg.int64_key    = { { -5000000000LL, "int64" } };
+    msg.uint32_key   = { { 4000000000U, "uint32" } };
+    msg.uint64_key   = { { 0xFFFFFFFFFFFFFFFFULL, "uint64" } };
+    msg.sint32_key   = { { -300, "sint32" } };
+    msg.sint64_key   = { { -70000000000LL, "sint64" } };
+    msg.fixed32_key  = { { 0xDEADBEEF, "fixed32" } };
+    msg.fixed64_key  = { { 0x0123456789ABCDEFULL, "fixed64" } };
+    msg.sfixed32_key = { { -42, "sfixed32" } };
+    msg.sfixed64_key = { { -4200000000LL, "sfixed64" } };
+    msg.bool_key     = { { true, "true" }, { false, "false" } };
+    msg.string_key   = { { "", "empty key" }, { "k", "" } };
+
+    // Serialize
+    litepb::BufferOutputStream stream;
+    TEST_ASSERT_TRUE(litepb::serialize(msg, stream));
+
+    // Deserialize
+    litepb::BufferInputStream input_stream(stream.data(), stream.size());
+    AllKeyTypes deserialized;
+    TEST_ASSERT_TRUE(litepb::parse(deserialized, input_stream));
+
+    // Verify every key round-trips
+    TEST_ASSERT_EQUAL_STRING("int32", deserialized.int32_key[-5].c_str());
+    TEST_ASSERT_EQUAL_STRING("int64", deserialized.int64_key[-5000000000LL].c_str());
+    TEST_ASSERT_EQUAL_STRING("uint32", deserialized.uint32_key[4000000000U].c_str());
+    TEST_ASSERT_EQUAL_STRING("uint64", deserialized.uint64_key[0xFFFFFFFFFFFFFFFFULL].c_str());
+    TEST_ASSERT_EQUAL_STRING("sint32", deserialized.sint32_key[-300].c_str());
+    TEST_ASSERT_EQUAL_STRING("sint64", deserialized.sint64_key[-70000000000LL].c_str());
+    TEST_ASSERT_EQUAL_STRING("fixed32", deserialized.fixed32_key[0xDEADBEEF].c_str());
+    TEST_ASSERT_EQUAL_STRING("fixed64", deserialized.fixed64_key[0x0123456789ABCDEFULL].c_str());
+    TEST_ASSERT_EQUAL_STRING("sfixed32", deserialized.sfixed32_key[-42].c_str());
+    TEST_ASSERT_EQUAL_STRING("sfixed64", deserialized.sfixed64_key[-4200000000LL].c_str());
+    TEST_ASSERT_EQUAL_size_t(2, deserialized.bool_key.size());
+    TEST_ASSERT_EQUAL_STRING("false", deserialized.bool_key[false].c_str());
+    TEST_ASSERT_EQUAL_size_t(2, deserialized.string_key.size());
+    TEST_ASSERT_EQUAL_STRING("empty key", deserialized.string_key[""].c_str());
+    TEST_ASSERT_EQUAL_STRING("", deserialized.string_key["k"].c_str());
+}
+
+void test_all_value_types()
+{
+    using namespace test::maps;
+
+    // Create message using every scalar value type
+    AllValueTypes msg;
+    msg.string_to_double   = { { "d", -2.5 } };
+    msg.string_to_float    = { { "f", 1.25f } };
+    msg.string_to_int32    = { { "i32", -7 } };
+    msg.string_to_int64    = { { "i64", -7000000000LL } };
+    msg.string_to_uint32   = { { "u32", 4000000000U } };
+    msg.string_to_uint64   = { { "u64", 0xFFFFFFFFFFFFFFFFULL } };
+    msg.string_to_sint32   = { { "s32", -150 } };
+    msg.string_to_sint64   = { { "s64", -150000000000LL } };
+    msg.string_to_fixed32  = { { "f32", 0xCAFEBABE } };
+    msg.string_to_fixed64  = { { "f64", 0xFEDCBA9876543210ULL } };
+    msg.string_to_sfixed32 = { { "sf32", -1 } };
+    msg.string_to_sfixed64 = { { "sf64", -2 } };
+    msg.string_to_bool     = { { "b", true } };
+    msg.string_to_string   = { { "s", "text" } };
+    msg.string_to_bytes    = { { "by", { 0x00, 0xFF, 0x7F } }, { "empty", {} } };
+
+    // Serialize
+    litepb::BufferOutputStream stream;
+    TEST_ASSERT_TRUE(litepb::serialize(msg, stream));
+
+    // Deserialize
+    litepb::BufferInputStream input_stream(stream.data(), stream.size());
+    AllValueTypes deserialized;
+    TEST_ASSERT_TRUE(litepb::parse(deserialized, input_stream));
+
+    // Verify every value round-trips
+    TEST_ASSERT_EQUAL_DOUBLE(-2.5, deserialized.string_to_double["d"]);
+    TEST_ASSERT_EQUAL_FLOAT(1.25f, deserialized.string_to_float["f"]);
+    TEST_ASSERT_EQUAL_INT32(-7, deserialized.string_to_int32["i32"]);
+    TEST_ASSERT_TRUE(deserialized.string_to_int64["i64"] == -7000000000LL);
+    TEST_ASSERT_EQUAL_UINT32(4000000000U, deserialized.string_to_uint32["u32"]);
+    TEST_ASSERT_TRUE(deserialized.string_to_uint64["u64"] == 0xFFFFFFFFFFFFFFFFULL);
+    TEST_ASSERT_EQUAL_INT32(-150, deserialized.string_to_sint32["s32"]);
+    TEST_ASSERT_TRUE(deserialized.string_to_sint64["s64"] == -150000000000LL);
+    TEST_ASSERT_EQUAL_UINT32(0xCAFEBABE, deserialized.string_to_fixed32["f32"]);
+    TEST_ASSERT_TRUE(deserialized.string_to_fixed64["f64"] == 0xFEDCBA9876543210ULL);
+    TEST_ASSERT_EQUAL_INT32(-1, deserialized.string_to_sfixed32["sf32"]);
+    TEST_ASSERT_TRUE(deserialized.string_to_sfixed64["sf64"] == -2);
+    TEST_ASSERT_TRUE(deserialized.string_to_bool["b"]);
+    TEST_ASSERT_EQUAL_STRING("text", deserialized.string_to_string["s"].c_str());
+    TEST_ASSERT_EQUAL_size_t(3, deserialized.string_to_bytes["by"].size());
+    TEST_ASSERT_EQUAL_UINT8(0xFF, deserialized.string_to_bytes["by"][1]);
+    TEST_ASSERT_EQUAL_size_t(0, deserialized.string_to_bytes["empty"].size());
+}
+
+void test_map_entry_wire_format()
+{
+    using namespace test::maps;
+
+    // Entry length must cover zigzag keys: {-300: "s"} in field 5
+    AllKeyTypes keys;
+    keys.sint32_key = { { -300, "s" } };
+
+    litepb::BufferOutputStream key_stream;
+    TEST_ASSERT_TRUE(litepb::serialize(keys, key_stream));
+    const uint8_t expected_key[] = { 0x2A, 0x06, 0x08, 0xD7, 0x04, 0x12, 0x01, 's' };
+    TEST_ASSERT_EQUAL_size_t(sizeof(expected_key), key_stream.size());
+    TEST_ASSERT_EQUAL_MEMORY(expected_key, key_stream.data(), sizeof(expected_key));
+
+    // Entry length must cover fixed-width values: {"f": 1.25f} in field 2
+    AllValueTypes values;
+    values.string_to_float = { { "f", 1.25f } };
+
+    litepb::BufferOutputStream value_stream;
+    TEST_ASSERT_TRUE(litepb::serialize(values, value_stream));
+    const uint8_t expected_value[] = { 0x12, 0x08, 0x0A, 0x01, 'f', 0x15, 0x00, 0x00, 0xA0, 0x3F };
+    TEST_ASSERT_EQUAL_size_t(sizeof(expected_value), value_stream.size());
+    TEST_ASSERT_EQUAL_MEMORY(expected_value, value_stream.data(), sizeof(expected_value));
+}
+
 int runTests()
 {
     UNITY_BEGIN();
@@ -186,5 +308,8 @@ int runTests()
     RUN_TEST(test_map_with_enums);
     RUN_TEST(test_empty_maps);
     RUN_TEST(test_mixed_with_maps);
+    RUN_TEST(test_all_key_types);
+    RUN_TEST(test_all_value_types);
+    RUN_TEST(test_map_entry_wire_format);
     return UNITY_END();
 }
@@ -6,6 +6,22 @@
 void setUp() {}
 void tearDown() {}
 
+// Input stream that cannot lend its bytes, like one reading from a UART or socket
+class CopyOnlyInputStream : public litepb::InputStream {
+    litepb::BufferInputStream inner_;
+
+public:
+    CopyOnlyInputStream(const uint8_t * data, size_t size)
+        : inner_(data, size)
+    {
+    }
+
+    bool read(uint8_t * data, size_t size) override { return inner_.read(data, size); }
+    bool skip(size_t size) override { return inner_.skip(size); }
+    size_t position() const override { return inner_.position(); }
+    size_t available() const override { return inner_.available(); }
+};
+
 void test_simple_nesting()
 {
     using namespace test::nested;
@@ -153,6 +169,106 @@ void test_complex_nested()
     TEST_ASSERT_EQUAL_STRING("text", deserialized.mapped_inner["key"].text.c_str());
 }
 
+void test_complex_nested_byte_size()
+{
+    using namespace test::nested;
+
+    ComplexNested::Inner inner;
+    inner.text   = std::string(200, 'x');  // two-byte length prefix
+    inner.number = -1;                     // negative int32 encodes as ten bytes
+    inner.tags   = { "tag1", "tag2" };
+    inner.values = { { "k", 1 }, { "neg", -5 } };
+    inner.data   = 2.5;
+
+    // single_inner is always written, even when empty
+    ComplexNested msg;
+    litepb::BufferOutputStream empty_stream;
+    TEST_ASSERT_TRUE(litepb::serialize(msg, empty_stream));
+    TEST_ASSERT_EQUAL_size_t(empty_stream.size(), litepb::byte_size(msg));
+
+    msg.single_inner   = inner;
+    msg.repeated_inner = { inner, ComplexNested::Inner{} };
+    msg.mapped_inner   = { { "key", inner }, { "empty", ComplexNested::Inner{} } };
+    msg.optional_inner = inner;
+    msg.unknown_fields.add_varint(100, 300);
+
+    // The length prefixes written for nested messages come from byte_size()
+    litepb::BufferOutputStream stream;
+    TEST_ASSERT_TRUE(litepb::serialize(msg, stream));
+    TEST_ASSERT_EQUAL_size_t(stream.size(), litepb::byte_size(msg));
+
+    litepb::BufferInputStream input_stream(stream.data(), stream.size());
+    ComplexNested deserialized;
+    TEST_ASSERT_TRUE(litepb::parse(deserialized, input_stream));
+    TEST_ASSERT_EQUAL_size_t(200, deserialized.mapped_inner["key"].text.size());
+    TEST_ASSERT_EQUAL_INT32(-1, deserialized.optional_inner->number);
+    TEST_ASSERT_EQUAL_size_t(stream.size(), litepb::byte_size(deserialized));
+}
+
+void test_nested_parse_without_borrow()
+{
+    using namespace test::nested;
+
+    ComplexNested::Inner inner;
+    inner.text   = "copied";
+    inner.number = 7;
+    inner.values = { { "k", 1 } };
+
+    ComplexNested msg;
+    msg.single_inner   = inner;
+    msg.repeated_inner = { inner };
+    msg.mapped_inner   = { { "key", inner } };
+
+    litepb::BufferOutputStream stream;
+    TEST_ASSERT_TRUE(litepb::serialize(msg, stream));
+
+    // Nested messages fall back to copying their bytes out of the stream
+    CopyOnlyInputStream input_stream(stream.data(), stream.size());
+    ComplexNested deserialized;
+    TEST_ASSERT_TRUE(litepb::parse(deserialized, input_stream));
+    TEST_ASSERT_EQUAL_STRING("copied", deserialized.single_inner.text.c_str());
+    TEST_ASSERT_EQUAL_size_t(1, deserialized.repeated_inner.size());
+    TEST_ASSERT_EQUAL_INT32(7, deserialized.repeated_inner[0].number);
+    TEST_ASSERT_EQUAL_INT32(1, deserialized.mapped_inner["key"].values["k"]);
+
+    // A truncated nested message still fails cleanly
+    CopyOnlyInputStream truncated(stream.data(), stream.size() - 1);
+    ComplexNested partial;
+    TEST_ASSERT_FALSE(litepb::parse(partial, truncated));
+}
+
+void test_parse_length_prefixed()
+{
+    using namespace test::nested;
+
+    OuterMessage::InnerMessage inner;
+    inner.inner_field = "prefixed";
+    inner.inner_value = 9;
+
+    // Length prefix followed by the message, as for a nested message field
+    litepb::BufferOutputStream stream;
+    litepb::ProtoWriter writer(stream);
+    TEST_ASSERT_TRUE(writer.write_varint(litepb::byte_size(inner)));
+    TEST_ASSERT_TRUE(litepb::serialize(inner, stream));
+
+    litepb::BufferInputStream borrowed_input(stream.data(), stream.size());
+    OuterMessage::InnerMessage borrowed;
+    TEST_ASSERT_TRUE(litepb::parse_length_prefixed_borrowed(borrowed, borrowed_input));
+    TEST_ASSERT_EQUAL_STRING("prefixed", borrowed.inner_field.c_str());
+    TEST_ASSERT_EQUAL_size_t(0, borrowed_input.available());
+
+    // A stream that cannot lend its bytes falls back to a copy, unless borrowing is required
+    CopyOnlyInputStream copy_input(stream.data(), stream.size());
+    OuterMessage::InnerMessage copied;
+    TEST_ASSERT_TRUE(litepb::parse_length_prefixed(copied, copy_input));
+    TEST_ASSERT_EQUAL_INT32(9, copied.inner_value);
+    TEST_ASSERT_EQUAL_size_t(0, copy_input.available());
+
+    CopyOnlyInputStream no_borrow_input(stream.data(), stream.size());
+    OuterMessage::InnerMessage rejected;
+    TEST_ASSERT_FALSE(litepb::parse_length_prefixed_borrowed(rejected, no_borrow_input));
+}
+
 int runTests()
 {
     UNITY_BEGIN();
@@ -160,5 +276,8 @@ int runTests()
     RUN_TEST(test_deep_nesting);
     RUN_TEST(test_multiple_nested_types);
     RUN_TEST(test_complex_nested);
+    RUN_TEST(test_complex_nested_byte_size);
+    RUN_TEST(test_nested_parse_without_borrow);
+    RUN_TEST(test_parse_length_prefixed);
     return UNITY_END();
 }
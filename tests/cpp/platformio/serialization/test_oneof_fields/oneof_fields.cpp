@@ -217,6 +217,68 @@ void test_oneof_overwrite()
     TEST_ASSERT_EQUAL_STRING("replaced", std::get<std::string>(deserialized.value).c_str());
 }
 
+void test_oneof_byte_size()
+{
+    using namespace test::oneof;
+
+    SimpleMessage simple;
+    simple.text = "simple text";
+
+    MultipleOneofs msg;
+    TEST_ASSERT_EQUAL_size_t(0, litepb::byte_size(msg));
+
+    msg.first          = int32_t(-7);
+    msg.second         = 1.5;
+    msg.third          = simple;
+    msg.regular_field  = "regular";
+    msg.repeated_field = { 1, -1, 300 };
+
+    litepb::BufferOutputStream stream;
+    TEST_ASSERT_TRUE(litepb::serialize(msg, stream));
+    TEST_ASSERT_EQUAL_size_t(stream.size(), litepb::byte_size(msg));
+
+    litepb::BufferInputStream input_stream(stream.data(), stream.size());
+    MultipleOneofs deserialized;
+    TEST_ASSERT_TRUE(litepb::parse(deserialized, input_stream));
+    TEST_ASSERT_EQUAL_INT32(-7, std::get<int32_t>(deserialized.first));
+    TEST_ASSERT_EQUAL_DOUBLE(1.5, std::get<double>(deserialized.second));
+    TEST_ASSERT_EQUAL_STRING("simple text", std::get<SimpleMessage>(deserialized.third).text.c_str());
+    TEST_ASSERT_EQUAL_STRING("regular", deserialized.regular_field.c_str());
+    TEST_ASSERT_EQUAL_size_t(3, deserialized.repeated_field.size());
+
+    // A oneof message is length-delimited like any other submessage
+    MultipleOneofs only_third;
+    only_third.third = simple;
+    litepb::BufferOutputStream third_stream;
+    TEST_ASSERT_TRUE(litepb::serialize(only_third, third_stream));
+    const uint8_t expected[] = { 0x2a, 0x0d, 0x0a, 0x0b, 's', 'i', 'm', 'p', 'l', 'e', ' ', 't', 'e', 'x', 't' };
+    TEST_ASSERT_EQUAL_size_t(sizeof(expected), third_stream.size());
+    TEST_ASSERT_EQUAL_UINT8_ARRAY(expected, third_stream.data(), sizeof(expected));
+    TEST_ASSERT_EQUAL_size_t(sizeof(expected), litepb::byte_size(only_third));
+
+    // Fields after the oneof message must not be swallowed by it
+    MultipleOneofs trailing;
+    trailing.regular_field  = "after";
+    trailing.repeated_field = { 5 };
+    TEST_ASSERT_TRUE(litepb::serialize(trailing, third_stream));
+
+    litepb::BufferInputStream merged_stream(third_stream.data(), third_stream.size());
+    MultipleOneofs merged;
+    TEST_ASSERT_TRUE(litepb::parse(merged, merged_stream));
+    TEST_ASSERT_TRUE(std::holds_alternative<SimpleMessage>(merged.third));
+    TEST_ASSERT_EQUAL_STRING("simple text", std::get<SimpleMessage>(merged.third).text.c_str());
+    TEST_ASSERT_TRUE(std::get<SimpleMessage>(merged.third).unknown_fields.empty());
+    TEST_ASSERT_EQUAL_STRING("after", merged.regular_field.c_str());
+    TEST_ASSERT_EQUAL_size_t(1, merged.repeated_field.size());
+    TEST_ASSERT_EQUAL_INT32(5, merged.repeated_field[0]);
+
+    OneofAllTypes all_types;
+    all_types.value = uint64_t(1) << 40;
+    litepb::BufferOutputStream all_types_stream;
+    TEST_ASSERT_TRUE(litepb::serialize(all_types, all_types_stream));
+    TEST_ASSERT_EQUAL_size_t(all_types_stream.size(), litepb::byte_size(all_types));
+}
+
 int runTests()
 {
     UNITY_BEGIN();
@@ -226,5 +288,6 @@ int runTests()
     RUN_TEST(test_oneof_all_types);
     RUN_TEST(test_empty_oneof);
     RUN_TEST(test_oneof_overwrite);
+    RUN_TEST(test_oneof_byte_size);
     return UNITY_END();
 }
@@ -151,6 +151,28 @@ void test_packed_vs_unpacked()
     TEST_ASSERT_EQUAL_INT32(200, deserialized.unpacked_int32[1]);
 }
 
+void test_packed_fixed_size_wire_format()
+{
+    using namespace test::repeated;
+
+    // Fixed-width and bool items have a constant encoded size per element
+    PackedTest msg;
+    msg.packed_fixed32 = { 1, 2 };
+    msg.packed_double  = { 1.0 };
+    msg.packed_bool    = { true, false, true };
+
+    litepb::BufferOutputStream stream;
+    TEST_ASSERT_TRUE(litepb::serialize(msg, stream));
+
+    const uint8_t expected[] = {
+        0x3A, 0x08, 0x01, 0x00, 0x00, 0x00, 0x02, 0x00, 0x00, 0x00,       // field 7, 2 x fixed32
+        0x62, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0xF0, 0x3F,       // field 12, 1 x double
+        0x6A, 0x03, 0x01, 0x00, 0x01,                                     // field 13, 3 x bool
+    };
+    TEST_ASSERT_EQUAL_size_t(sizeof(expected), stream.size());
+    TEST_ASSERT_EQUAL_UINT8_ARRAY(expected, stream.data(), sizeof(expected));
+}
+
 void test_empty_repeated_fields()
 {
     using namespace test::repeated;
@@ -220,6 +242,7 @@ int runTests()
     RUN_TEST(test_repeated_messages);
     RUN_TEST(test_repeated_enums);
     RUN_TEST(test_packed_vs_unpacked);
+    RUN_TEST(test_packed_fixed_size_wire_format);
     RUN_TEST(test_empty_repeated_fields);
     RUN_TEST(test_mixed_fields);
     return UNITY_END();
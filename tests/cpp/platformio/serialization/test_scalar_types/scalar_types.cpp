@@ -209,6 +209,29 @@ void test_extreme_values()
     TEST_ASSERT_EQUAL_UINT64(UINT64_MAX, deserialized.field_uint64);
 }
 
+void test_fixed_width_byte_size()
+{
+    using namespace test::scalar;
+
+    // Default values are skipped, so only the unknown fields contribute
+    ScalarTypes msg;
+    TEST_ASSERT_EQUAL_size_t(0, litepb::byte_size(msg));
+
+    // Each fixed-width field costs its one-byte tag plus a constant payload
+    msg.field_fixed32  = 1;
+    msg.field_fixed64  = 1;
+    msg.field_sfixed32 = -1;
+    msg.field_sfixed64 = -1;
+    msg.field_float    = 1.0f;
+    msg.field_double   = 1.0;
+    msg.field_bool     = true;
+    TEST_ASSERT_EQUAL_size_t(5 + 9 + 5 + 9 + 5 + 9 + 2, litepb::byte_size(msg));
+
+    litepb::BufferOutputStream stream;
+    TEST_ASSERT_TRUE(litepb::serialize(msg, stream));
+    TEST_ASSERT_EQUAL_size_t(stream.size(), litepb::byte_size(msg));
+}
+
 int runTests()
 {
     UNITY_BEGIN();
@@ -217,5 +240,6 @@ int runTests()
     RUN_TEST(test_repeated_scalar_types);
     RUN_TEST(test_packed_types);
     RUN_TEST(test_extreme_values);
+    RUN_TEST(test_fixed_width_byte_size);
     return UNITY_END();
 }
@@ -0,0 +1,212 @@
+#include "litepb/litepb.h"
+#include "unity.h"
+#include "zero_copy_strings.pb.h"
+#include <string_view>
+
+void setUp() {}
+void tearDown() {}
+
+// Input stream that cannot lend its bytes, like one reading from a UART or socket
+class CopyOnlyInputStream : public litepb::InputStream {
+    litepb::BufferInputStream inner_;
+
+public:
+    CopyOnlyInputStream(const uint8_t * data, size_t size)
+        : inner_(data, size)
+    {
+    }
+
+    bool read(uint8_t * data, size_t size) override { return inner_.read(data, size); }
+    bool skip(size_t size) override { return inner_.skip(size); }
+    size_t position() const override { return inner_.position(); }
+    size_t available() const override { return inner_.available(); }
+};
+
+// True when a non-empty view lies inside the serialized buffer it was parsed from
+static bool points_into(std::string_view view, const litepb::BufferOutputStream & buffer)
+{
+    const uint8_t * begin = reinterpret_cast<const uint8_t *>(view.data());
+    return !view.empty() && begin >= buffer.data() && begin + view.size() <= buffer.data() + buffer.size();
+}
+
+static test::zero_copy::Document make_document()
+{
+    using namespace test::zero_copy;
+
+    Document doc;
+    doc.title        = "title";
+    doc.label.text   = "nested label";
+    doc.label.weight = 3;
+    doc.tags         = { "alpha", "beta", "gamma" };
+    doc.attributes   = { { "color", "red" }, { "size", "large" } };
+
+    Label by_id;
+    by_id.text   = "label seven";
+    by_id.weight = 7;
+    doc.labels_by_id.emplace(7, by_id);
+
+    Label first;
+    first.text = "first";
+    Label second;
+    second.text = "second";
+    doc.labels  = { first, second };
+
+    doc.note     = "a note";
+    doc.body     = std::string_view("text body");
+    doc.revision = 42;
+    return doc;
+}
+
+void test_zero_copy_round_trip()
+{
+    using namespace test::zero_copy;
+
+    Document doc = make_document();
+    litepb::BufferOutputStream output;
+    TEST_ASSERT_TRUE(litepb::serialize(doc, output));
+    TEST_ASSERT_EQUAL_size_t(output.size(), litepb::byte_size(doc));
+
+    litepb::BufferInputStream input(output.data(), output.size());
+    Document parsed;
+    TEST_ASSERT_TRUE(litepb::parse(parsed, input));
+
+    TEST_ASSERT_TRUE(parsed.title == "title");
+    TEST_ASSERT_TRUE(parsed.label.text == "nested label");
+    TEST_ASSERT_EQUAL_INT32(3, parsed.label.weight);
+
+    TEST_ASSERT_EQUAL_size_t(3, parsed.tags.size());
+    TEST_ASSERT_TRUE(parsed.tags[0] == "alpha");
+    TEST_ASSERT_TRUE(parsed.tags[1] == "beta");
+    TEST_ASSERT_TRUE(parsed.tags[2] == "gamma");
+
+    TEST_ASSERT_EQUAL_size_t(2, parsed.attributes.size());
+    TEST_ASSERT_TRUE(parsed.attributes.at("color") == "red");
+    TEST_ASSERT_TRUE(parsed.attributes.at("size") == "large");
+
+    TEST_ASSERT_EQUAL_size_t(1, parsed.labels_by_id.size());
+    TEST_ASSERT_TRUE(parsed.labels_by_id.at(7).text == "label seven");
+    TEST_ASSERT_EQUAL_INT32(7, parsed.labels_by_id.at(7).weight);
+
+    TEST_ASSERT_EQUAL_size_t(2, parsed.labels.size());
+    TEST_ASSERT_TRUE(parsed.labels[0].text == "first");
+    TEST_ASSERT_TRUE(parsed.labels[1].text == "second");
+
+    TEST_ASSERT_TRUE(parsed.note.has_value());
+    TEST_ASSERT_TRUE(*parsed.note == "a note");
+
+    TEST_ASSERT_TRUE(std::holds_alternative<std::string_view>(parsed.body));
+    TEST_ASSERT_TRUE(std::get<std::string_view>(parsed.body) == "text body");
+    TEST_ASSERT_EQUAL_INT32(42, parsed.revision);
+}
+
+void test_zero_copy_views_point_into_buffer()
+{
+    using namespace test::zero_copy;
+
+    Document doc = make_document();
+    litepb::BufferOutputStream output;
+    TEST_ASSERT_TRUE(litepb::serialize(doc, output));
+
+    litepb::BufferInputStream input(output.data(), output.size());
+    Document parsed;
+    TEST_ASSERT_TRUE(litepb::parse(parsed, input));
+
+    TEST_ASSERT_TRUE(points_into(parsed.title, output));
+    TEST_ASSERT_TRUE(points_into(parsed.label.text, output));
+    for (const auto & tag : parsed.tags) {
+        TEST_ASSERT_TRUE(points_into(tag, output));
+    }
+    for (const auto & [key, value] : parsed.attributes) {
+        TEST_ASSERT_TRUE(points_into(key, output));
+        TEST_ASSERT_TRUE(points_into(value, output));
+    }
+    TEST_ASSERT_TRUE(points_into(parsed.labels_by_id.at(7).text, output));
+    for (const auto & label : parsed.labels) {
+        TEST_ASSERT_TRUE(points_into(label.text, output));
+    }
+    TEST_ASSERT_TRUE(points_into(*parsed.note, output));
+    TEST_ASSERT_TRUE(points_into(std::get<std::string_view>(parsed.body), output));
+}
+
+void test_zero_copy_oneof_message()
+{
+    using namespace test::zero_copy;
+
+    Label body;
+    body.text   = "label body";
+    body.weight = 9;
+
+    Document doc;
+    doc.body     = body;
+    doc.revision = 5;
+
+    litepb::BufferOutputStream output;
+    TEST_ASSERT_TRUE(litepb::serialize(doc, output));
+    TEST_ASSERT_EQUAL_size_t(output.size(), litepb::byte_size(doc));
+
+    litepb::BufferInputStream input(output.data(), output.size());
+    Document parsed;
+    TEST_ASSERT_TRUE(litepb::parse(parsed, input));
+
+    TEST_ASSERT_TRUE(std::holds_alternative<Label>(parsed.body));
+    const Label & parsed_body = std::get<Label>(parsed.body);
+    TEST_ASSERT_TRUE(parsed_body.text == "label body");
+    TEST_ASSERT_EQUAL_INT32(9, parsed_body.weight);
+    TEST_ASSERT_TRUE(points_into(parsed_body.text, output));
+    TEST_ASSERT_EQUAL_INT32(5, parsed.revision);
+}
+
+void test_zero_copy_requires_borrow()
+{
+    using namespace test::zero_copy;
+
+    // Top-level string
+    Document title_only;
+    title_only.title = "title";
+    litepb::BufferOutputStream title_output;
+    TEST_ASSERT_TRUE(litepb::serialize(title_only, title_output));
+    CopyOnlyInputStream title_input(title_output.data(), title_output.size());
+    Document parsed_title;
+    TEST_ASSERT_FALSE(litepb::parse(parsed_title, title_input));
+
+    // String inside a nested message
+    Document nested_only;
+    nested_only.label.text = "nested";
+    litepb::BufferOutputStream nested_output;
+    TEST_ASSERT_TRUE(litepb::serialize(nested_only, nested_output));
+    CopyOnlyInputStream nested_input(nested_output.data(), nested_output.size());
+    Document parsed_nested;
+    TEST_ASSERT_FALSE(litepb::parse(parsed_nested, nested_input));
+
+    // The full document
+    Document doc = make_document();
+    litepb::BufferOutputStream output;
+    TEST_ASSERT_TRUE(litepb::serialize(doc, output));
+    CopyOnlyInputStream input(output.data(), output.size());
+    Document parsed;
+    TEST_ASSERT_FALSE(litepb::parse(parsed, input));
+
+    // Nothing needs borrowing when no string has any bytes: the empty label
+    // submessage and the empty note still parse from a copy-only stream
+    Document revision_only;
+    revision_only.note     = "";
+    revision_only.revision = 11;
+    litepb::BufferOutputStream revision_output;
+    TEST_ASSERT_TRUE(litepb::serialize(revision_only, revision_output));
+    CopyOnlyInputStream revision_input(revision_output.data(), revision_output.size());
+    Document parsed_revision;
+    TEST_ASSERT_TRUE(litepb::parse(parsed_revision, revision_input));
+    TEST_ASSERT_TRUE(parsed_revision.note.has_value());
+    TEST_ASSERT_TRUE(parsed_revision.note->empty());
+    TEST_ASSERT_EQUAL_INT32(11, parsed_revision.revision);
+}
+
+int runTests()
+{
+    UNITY_BEGIN();
+    RUN_TEST(test_zero_copy_round_trip);
+    RUN_TEST(test_zero_copy_views_point_into_buffer);
+    RUN_TEST(test_zero_copy_oneof_message);
+    RUN_TEST(test_zero_copy_requires_borrow);
+    return UNITY_END();
+}